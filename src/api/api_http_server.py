@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 高并发HTTP前端
+为统一API管理器提供官方的 asyncio HTTP/1.1 服务入口
+
+版本: 1.0
+作者: AI Assistant
+功能: HTTP/1.1解析、Keep-Alive、管线化深度限制、请求大小限制、优雅停机
+特色: 仅依赖标准库；安装 uvloop 时自动使用更快的事件循环
+"""
+
+import json
+import time
+import signal
+import asyncio
+import argparse
+from typing import Dict, Any, Optional, Tuple, List
+from urllib.parse import urlsplit
+
+from api_response import RawResponse, StreamingResponse, http_status_for, response_bytes
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# ============================================================================
+# 协议常量
+# ============================================================================
+
+HTTP_STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    501: "Not Implemented",
+    503: "Service Unavailable",
+}
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+# 默认监听端口，与前端 ApiManager 的默认 baseUrl（实例1的Web端口）一致
+DEFAULT_PORT = 8180
+
+
+class HTTPRequestError(Exception):
+    """请求解析错误，携带应返回的HTTP状态码"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class HTTPRequest:
+    """已解析的HTTP请求"""
+
+    __slots__ = ("method", "target", "version", "headers", "body", "keep_alive")
+
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.target = target
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            self.keep_alive = connection == "keep-alive"
+        else:
+            self.keep_alive = connection != "close"
+
+# ============================================================================
+# HTTP服务器
+# ============================================================================
+
+class APIHTTPServer:
+    """统一API管理器的 asyncio HTTP/1.1 前端
+
+    管理器提供 handle_request_async 时直接在事件循环上调度，
+    否则将 handle_request 交给事件循环的默认线程池执行。
+    """
+
+    def __init__(self, manager: Any, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 max_header_size: int = 16 * 1024, max_body_size: int = 1024 * 1024,
+                 keep_alive_timeout: float = 15.0, max_requests_per_connection: int = 1000,
+                 max_pipeline_depth: int = 16, shutdown_timeout: float = 10.0):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_requests_per_connection = max_requests_per_connection
+        self.max_pipeline_depth = max_pipeline_depth
+        self.shutdown_timeout = shutdown_timeout
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        # 连接任务 -> 响应写入任务
+        self._connections: Dict[asyncio.Task, asyncio.Task] = {}
+        self._idle_connections: set = set()
+        self._shutting_down = False
+        self._stopped: Optional[asyncio.Event] = None
+        self._bound_addresses: List[Tuple[str, int]] = []
+        self.stats = {
+            "connections_total": 0,
+            "requests_total": 0,
+            "rejected_requests": 0,
+        }
+
+    # ------------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------------
+
+    async def start(self):
+        """开始监听"""
+        self._stopped = asyncio.Event()
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=self.max_header_size
+        )
+        # 端口为0时回填实际监听端口
+        sockets = self._server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        # 告知管理器本服务的监听地址（动态路径管理器的 http 压测只允许压测本服务或回环地址）
+        addresses = getattr(self.manager, "server_addresses", None)
+        if addresses is not None:
+            self._bound_addresses = [tuple(sock.getsockname()[:2]) for sock in sockets]
+            addresses.update(self._bound_addresses)
+
+    async def serve_forever(self):
+        """启动并运行直到 shutdown 被调用"""
+        if self._server is None:
+            await self.start()
+        await self._stopped.wait()
+
+    async def shutdown(self):
+        """优雅停机：停止接收新连接，等待在途请求完成，超时后强制关闭"""
+        if self._shutting_down:
+            return
+        self._shutting_down = True
+
+        addresses = getattr(self.manager, "server_addresses", None)
+        if addresses is not None:
+            addresses.difference_update(self._bound_addresses)
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        # 空闲的Keep-Alive连接没有在途请求，直接关闭
+        for task in list(self._idle_connections):
+            task.cancel()
+
+        if self._connections:
+            _, pending = await asyncio.wait(list(self._connections), timeout=self.shutdown_timeout)
+            for task in pending:
+                writer_task = self._connections.get(task)
+                if writer_task is not None:
+                    writer_task.cancel()
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if self._stopped is not None:
+            self._stopped.set()
+
+    # ------------------------------------------------------------------------
+    # 连接处理
+    # ------------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理单个连接：读取端解析请求，写入端按顺序回写响应"""
+        task = asyncio.current_task()
+        self.stats["connections_total"] += 1
+
+        # 管线化队列：限制单连接上已读取但尚未回写的请求数量
+        pipeline: asyncio.Queue = asyncio.Queue(maxsize=self.max_pipeline_depth)
+        response_writer = asyncio.ensure_future(self._write_responses(pipeline, writer))
+        self._connections[task] = response_writer
+
+        try:
+            handled = 0
+            while not self._shutting_down and handled < self.max_requests_per_connection:
+                self._idle_connections.add(task)
+                try:
+                    request = await self._read_request(reader)
+                except HTTPRequestError as e:
+                    self.stats["rejected_requests"] += 1
+                    await self._enqueue(pipeline, self._error_future(e.status, e.message), response_writer)
+                    break
+                finally:
+                    self._idle_connections.discard(task)
+                if request is None:
+                    break
+
+                handled += 1
+                self.stats["requests_total"] += 1
+                keep_alive = (request.keep_alive and not self._shutting_down
+                              and handled < self.max_requests_per_connection)
+                future = asyncio.ensure_future(self._dispatch(request))
+                if not await self._enqueue(pipeline, (future, keep_alive), response_writer):
+                    future.cancel()
+                    break
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            await self._enqueue(pipeline, None, response_writer)
+            try:
+                await response_writer
+            except (OSError, asyncio.CancelledError):
+                pass
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self._connections.pop(task, None)
+
+    @staticmethod
+    async def _enqueue(pipeline: asyncio.Queue, item: Any, response_writer: asyncio.Future) -> bool:
+        """放入管线化队列；写入端已退出时返回 False，避免队列满时永久阻塞"""
+        if response_writer.done():
+            return False
+        put = asyncio.ensure_future(pipeline.put(item))
+        await asyncio.wait([put, response_writer], return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            return False
+        return True
+
+    async def _write_responses(self, pipeline: asyncio.Queue, writer: asyncio.StreamWriter):
+        """按请求到达顺序回写响应"""
+        while True:
+            item = await pipeline.get()
+            if item is None:
+                return
+            future, keep_alive = item
+            try:
+                status, body, content_type = await future
+            except Exception as e:
+                status, body, content_type = 500, self._error_body(
+                    "INTERNAL_ERROR", f"API调用异常: {str(e)}"), JSON_CONTENT_TYPE
+            if isinstance(body, bytes):
+                writer.write(self._build_response(status, body, content_type, keep_alive))
+                await writer.drain()
+            elif not await self._write_stream(writer, status, body, content_type, keep_alive):
+                # 流式响应中途失败，只能断开连接让客户端感知不完整的响应
+                keep_alive = False
+                writer.close()
+            if not keep_alive:
+                # 丢弃剩余的管线化请求
+                while True:
+                    remaining = await pipeline.get()
+                    if remaining is None:
+                        return
+                    remaining[0].cancel()
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, status: int, chunks: Any,
+                            content_type: str, keep_alive: bool) -> bool:
+        """以分块传输编码写出流式响应，成功写完返回 True
+
+        生成器可能执行文件系统操作，逐块在线程池中取出，避免阻塞事件循环。
+        """
+        loop = asyncio.get_running_loop()
+        writer.write(self._build_stream_head(status, content_type, keep_alive))
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    await writer.drain()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+            return True
+        except Exception:
+            return False
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+    def _error_future(self, status: int, message: str) -> Tuple[asyncio.Future, bool]:
+        """构造协议错误的响应占位"""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result((status, self._error_body("HTTP_ERROR", message), JSON_CONTENT_TYPE))
+        return future, False
+
+    def _error_body(self, code: str, message: str) -> bytes:
+        """编码与API响应格式一致的错误响应体"""
+        return self._encode({
+            "success": False,
+            "message": "操作失败",
+            "data": None,
+            "timestamp": time.time(),
+            "error": {"code": code, "message": message}
+        })
+
+    # ------------------------------------------------------------------------
+    # 请求解析
+    # ------------------------------------------------------------------------
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[HTTPRequest]:
+        """读取并解析一个请求，连接正常结束或空闲超时时返回 None"""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=self.keep_alive_timeout)
+        except asyncio.TimeoutError:
+            return None
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HTTPRequestError(400, "请求不完整")
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPRequestError(431, "请求头过大")
+        except ValueError:
+            raise HTTPRequestError(431, "请求头过大")
+
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPRequestError(400, "请求行格式错误")
+
+        if version not in ("HTTP/1.1", "HTTP/1.0"):
+            raise HTTPRequestError(400, f"不支持的协议版本: {version}")
+
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise HTTPRequestError(400, "请求头格式错误")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPRequestError(501, "不支持分块传输编码")
+
+        try:
+            content_length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPRequestError(400, "Content-Length 无效")
+        if content_length < 0:
+            raise HTTPRequestError(400, "Content-Length 无效")
+        if content_length > self.max_body_size:
+            raise HTTPRequestError(413, f"请求体超过限制 ({self.max_body_size} 字节)")
+
+        body = b""
+        if content_length:
+            try:
+                body = await asyncio.wait_for(reader.readexactly(content_length), timeout=self.keep_alive_timeout)
+            except asyncio.TimeoutError:
+                raise HTTPRequestError(408, "读取请求体超时")
+
+        # 绝对形式的请求目标只保留路径和查询部分
+        if target.startswith(("http://", "https://")):
+            parts = urlsplit(target)
+            target = parts.path + ("?" + parts.query if parts.query else "")
+
+        return HTTPRequest(method.upper(), target, version, headers, body)
+
+    # ------------------------------------------------------------------------
+    # 请求分发
+    # ------------------------------------------------------------------------
+
+    async def _dispatch(self, request: HTTPRequest) -> Tuple[int, Any, str]:
+        """将请求分发到API管理器"""
+        data = None
+        if request.body:
+            try:
+                data = json.loads(request.body.decode("utf-8"))
+            except (UnicodeDecodeError, ValueError):
+                return 400, self._error_body("INVALID_JSON", "请求体不是有效的JSON"), JSON_CONTENT_TYPE
+
+        handle_async = getattr(self.manager, "handle_request_async", None)
+        if handle_async is not None:
+            response = await handle_async(request.target, request.method, data)
+        else:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                None, self.manager.handle_request, request.target, request.method, data
+            )
+
+        if isinstance(response, RawResponse):
+            return response.status, response.body, response.content_type
+        if isinstance(response, StreamingResponse):
+            if request.version == "HTTP/1.0":
+                # HTTP/1.0 不支持分块传输编码，读取完整内容后按普通响应返回
+                body = await asyncio.get_running_loop().run_in_executor(None, response.read_all)
+                return response.status, body, response.content_type
+            return response.status, response.chunks, response.content_type
+        return http_status_for(response), self._encode(response), JSON_CONTENT_TYPE
+
+    @staticmethod
+    def _encode(payload: Any) -> bytes:
+        """序列化响应体（JSONResponse 复用已缓存的字节）"""
+        return response_bytes(payload)
+
+    @staticmethod
+    def _build_response(status: int, body: bytes, content_type: str, keep_alive: bool) -> bytes:
+        """构造HTTP响应报文"""
+        head = (
+            f"HTTP/1.1 {status} {HTTP_STATUS_TEXT.get(status, 'Unknown')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n"
+        )
+        return head.encode("latin-1") + body
+
+    @staticmethod
+    def _build_stream_head(status: int, content_type: str, keep_alive: bool) -> bytes:
+        """构造分块传输响应的报文头"""
+        head = (
+            f"HTTP/1.1 {status} {HTTP_STATUS_TEXT.get(status, 'Unknown')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Transfer-Encoding: chunked\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n"
+        )
+        return head.encode("latin-1")
+
+# ============================================================================
+# 服务入口
+# ============================================================================
+
+def create_manager(kind: str) -> Any:
+    """按名称创建API管理器"""
+    if kind == "unified":
+        from unified_api_clean import get_api_manager
+        return get_api_manager()
+    from dynamic_path_api_manager import get_dynamic_api_manager
+    return get_dynamic_api_manager()
+
+
+async def serve(manager: Any, **server_options) -> APIHTTPServer:
+    """启动HTTP服务并在收到 SIGINT/SIGTERM 时优雅停机"""
+    server = APIHTTPServer(manager, **server_options)
+    await server.start()
+    print(f"🌐 API服务已启动: http://{server.host}:{server.port}")
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(server.shutdown()))
+        except (NotImplementedError, RuntimeError):
+            # Windows 事件循环不支持信号处理，依赖 KeyboardInterrupt
+            pass
+
+    try:
+        await server.serve_forever()
+    finally:
+        await server.shutdown()
+        print("🛑 API服务已停止")
+    return server
+
+
+def run_server(manager: Any, use_uvloop: bool = True, **server_options):
+    """同步启动入口"""
+    if use_uvloop and uvloop is not None:
+        uvloop.install()
+    try:
+        asyncio.run(serve(manager, **server_options))
+    except KeyboardInterrupt:
+        pass
+
+# ============================================================================
+# 主函数
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CodeStudio Pro Ultimate - API HTTP服务")
+    parser.add_argument("--manager", choices=["dynamic", "unified"], default="dynamic", help="使用的API管理器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-body-size", type=int, default=1024 * 1024, help="请求体大小上限（字节）")
+    parser.add_argument("--max-header-size", type=int, default=16 * 1024, help="请求头大小上限（字节）")
+    parser.add_argument("--keep-alive-timeout", type=float, default=15.0, help="空闲连接超时（秒）")
+    parser.add_argument("--max-pipeline-depth", type=int, default=16, help="单连接管线化请求上限")
+    parser.add_argument("--no-uvloop", action="store_true", help="禁用 uvloop")
+    args = parser.parse_args()
+
+    print("🚀 CodeStudio Pro Ultimate - API HTTP服务")
+    print("=" * 60)
+
+    run_server(
+        create_manager(args.manager),
+        use_uvloop=not args.no_uvloop,
+        host=args.host,
+        port=args.port,
+        max_body_size=args.max_body_size,
+        max_header_size=args.max_header_size,
+        keep_alive_timeout=args.keep_alive_timeout,
+        max_pipeline_depth=args.max_pipeline_depth,
+    )
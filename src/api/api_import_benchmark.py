@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 导入耗时基准测试
+使用 python -X importtime 测量API模块和命令行工具的冷启动导入耗时
+
+版本: 1.0
+作者: AI Assistant
+功能: 子进程多次导入测量、累计耗时中位数、自身耗时最高的依赖模块排行
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List
+
+# ============================================================================
+# 默认测量目标
+# ============================================================================
+
+API_DIR = Path(__file__).resolve().parent
+TOOLS_DIR = API_DIR.parent.parent / "tools"
+
+DEFAULT_MODULES = [
+    "unified_api_clean",
+    "dynamic_path_api_manager",
+    "api_test_framework",
+    "dynamic_path_test_framework",
+    "dynamic_path_migration_tool",
+    "functionality_integrity_validator",
+]
+
+# ============================================================================
+# importtime 解析
+# ============================================================================
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """解析 -X importtime 输出为 [{module, self_us, cumulative_us, depth}]"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            parts = line[len("import time:"):].split("|")
+            self_us, cumulative_us, raw_name = int(parts[0]), int(parts[1]), parts[2]
+        except (ValueError, IndexError):
+            continue
+        module = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip(" ")) - 1) // 2
+        entries.append({
+            "module": module,
+            "self_us": self_us,
+            "cumulative_us": cumulative_us,
+            "depth": depth
+        })
+    return entries
+
+
+def measure_import(module: str, runs: int = 5) -> Dict[str, Any]:
+    """在独立子进程中多次导入模块并汇总耗时"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(API_DIR), str(TOOLS_DIR)] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+    )
+
+    cumulative_samples = []
+    self_totals: Dict[str, List[int]] = {}
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, env=env, cwd=str(API_DIR)
+        )
+        if result.returncode != 0:
+            return {"module": module, "error": result.stderr.strip().splitlines()[-1:]}
+
+        entries = parse_importtime(result.stderr)
+        target = next((e for e in reversed(entries) if e["module"] == module and e["depth"] == 0), None)
+        if target is None:
+            return {"module": module, "error": ["未找到模块的导入记录"]}
+
+        cumulative_samples.append(target["cumulative_us"])
+        for entry in entries:
+            self_totals.setdefault(entry["module"], []).append(entry["self_us"])
+
+    top_modules = sorted(
+        ((name, statistics.median(values)) for name, values in self_totals.items()),
+        key=lambda item: item[1], reverse=True
+    )[:10]
+
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": round(statistics.median(cumulative_samples) / 1000, 2),
+        "min_ms": round(min(cumulative_samples) / 1000, 2),
+        "max_ms": round(max(cumulative_samples) / 1000, 2),
+        "top_self_time_ms": [(name, round(value / 1000, 2)) for name, value in top_modules]
+    }
+
+# ============================================================================
+# 主函数
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CodeStudio Pro Ultimate - 导入耗时基准测试")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="要测量的模块名")
+    parser.add_argument("--runs", type=int, default=5, help="每个模块的测量次数")
+    parser.add_argument("--top", type=int, default=5, help="显示自身耗时最高的依赖数量")
+    args = parser.parse_args()
+
+    print("🚀 CodeStudio Pro Ultimate - 导入耗时基准测试")
+    print("=" * 60)
+
+    for module_name in args.modules:
+        result = measure_import(module_name, runs=args.runs)
+        if "error" in result:
+            print(f"❌ {module_name}: {' '.join(result['error'])}")
+            continue
+        print(f"📦 {module_name}: 中位数 {result['median_ms']} ms "
+              f"(最小 {result['min_ms']} / 最大 {result['max_ms']})")
+        for name, value in result["top_self_time_ms"][:args.top]:
+            print(f"    {name}: {value} ms")
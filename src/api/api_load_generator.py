@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - API负载生成器
+针对 API HTTP 服务进行本地压力测试，统计吞吐量和延迟分布
+
+版本: 1.0
+作者: AI Assistant
+功能: Keep-Alive并发连接、加权端点混合、按时长或请求数压测、目标RPS定速发送、进程内直接调用、RPS与p50/p90/p99延迟统计
+"""
+
+import json
+import time
+import asyncio
+import argparse
+import threading
+from typing import Dict, Any, List, Optional, Tuple, Callable, Union
+
+from api_stats import percentile
+
+# 端点描述: (method, path, data) 或 (method, path, data, weight)
+EndpointSpec = Union[Tuple[str, str, Any], Tuple[str, str, Any, int]]
+
+# ============================================================================
+# 延迟统计
+# ============================================================================
+
+class LatencyRecorder:
+    """请求延迟与结果记录器"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.successful = 0
+        self.failed = 0
+        self.status_counts: Dict[str, int] = {}
+        self.endpoint_latencies: Dict[str, List[float]] = {}
+        self.endpoint_failures: Dict[str, int] = {}
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+
+    def record(self, latency: float, success: bool, status: Any, endpoint: Optional[str] = None):
+        """记录一次请求结果"""
+        self.latencies.append(latency)
+        if success:
+            self.successful += 1
+        else:
+            self.failed += 1
+        key = str(status)
+        self.status_counts[key] = self.status_counts.get(key, 0) + 1
+        if endpoint is not None:
+            self.endpoint_latencies.setdefault(endpoint, []).append(latency)
+            if not success:
+                self.endpoint_failures[endpoint] = self.endpoint_failures.get(endpoint, 0) + 1
+
+    def merge(self, other: "LatencyRecorder"):
+        """合并另一个记录器的结果（各工作线程独立记录，结束后汇总）"""
+        self.latencies.extend(other.latencies)
+        self.successful += other.successful
+        self.failed += other.failed
+        for key, count in other.status_counts.items():
+            self.status_counts[key] = self.status_counts.get(key, 0) + count
+        for endpoint, latencies in other.endpoint_latencies.items():
+            self.endpoint_latencies.setdefault(endpoint, []).extend(latencies)
+        for endpoint, count in other.endpoint_failures.items():
+            self.endpoint_failures[endpoint] = self.endpoint_failures.get(endpoint, 0) + count
+
+    def finish(self):
+        """标记压测结束"""
+        self.finished_at = time.perf_counter()
+
+    def summary(self) -> Dict[str, Any]:
+        """生成统计摘要（时间单位：秒）"""
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        ordered = sorted(self.latencies)
+        total = len(ordered)
+        return {
+            "total_requests": total,
+            "successful_requests": self.successful,
+            "failed_requests": self.failed,
+            "duration": round(elapsed, 4),
+            "requests_per_second": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+            "average_response_time": round(sum(ordered) / total, 6) if total else 0.0,
+            "min_response_time": round(ordered[0], 6) if total else 0.0,
+            "max_response_time": round(ordered[-1], 6) if total else 0.0,
+            "p50_response_time": round(percentile(ordered, 50), 6),
+            "p90_response_time": round(percentile(ordered, 90), 6),
+            "p99_response_time": round(percentile(ordered, 99), 6),
+            "status_counts": self.status_counts,
+            "endpoints": self._endpoint_summary(),
+        }
+
+    def _endpoint_summary(self) -> Dict[str, Any]:
+        """按端点的请求数、失败数与延迟分位"""
+        result = {}
+        for endpoint, latencies in self.endpoint_latencies.items():
+            ordered = sorted(latencies)
+            result[endpoint] = {
+                "requests": len(ordered),
+                "failed": self.endpoint_failures.get(endpoint, 0),
+                "average_response_time": round(sum(ordered) / len(ordered), 6),
+                "p50_response_time": round(percentile(ordered, 50), 6),
+                "p99_response_time": round(percentile(ordered, 99), 6),
+            }
+        return result
+
+# ============================================================================
+# 请求排程
+# ============================================================================
+
+class LoadSchedule:
+    """分配请求序号：固定请求数或持续时长，指定 target_rps 时按固定间隔排程
+
+    定速模式下延迟从计划发送时间算起，服务端变慢导致的排队等待也计入延迟，
+    避免只统计实际发出请求造成的协调遗漏（coordinated omission）。
+    """
+
+    def __init__(self, duration: float = 10.0, total_requests: Optional[int] = None,
+                 target_rps: Optional[float] = None):
+        self.duration = duration
+        self.total_requests = total_requests
+        self.target_rps = target_rps if target_rps and target_rps > 0 else None
+        self.started_at = time.perf_counter()
+        self.deadline = self.started_at + duration
+        self.issued = 0
+        self._lock = threading.Lock()
+
+    def next(self) -> Optional[Tuple[int, float]]:
+        """返回 (序号, 计划发送时间)，压测结束时返回 None"""
+        with self._lock:
+            if self.total_requests is not None:
+                if self.issued >= self.total_requests:
+                    return None
+            elif time.perf_counter() >= self.deadline:
+                return None
+            slot = self.issued
+            self.issued += 1
+
+        if self.target_rps is None:
+            return slot, time.perf_counter()
+        scheduled = self.started_at + slot / self.target_rps
+        if self.total_requests is None and scheduled >= self.deadline:
+            return None
+        return slot, scheduled
+
+
+def expand_endpoint_mix(endpoints: List[EndpointSpec]) -> List[Tuple[str, str, Any]]:
+    """按权重展开端点列表，各工作者按序号轮流选取"""
+    if not endpoints:
+        raise ValueError("端点列表不能为空")
+    mix = []
+    for spec in endpoints:
+        method, path, data = spec[:3]
+        weight = int(spec[3]) if len(spec) > 3 else 1
+        if weight < 0:
+            raise ValueError(f"端点权重不能为负: {method} {path}")
+        mix.extend([(method, path, data)] * weight)
+    if not mix:
+        raise ValueError("端点权重之和必须大于0")
+    return mix
+
+# ============================================================================
+# HTTP Keep-Alive 客户端
+# ============================================================================
+
+class HTTPLoadClient:
+    """单连接 Keep-Alive HTTP/1.1 客户端"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, data: Any = None) -> Tuple[int, Dict[str, Any]]:
+        """发送请求并返回 (状态码, 响应JSON)"""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8") if data is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"\r\n"
+        )
+        self._writer.write(head.encode("latin-1") + body)
+        await self._writer.drain()
+
+        raw_head = await self._reader.readuntil(b"\r\n\r\n")
+        lines = raw_head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            payload = await self._read_chunked()
+        else:
+            payload = await self._reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+
+        try:
+            if headers.get("content-type", "").startswith("application/x-ndjson"):
+                # NDJSON 流以分页信息行结尾
+                lines = payload.strip().splitlines()
+                return status, json.loads(lines[-1].decode("utf-8")) if lines else {}
+            return status, json.loads(payload.decode("utf-8")) if payload else {}
+        except ValueError:
+            return status, {}
+
+    async def _read_chunked(self) -> bytes:
+        """读取分块传输编码的响应体"""
+        parts = []
+        while True:
+            size_line = await self._reader.readuntil(b"\r\n")
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                await self._reader.readuntil(b"\r\n")
+                return b"".join(parts)
+            parts.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)
+
+    async def close(self):
+        """关闭连接"""
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+# ============================================================================
+# 压测执行
+# ============================================================================
+
+async def run_http_load(host: str, port: int, endpoints: List[EndpointSpec],
+                        concurrency: int = 32, duration: float = 10.0,
+                        total_requests: Optional[int] = None,
+                        target_rps: Optional[float] = None) -> Dict[str, Any]:
+    """对HTTP服务执行压测
+
+    endpoints 为 (method, path, data[, weight]) 列表，按权重展开后各连接轮流选取；
+    指定 total_requests 时发送固定数量请求，否则持续 duration 秒；
+    指定 target_rps 时按目标速率定速发送。
+    """
+    mix = expand_endpoint_mix(endpoints)
+    recorder = LatencyRecorder()
+    schedule = LoadSchedule(duration, total_requests, target_rps)
+
+    async def worker():
+        client = HTTPLoadClient(host, port)
+        try:
+            while True:
+                item = schedule.next()
+                if item is None:
+                    return
+                slot, scheduled = item
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                method, path, data = mix[slot % len(mix)]
+                endpoint = f"{method} {path}"
+                try:
+                    status, response = await client.request(method, path, data)
+                    recorder.record(time.perf_counter() - scheduled,
+                                    status < 400 and response.get("success", False), status, endpoint)
+                except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                    recorder.record(time.perf_counter() - scheduled, False, type(e).__name__, endpoint)
+                    await client.close()
+        finally:
+            await client.close()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    recorder.finish()
+    return recorder.summary()
+
+
+def run_http_load_blocking(host: str, port: int, endpoints: List[EndpointSpec], **options) -> Dict[str, Any]:
+    """在独立线程的新事件循环中执行 run_http_load 并等待结果
+
+    可以在任意上下文调用，包括已有事件循环运行的线程（例如 API 处理函数内部）。
+    """
+    result: Dict[str, Any] = {}
+
+    def target():
+        try:
+            result["summary"] = asyncio.run(run_http_load(host, port, endpoints, **options))
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target, name="http-load", daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["summary"]
+
+
+def run_inprocess_load(handle: Callable[[str, str, Any], Tuple[Any, bool]], endpoints: List[EndpointSpec],
+                       concurrency: int = 8, duration: float = 10.0,
+                       total_requests: Optional[int] = None,
+                       target_rps: Optional[float] = None) -> Dict[str, Any]:
+    """在进程内直接调用请求处理入口执行压测
+
+    handle(method, path, data) 返回 (状态, 是否成功)；concurrency 个线程并发调用，
+    各线程独立记录，结束后合并统计。
+    """
+    mix = expand_endpoint_mix(endpoints)
+    schedule = LoadSchedule(duration, total_requests, target_rps)
+    recorders = [LatencyRecorder() for _ in range(concurrency)]
+
+    def worker(recorder: LatencyRecorder):
+        while True:
+            item = schedule.next()
+            if item is None:
+                return
+            slot, scheduled = item
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            method, path, data = mix[slot % len(mix)]
+            endpoint = f"{method} {path}"
+            try:
+                status, success = handle(method, path, data)
+            except Exception as e:
+                status, success = type(e).__name__, False
+            recorder.record(time.perf_counter() - scheduled, success, status, endpoint)
+
+    threads = [threading.Thread(target=worker, args=(recorder,), name=f"load-{index}", daemon=True)
+               for index, recorder in enumerate(recorders)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    merged = LatencyRecorder()
+    merged.started_at = schedule.started_at
+    for recorder in recorders:
+        merged.merge(recorder)
+    merged.finish()
+    return merged.summary()
+
+
+def parse_endpoint_spec(spec: str) -> Tuple[str, str, Any, int]:
+    """解析端点描述，格式: [权重*]METHOD:/path[:JSON]"""
+    weight = 1
+    head, star, rest = spec.partition("*")
+    if star and head.isdigit():
+        weight, spec = int(head), rest
+    method, _, rest = spec.partition(":")
+    path, sep, raw_data = rest.partition(":{")
+    data = json.loads("{" + raw_data) if sep else None
+    return method.upper(), path, data, weight
+
+# ============================================================================
+# 主函数
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CodeStudio Pro Ultimate - API负载生成器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8180)
+    parser.add_argument("--concurrency", type=int, default=32, help="并发连接数")
+    parser.add_argument("--duration", type=float, default=10.0, help="压测时长（秒）")
+    parser.add_argument("--requests", type=int, default=None, help="固定请求总数（优先于时长）")
+    parser.add_argument("--rps", type=float, default=None, help="目标请求速率（默认不限速）")
+    parser.add_argument("--endpoint", action="append", default=None,
+                        help="端点，格式 [权重*]METHOD:/path[:JSON]，可重复指定")
+    args = parser.parse_args()
+
+    endpoint_specs = args.endpoint or ["GET:/api/status"]
+    result = asyncio.run(run_http_load(
+        args.host, args.port,
+        [parse_endpoint_spec(spec) for spec in endpoint_specs],
+        concurrency=args.concurrency,
+        duration=args.duration,
+        total_requests=args.requests,
+        target_rps=args.rps,
+    ))
+
+    print("🚀 CodeStudio Pro Ultimate - API负载测试")
+    print("=" * 60)
+    print(f"  请求总数: {result['total_requests']} (失败 {result['failed_requests']})")
+    print(f"  吞吐量: {result['requests_per_second']} 请求/秒")
+    print(f"  平均延迟: {result['average_response_time'] * 1000:.2f} ms")
+    print(f"  p50/p90/p99: {result['p50_response_time'] * 1000:.2f} / "
+          f"{result['p90_response_time'] * 1000:.2f} / {result['p99_response_time'] * 1000:.2f} ms")
+    print(f"  状态码分布: {result['status_counts']}")
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 后台批量日志写入器
+将API调用日志从请求线程移到后台线程批量写入
+
+版本: 1.0
+作者: AI Assistant
+功能: 有界队列、按条数/时间间隔批量刷写、丢弃或阻塞背压策略、丢弃计数、退出时自动刷写、
+      按大小/时间滚动、保留数量限制、后台gzip压缩
+特色: 日志文件保持打开，请求线程只负责序列化和入队；滚动只发生在写入线程的批次之间；
+      同一日志文件的写入器在进程内共享（引用计数），滚动与大小统计不会互相冲突
+"""
+
+import os
+import re
+import gzip
+import json
+import time
+import queue
+import atexit
+import shutil
+import threading
+import weakref
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+# ============================================================================
+# 溢出策略
+# ============================================================================
+
+OVERFLOW_DROP_NEWEST = "drop_newest"   # 队列已满时丢弃新日志
+OVERFLOW_DROP_OLDEST = "drop_oldest"   # 队列已满时丢弃最旧的日志
+OVERFLOW_BLOCK = "block"               # 队列已满时阻塞请求线程，超时后丢弃
+
+OVERFLOW_POLICIES = (OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK)
+
+# 停止信号
+_STOP = object()
+
+# 进程退出时需要刷写的写入器
+_active_writers: "weakref.WeakSet" = weakref.WeakSet()
+
+# 共享写入器注册表：解析后的日志文件路径 -> 写入器
+_shared_writers: Dict[str, "BackgroundLogWriter"] = {}
+_shared_lock = threading.Lock()
+
+# ============================================================================
+# 后台日志写入器
+# ============================================================================
+
+class BackgroundLogWriter:
+    """后台批量日志写入器
+
+    write() 在调用线程中将日志序列化为JSON行并放入有界队列；后台线程取出日志，
+    累积到 batch_size 条或等待 flush_interval 秒后一次性写入并刷新文件。
+
+    文件超过 max_bytes 或打开时间超过 rotate_interval 秒时，在写入下一批之前
+    将当前文件原子重命名为 <名称>.<时间戳><后缀> 并重新打开；compress 为 True 时
+    由后台线程压缩为 .gz，最多保留 backup_count 个历史分段。max_bytes 或
+    rotate_interval 为 0 表示禁用对应的滚动条件。
+    """
+
+    def __init__(self, log_file: Path, max_queue_size: int = 10000, batch_size: int = 256,
+                 flush_interval: float = 0.5, overflow_policy: str = OVERFLOW_DROP_NEWEST,
+                 block_timeout: float = 1.0, max_bytes: int = 50 * 1024 * 1024,
+                 rotate_interval: float = 24 * 3600, backup_count: int = 10, compress: bool = True):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"未知的溢出策略: {overflow_policy}")
+
+        self.log_file = Path(log_file)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.compress = compress
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._file = None
+        self._file_size = 0
+        self._next_rollover: Optional[float] = None
+        self._closed = False
+        # 经 acquire_log_writer 获取时的注册键与引用计数
+        self._shared_key: Optional[str] = None
+        self._references = 0
+        self._compress_threads: List[threading.Thread] = []
+        # 同一秒内多次滚动时使用递增序号，保证分段名称按滚动顺序排列
+        self._last_rollover_stamp = ""
+        self._rollover_sequence = 0
+        self._retention_lock = threading.Lock()
+        self._segment_pattern = re.compile(
+            rf"^{re.escape(self.log_file.stem)}\.(\d{{8}}-\d{{6}})(?:-(\d+))?{re.escape(self.log_file.suffix)}(?:\.gz)?$"
+        )
+
+        self.stats = {
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "write_errors": 0,
+            "queue_high_watermark": 0,
+            "rotations": 0,
+            "compressed_segments": 0,
+            "deleted_segments": 0,
+        }
+
+    # ------------------------------------------------------------------------
+    # 请求线程接口
+    # ------------------------------------------------------------------------
+
+    def write(self, entry: Dict[str, Any]) -> bool:
+        """序列化并入队一条日志，返回是否入队成功"""
+        if self._closed:
+            self.stats["dropped"] += 1
+            return False
+
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        self._ensure_started()
+
+        try:
+            if self.overflow_policy == OVERFLOW_BLOCK:
+                self._queue.put(line, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(line)
+        except queue.Full:
+            if self.overflow_policy != OVERFLOW_DROP_OLDEST:
+                self.stats["dropped"] += 1
+                return False
+            # 腾出一个位置给最新的日志
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self.stats["dropped"] += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(line)
+            except queue.Full:
+                self.stats["dropped"] += 1
+                return False
+
+        size = self._queue.qsize()
+        if size > self.stats["queue_high_watermark"]:
+            self.stats["queue_high_watermark"] = size
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """等待已入队日志全部写入文件，返回是否在超时前完成"""
+        if self._thread is None:
+            return True
+
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """停止后台线程，写出剩余日志并关闭文件
+
+        共享写入器只减少引用计数，最后一个持有者关闭时才真正停止。
+        """
+        if self._shared_key is not None:
+            with _shared_lock:
+                self._references -= 1
+                if self._references > 0:
+                    return
+                if _shared_writers.get(self._shared_key) is self:
+                    del _shared_writers[self._shared_key]
+        self._shutdown(timeout)
+
+    def _shutdown(self, timeout: float = 5.0):
+        """停止后台线程，写出剩余日志并关闭文件（忽略引用计数）"""
+        if self._closed:
+            return
+        self._closed = True
+
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            thread.join(timeout)
+
+        # 等待后台压缩完成
+        for compress_thread in list(self._compress_threads):
+            compress_thread.join(timeout)
+        _active_writers.discard(self)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取写入统计"""
+        return {
+            **self.stats,
+            "queued": self._queue.qsize(),
+            "max_queue_size": self._queue.maxsize,
+            "overflow_policy": self.overflow_policy,
+            "log_file": str(self.log_file),
+            "current_size": self._file_size,
+            "max_bytes": self.max_bytes,
+            "rotate_interval": self.rotate_interval,
+            "backup_count": self.backup_count,
+            "references": self._references
+        }
+
+    # ------------------------------------------------------------------------
+    # 后台线程
+    # ------------------------------------------------------------------------
+
+    def _ensure_started(self):
+        """首次写入时启动后台线程"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name=f"log-writer:{self.log_file.name}", daemon=True)
+                thread.start()
+                self._thread = thread
+                _active_writers.add(self)
+
+    def _run(self):
+        """后台写入循环"""
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = []
+            if first is _STOP:
+                stopping = True
+            else:
+                batch.append(first)
+
+            # 在刷写间隔内尽量凑满一批
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            # 停止时写出队列中剩余的日志
+            if stopping:
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        batch.append(item)
+                    else:
+                        self._queue.task_done()
+
+            self._write_batch(batch)
+            # 停止信号本身也占用一次 task_done
+            for _ in range(len(batch) + (1 if stopping else 0)):
+                self._queue.task_done()
+
+        self._close_file()
+
+    def _write_batch(self, batch):
+        """写入一批日志"""
+        if not batch:
+            return
+        try:
+            data = ''.join(batch).encode('utf-8')
+            if self._file is None:
+                self._open_file()
+            if self._should_rollover(len(data)):
+                self._rollover()
+            self._file.write(data)
+            self._file.flush()
+            self._file_size += len(data)
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+        except Exception:
+            # 写入失败时丢弃本批日志，下次重新打开文件
+            self.stats["write_errors"] += 1
+            self.stats["dropped"] += len(batch)
+            self._close_file()
+
+    def _open_file(self):
+        """以追加模式打开日志文件"""
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.log_file, 'ab')
+        self._file_size = self._file.seek(0, os.SEEK_END)
+        if self.rotate_interval:
+            self._next_rollover = time.time() + self.rotate_interval
+
+    def _should_rollover(self, incoming: int) -> bool:
+        """判断写入下一批前是否需要滚动"""
+        if self._file_size <= 0:
+            return False
+        if self.max_bytes and self._file_size + incoming > self.max_bytes:
+            return True
+        if self._next_rollover is not None and time.time() >= self._next_rollover:
+            return True
+        return False
+
+    def _rollover(self):
+        """滚动日志：关闭当前文件，原子重命名为历史分段，然后重新打开"""
+        self._close_file()
+
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        if timestamp == self._last_rollover_stamp:
+            self._rollover_sequence += 1
+        else:
+            self._last_rollover_stamp = timestamp
+            self._rollover_sequence = 0
+
+        while True:
+            sequence = f"-{self._rollover_sequence}" if self._rollover_sequence else ""
+            segment = self.log_file.with_name(f"{self.log_file.stem}.{timestamp}{sequence}{self.log_file.suffix}")
+            if not segment.exists() and not segment.with_name(segment.name + ".gz").exists():
+                break
+            self._rollover_sequence += 1
+
+        os.replace(self.log_file, segment)
+        self.stats["rotations"] += 1
+        self._open_file()
+
+        if self.compress:
+            thread = threading.Thread(target=self._compress_segment, args=(segment,),
+                                      name=f"log-compress:{segment.name}", daemon=True)
+            self._compress_threads = [t for t in self._compress_threads if t.is_alive()]
+            self._compress_threads.append(thread)
+            thread.start()
+        else:
+            self._apply_retention()
+
+    def _compress_segment(self, segment: Path):
+        """后台压缩历史分段：先写临时文件再原子替换，最后删除原分段"""
+        target = segment.with_name(segment.name + ".gz")
+        temp = segment.with_name(segment.name + ".gz.tmp")
+        try:
+            with open(segment, 'rb') as source, gzip.open(temp, 'wb') as destination:
+                shutil.copyfileobj(source, destination)
+            os.replace(temp, target)
+            segment.unlink()
+            self.stats["compressed_segments"] += 1
+        except Exception:
+            # 压缩失败时保留未压缩分段
+            try:
+                temp.unlink()
+            except OSError:
+                pass
+        self._apply_retention()
+
+    def list_segments(self) -> List[Path]:
+        """列出历史分段（按滚动时间从旧到新排序）"""
+        try:
+            segments = [path for path in self.log_file.parent.iterdir() if self._segment_pattern.match(path.name)]
+        except OSError:
+            return []
+        return sorted(segments, key=self._segment_order)
+
+    def _segment_order(self, path: Path):
+        """历史分段排序键：(时间戳, 同一秒内的序号)"""
+        match = self._segment_pattern.match(path.name)
+        return match.group(1), int(match.group(2) or 0)
+
+    def _apply_retention(self):
+        """删除超出保留数量的最旧历史分段"""
+        with self._retention_lock:
+            segments = self.list_segments()
+            # 同一分段在压缩过程中可能同时存在原始文件和 .gz 文件，按排序键去重
+            keys = sorted({self._segment_order(path) for path in segments})
+            expired = set(keys[:-self.backup_count]) if self.backup_count > 0 else set(keys)
+            for path in segments:
+                if self._segment_order(path) in expired:
+                    try:
+                        path.unlink()
+                        self.stats["deleted_segments"] += 1
+                    except OSError:
+                        pass
+
+    def _close_file(self):
+        """关闭日志文件"""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+
+# ============================================================================
+# 共享写入器
+# ============================================================================
+
+def acquire_log_writer(log_file: Path, **options) -> BackgroundLogWriter:
+    """获取日志文件的共享写入器
+
+    同一进程内写同一文件（按解析后的绝对路径判断）的所有日志记录器共用一个写入器，
+    避免一个写入器滚动文件后其他写入器继续写入已重命名的文件。options 只在首次创建时生效。
+    每次获取增加引用计数，持有者用完后调用 close()。
+    """
+    key = str(Path(log_file).resolve())
+    with _shared_lock:
+        writer = _shared_writers.get(key)
+        if writer is None or writer._closed:
+            writer = BackgroundLogWriter(Path(key), **options)
+            writer._shared_key = key
+            _shared_writers[key] = writer
+        writer._references += 1
+        return writer
+
+# ============================================================================
+# 进程退出处理
+# ============================================================================
+
+def close_all_writers(timeout: float = 5.0):
+    """关闭所有活动的写入器（进程退出时自动调用，忽略引用计数）"""
+    for writer in list(_active_writers):
+        writer._shutdown(timeout)
+
+
+atexit.register(close_all_writers)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - API指标采集
+为统一API管理器提供按端点的延迟直方图、在途请求数和错误计数，并以Prometheus文本格式导出
+
+版本: 1.0
+作者: AI Assistant
+功能: 固定分桶延迟直方图、在途请求仪表、错误计数、自定义采集器、Prometheus文本导出
+特色: 每个线程写入独立分片，记录路径上不加锁，只在抓取时合并；已退出线程的分片并入汇总分片后释放
+"""
+
+import bisect
+import weakref
+import threading
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+from api_response import http_status_for
+
+# ============================================================================
+# 常量
+# ============================================================================
+
+# 默认延迟分桶（秒）
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# 未匹配到路由的请求使用的路径标签，避免任意路径造成标签基数膨胀
+UNMATCHED_PATH = "__unmatched__"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ============================================================================
+# 线程分片
+# ============================================================================
+
+class _Histogram:
+    """单个标签组合的直方图（非累计分桶计数）"""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class _Shard:
+    """单个线程的指标分片"""
+
+    __slots__ = ("histograms", "in_flight", "errors", "owner")
+
+    def __init__(self, owner: Optional[threading.Thread] = None):
+        self.histograms: Dict[Tuple[str, str, str], _Histogram] = {}
+        self.in_flight: Dict[Tuple[str, str], int] = {}
+        self.errors: Dict[Tuple[str, str, str], int] = {}
+        # 所属线程（弱引用），线程退出后分片不再被写入，可以并入汇总分片
+        self.owner = weakref.ref(owner) if owner is not None else None
+
+    def is_retired(self) -> bool:
+        """所属线程是否已退出"""
+        if self.owner is None:
+            return False
+        thread = self.owner()
+        return thread is None or not thread.is_alive()
+
+    def merge_from(self, other: "_Shard"):
+        """将另一个分片的计数累加到本分片"""
+        for key, histogram in other.histograms.items():
+            merged = self.histograms.get(key)
+            if merged is None:
+                merged = self.histograms[key] = _Histogram(len(histogram.counts) - 1)
+            for index, value in enumerate(histogram.counts):
+                merged.counts[index] += value
+            merged.total += histogram.total
+            merged.count += histogram.count
+        for key, value in other.in_flight.items():
+            self.in_flight[key] = self.in_flight.get(key, 0) + value
+        for key, value in other.errors.items():
+            self.errors[key] = self.errors.get(key, 0) + value
+
+# ============================================================================
+# API指标
+# ============================================================================
+
+class APIMetrics:
+    """API请求指标
+
+    - <namespace>_request_duration_seconds: 按 (path, method, status) 的延迟直方图
+    - <namespace>_requests_in_flight: 按 (path, method) 的在途请求数
+    - <namespace>_errors_total: 按 (path, method, code) 的错误响应计数
+
+    path 标签使用路由模式（如 /api/instances/{instance_id}/status），未匹配的请求记为 __unmatched__。
+    """
+
+    def __init__(self, namespace: str = "codestudio_api", buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # 已退出线程的分片合并后的汇总（只在持有 _shards_lock 时修改）
+        self._retired = _Shard()
+        self._shards_lock = threading.Lock()
+        self._collectors: List[Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]] = []
+
+    # ------------------------------------------------------------------------
+    # 记录
+    # ------------------------------------------------------------------------
+
+    def request_started(self, path: Optional[str], method: str):
+        """记录请求开始处理（在途请求 +1）"""
+        key = (path or UNMATCHED_PATH, method)
+        in_flight = self._shard().in_flight
+        in_flight[key] = in_flight.get(key, 0) + 1
+
+    def request_finished(self, path: Optional[str], method: str, response: Any,
+                         duration: float, started: bool = False):
+        """记录请求完成：延迟、错误计数，并在 started 时减少在途请求数"""
+        shard = self._shard()
+        path = path or UNMATCHED_PATH
+
+        if started:
+            key = (path, method)
+            shard.in_flight[key] = shard.in_flight.get(key, 0) - 1
+
+        status = str(http_status_for(response))
+        histogram_key = (path, method, status)
+        histogram = shard.histograms.get(histogram_key)
+        if histogram is None:
+            histogram = shard.histograms[histogram_key] = _Histogram(len(self.buckets))
+        histogram.counts[bisect.bisect_left(self.buckets, duration)] += 1
+        histogram.total += duration
+        histogram.count += 1
+
+        if isinstance(response, dict) and not response.get("success", True):
+            code = (response.get("error") or {}).get("code") or "UNKNOWN_ERROR"
+            error_key = (path, method, code)
+            shard.errors[error_key] = shard.errors.get(error_key, 0) + 1
+
+    def add_collector(self, collector: Callable):
+        """注册额外指标采集器
+
+        采集器返回 [(指标名, 类型, 说明, [(标签字典, 数值), ...]), ...]，指标名会自动加上命名空间前缀。
+        """
+        self._collectors.append(collector)
+
+    def _shard(self) -> _Shard:
+        """获取当前线程的分片"""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._shards_lock:
+                # 新线程出现时顺带回收已退出线程的分片，分片数量不随线程创建次数增长
+                self._retire_shards()
+                self._shards.append(shard)
+        return shard
+
+    def _retire_shards(self):
+        """将已退出线程的分片并入汇总分片并移除（调用方持有 _shards_lock）"""
+        live = []
+        for shard in self._shards:
+            if shard.is_retired():
+                self._retired.merge_from(shard)
+            else:
+                live.append(shard)
+        self._shards = live
+
+    # ------------------------------------------------------------------------
+    # 导出
+    # ------------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """合并所有线程分片"""
+        with self._shards_lock:
+            self._retire_shards()
+            retired = _Shard()
+            retired.merge_from(self._retired)
+            shards = [retired] + self._shards
+
+        histograms: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        in_flight: Dict[Tuple[str, str], int] = {}
+        errors: Dict[Tuple[str, str, str], int] = {}
+
+        for shard in shards:
+            for key, histogram in list(shard.histograms.items()):
+                merged = histograms.setdefault(key, {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0})
+                for index, value in enumerate(histogram.counts):
+                    merged["counts"][index] += value
+                merged["sum"] += histogram.total
+                merged["count"] += histogram.count
+            for key, value in list(shard.in_flight.items()):
+                in_flight[key] = in_flight.get(key, 0) + value
+            for key, value in list(shard.errors.items()):
+                errors[key] = errors.get(key, 0) + value
+
+        return {"histograms": histograms, "in_flight": in_flight, "errors": errors}
+
+    def render_prometheus(self) -> str:
+        """以Prometheus文本格式导出全部指标"""
+        snapshot = self.snapshot()
+        prefix = self.namespace
+        lines: List[str] = []
+
+        name = f"{prefix}_request_duration_seconds"
+        lines.append(f"# HELP {name} API请求处理耗时")
+        lines.append(f"# TYPE {name} histogram")
+        for (path, method, status), histogram in sorted(snapshot["histograms"].items()):
+            labels = {"path": path, "method": method, "status": status}
+            cumulative = 0
+            for bound, value in zip(self.buckets, histogram["counts"]):
+                cumulative += value
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            cumulative += histogram["counts"][-1]
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+
+        name = f"{prefix}_requests_in_flight"
+        lines.append(f"# HELP {name} 正在处理的API请求数")
+        lines.append(f"# TYPE {name} gauge")
+        for (path, method), value in sorted(snapshot["in_flight"].items()):
+            lines.append(f"{name}{_format_labels({'path': path, 'method': method})} {value}")
+
+        name = f"{prefix}_errors_total"
+        lines.append(f"# HELP {name} 返回错误的API请求数")
+        lines.append(f"# TYPE {name} counter")
+        for (path, method, code), value in sorted(snapshot["errors"].items()):
+            lines.append(f"{name}{_format_labels({'path': path, 'method': method, 'code': code})} {value}")
+
+        for collector in self._collectors:
+            try:
+                families = collector()
+            except Exception:
+                continue
+            for metric_name, metric_type, help_text, samples in families:
+                name = f"{prefix}_{metric_name}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+# ============================================================================
+# 格式化辅助函数
+# ============================================================================
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """格式化标签集合"""
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    """格式化样本数值"""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - API与路径热点微基准测试
+对请求分发、日志记录、项目信息、目录结构和文件查找做可重复的微基准测量，并与基准结果对比
+
+版本: 1.0
+作者: AI Assistant
+功能: 预热 + 多次重复测量、自动校准单样本循环次数、统计汇总、基准JSON保存、回归对比
+特色: 对比使用 Mann-Whitney U 检验，只有统计显著且超过阈值的变慢才判定为回归
+"""
+
+import gc
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from datetime import datetime
+from contextlib import ExitStack
+from typing import Dict, Any, List, Optional, Callable
+
+from api_stats import percentile
+
+# ============================================================================
+# 默认参数
+# ============================================================================
+
+DEFAULT_WARMUP = 5
+DEFAULT_REPETITIONS = 50
+# 每个用例的测量时间上限（秒），达到后停止重复，但至少保留 MIN_SAMPLES 个样本
+DEFAULT_MAX_TIME = 5.0
+MIN_SAMPLES = 5
+# 单个样本的最短耗时（秒），单次调用更快时在一个样本内循环多次
+DEFAULT_MIN_SAMPLE_TIME = 0.001
+
+# 合成目录树的文件数
+DEFAULT_TREE_SIZES = (1000, 10000, 100000)
+
+# 回归判定：显著性水平与中位数变慢比例阈值
+DEFAULT_ALPHA = 0.01
+DEFAULT_THRESHOLD = 0.05
+
+RESULT_FORMAT_VERSION = 1
+
+# ============================================================================
+# 测量与统计
+# ============================================================================
+
+class BenchmarkCase:
+    """基准测试用例"""
+
+    def __init__(self, name: str, func: Callable[[], Any], group: str, params: Dict[str, Any] = None):
+        self.name = name
+        self.func = func
+        self.group = group
+        self.params = params or {}
+
+
+def calibrate_loops(func: Callable[[], Any], min_sample_time: float) -> int:
+    """确定单个样本内的循环次数，使样本耗时不低于 min_sample_time"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_time or loops >= 1 << 20:
+            return loops
+        # 按实测耗时估算，至少翻倍
+        loops = max(loops * 2, int(loops * min_sample_time / max(elapsed, 1e-9)) + 1)
+
+
+def measure(func: Callable[[], Any], warmup: int = DEFAULT_WARMUP, repetitions: int = DEFAULT_REPETITIONS,
+            max_time: float = DEFAULT_MAX_TIME, min_sample_time: float = DEFAULT_MIN_SAMPLE_TIME) -> Dict[str, Any]:
+    """预热后重复测量，返回每次调用的耗时样本（秒）"""
+    for _ in range(warmup):
+        func()
+    loops = calibrate_loops(func, min_sample_time)
+
+    samples: List[float] = []
+    deadline = time.perf_counter() + max_time
+    gc_enabled = gc.isenabled()
+    try:
+        while len(samples) < repetitions:
+            # 与 timeit 相同，计时期间关闭垃圾回收以降低噪声
+            gc.disable()
+            start = time.perf_counter()
+            for _ in range(loops):
+                func()
+            elapsed = time.perf_counter() - start
+            if gc_enabled:
+                gc.enable()
+            samples.append(elapsed / loops)
+            if len(samples) >= MIN_SAMPLES and time.perf_counter() > deadline:
+                break
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {"loops": loops, "samples": samples}
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """统计汇总（单位: 微秒）"""
+    ordered = sorted(samples)
+    count = len(ordered)
+    mean = statistics.fmean(ordered)
+    stdev = statistics.stdev(ordered) if count > 1 else 0.0
+    to_us = lambda value: round(value * 1e6, 3)
+    return {
+        "count": count,
+        "mean_us": to_us(mean),
+        "median_us": to_us(statistics.median(ordered)),
+        "stdev_us": to_us(stdev),
+        "min_us": to_us(ordered[0]),
+        "max_us": to_us(ordered[-1]),
+        "p95_us": to_us(percentile(ordered, 95)),
+        "p99_us": to_us(percentile(ordered, 99)),
+        "iqr_us": to_us(percentile(ordered, 75) - percentile(ordered, 25)),
+        # 均值的95%置信区间半宽（正态近似）
+        "ci95_us": to_us(1.96 * stdev / math.sqrt(count)) if count > 1 else 0.0,
+        "rsd_percent": round(stdev / mean * 100, 2) if mean else 0.0
+    }
+
+
+def mann_whitney_u(baseline: List[float], current: List[float]) -> float:
+    """Mann-Whitney U 检验（正态近似，含并列校正），返回双侧 p 值"""
+    n1, n2 = len(baseline), len(current)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variance)
+    return min(1.0, 2 * (1 - statistics.NormalDist().cdf(max(z, 0.0))))
+
+# ============================================================================
+# 基准测试用例
+# ============================================================================
+
+def _suppress_output(func: Callable[[], Any]) -> Any:
+    """执行时屏蔽标准输出（管理器初始化会打印提示）"""
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func()
+
+
+def build_core_cases(stack: ExitStack, workdir: Path) -> List[BenchmarkCase]:
+    """请求分发、日志记录与项目信息用例"""
+    from unified_api_clean import UnifiedAPIManager, APILogger
+    from dynamic_path_api_manager import DynamicPathManager, DynamicPathUnifiedAPIManager, DynamicPathAPILogger
+
+    unified = _suppress_output(UnifiedAPIManager)
+    stack.callback(unified.shutdown)
+    dynamic = _suppress_output(lambda: DynamicPathUnifiedAPIManager(watch_paths=False))
+    stack.callback(dynamic.shutdown)
+
+    # 请求日志写入临时目录，基准测试不向项目的 api_calls.log 追加条目
+    unified.logger.close()
+    unified.logger = APILogger(str(workdir / "unified_api_calls.log"))
+    dynamic.logger.close()
+    dynamic.logger = DynamicPathAPILogger(dynamic.path_manager, log_file=str(workdir / "dynamic_api_calls.log"))
+
+    def uncached_path_info():
+        # /api/path-info 带响应缓存，每次先清除缓存以测量完整的处理路径
+        dynamic.response_cache.invalidate("/api/path-info")
+        return dynamic.handle_request("/api/path-info", "GET")
+
+    logger = APILogger(str(workdir / "benchmark_api_calls.log"))
+    stack.callback(logger.close)
+    log_entry = {
+        "timestamp": datetime.now().isoformat(),
+        "type": "REQUEST",
+        "endpoint": "/api/status",
+        "method": "GET",
+        "data": {"benchmark": True}
+    }
+
+    path_manager = DynamicPathManager()
+
+    return [
+        BenchmarkCase("unified.handle_request GET /api/status", lambda: unified.handle_request("/api/status", "GET"),
+                      "dispatch"),
+        BenchmarkCase("unified.handle_request GET /api/nonexistent",
+                      lambda: unified.handle_request("/api/nonexistent", "GET"), "dispatch"),
+        BenchmarkCase("dynamic.handle_request GET /api/status", lambda: dynamic.handle_request("/api/status", "GET"),
+                      "dispatch"),
+        BenchmarkCase("dynamic.handle_request GET /api/path-info (uncached)", uncached_path_info, "dispatch"),
+        BenchmarkCase("dynamic.handle_request GET /api/nonexistent",
+                      lambda: dynamic.handle_request("/api/nonexistent", "GET"), "dispatch"),
+        BenchmarkCase("APILogger._write_log", lambda: logger._write_log(log_entry), "logging"),
+        BenchmarkCase("DynamicPathManager.get_project_info", path_manager.get_project_info, "paths"),
+    ]
+
+
+def build_tree_cases(stack: ExitStack, workdir: Path, file_count: int) -> List[BenchmarkCase]:
+    """合成目录树上的目录结构与文件查找用例"""
+    from directory_walker import create_synthetic_tree
+    from project_root_resolver import PROJECT_ROOT_ENV_VAR
+    from dynamic_path_api_manager import DynamicPathManager, DynamicPathUnifiedAPIManager
+
+    root = workdir / f"tree-{file_count}"
+    root.mkdir()
+    created = create_synthetic_tree(root, file_count)
+
+    # 通过环境变量把路径管理器指向合成目录树，创建完成后立即恢复
+    previous = os.environ.get(PROJECT_ROOT_ENV_VAR)
+    os.environ[PROJECT_ROOT_ENV_VAR] = str(root)
+    try:
+        path_manager = DynamicPathManager()
+    finally:
+        if previous is None:
+            os.environ.pop(PROJECT_ROOT_ENV_VAR, None)
+        else:
+            os.environ[PROJECT_ROOT_ENV_VAR] = previous
+    stack.callback(DynamicPathManager.clear_path_cache)
+
+    api_manager = _suppress_output(lambda: DynamicPathUnifiedAPIManager(watch_paths=False))
+    stack.callback(api_manager.shutdown)
+
+    params = {"files": file_count, "entries": created}
+    cases = [
+        BenchmarkCase(f"_get_directory_structure depth=4 [{file_count}]",
+                      lambda: api_manager._get_directory_structure(root, max_depth=4), "tree", params),
+    ]
+    for pattern in ("**/file-7.txt", "top-0/**/*.txt"):
+        for use_index in (True, False):
+            mode = "index" if use_index else "live"
+            cases.append(BenchmarkCase(
+                f"find_files[{mode}] {pattern} [{file_count}]",
+                lambda pattern=pattern, use_index=use_index: path_manager.find_files(pattern, use_index=use_index),
+                "find_files", dict(params, pattern=pattern, mode=mode)
+            ))
+    return cases
+
+
+def run_suite(sizes: List[int] = DEFAULT_TREE_SIZES, warmup: int = DEFAULT_WARMUP,
+              repetitions: int = DEFAULT_REPETITIONS, max_time: float = DEFAULT_MAX_TIME,
+              min_sample_time: float = DEFAULT_MIN_SAMPLE_TIME, name_filter: Optional[str] = None,
+              verbose: bool = True) -> Dict[str, Any]:
+    """运行全部基准测试，返回可保存为基准的结果"""
+    workdir = Path(tempfile.mkdtemp(prefix="codestudio-bench-"))
+    results: Dict[str, Any] = {}
+
+    def run_cases(cases: List[BenchmarkCase]):
+        for case in cases:
+            if name_filter and name_filter not in case.name:
+                continue
+            measured = measure(case.func, warmup, repetitions, max_time, min_sample_time)
+            summary = summarize(measured["samples"])
+            results[case.name] = {
+                "group": case.group,
+                "params": case.params,
+                "loops": measured["loops"],
+                "summary": summary,
+                "samples_us": [round(value * 1e6, 3) for value in measured["samples"]]
+            }
+            if verbose:
+                print(f"  {case.name}: 中位数 {summary['median_us']} µs ± {summary['iqr_us']} "
+                      f"(p95 {summary['p95_us']}, n={summary['count']}×{measured['loops']})")
+
+    try:
+        with ExitStack() as stack:
+            if verbose:
+                print("📊 请求分发 / 日志 / 项目信息")
+            run_cases(build_core_cases(stack, workdir))
+
+        for file_count in sizes:
+            with ExitStack() as stack:
+                if verbose:
+                    print(f"📁 合成目录树: {file_count} 个文件")
+                run_cases(build_tree_cases(stack, workdir, file_count))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "format_version": RESULT_FORMAT_VERSION,
+        "timestamp": datetime.now().isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "settings": {
+            "warmup": warmup,
+            "repetitions": repetitions,
+            "max_time": max_time,
+            "min_sample_time": min_sample_time,
+            "tree_sizes": list(sizes)
+        },
+        "results": results
+    }
+
+# ============================================================================
+# 基准对比
+# ============================================================================
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], alpha: float = DEFAULT_ALPHA,
+                    threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+    """与基准结果对比
+
+    中位数变慢超过 threshold 且 Mann-Whitney U 检验 p < alpha 时判定为回归，
+    中位数变快超过 threshold 且显著时判定为改进，其余为无显著变化。
+    """
+    comparisons = []
+    for name, entry in current["results"].items():
+        base_entry = baseline.get("results", {}).get(name)
+        if base_entry is None:
+            comparisons.append({"name": name, "status": "new"})
+            continue
+
+        base_median = base_entry["summary"]["median_us"]
+        current_median = entry["summary"]["median_us"]
+        ratio = current_median / base_median if base_median else float("inf")
+        p_value = mann_whitney_u(base_entry["samples_us"], entry["samples_us"])
+
+        status = "unchanged"
+        if p_value < alpha and ratio > 1 + threshold:
+            status = "regression"
+        elif p_value < alpha and ratio < 1 - threshold:
+            status = "improvement"
+
+        comparisons.append({
+            "name": name,
+            "status": status,
+            "baseline_median_us": base_median,
+            "current_median_us": current_median,
+            "change_percent": round((ratio - 1) * 100, 2),
+            "p_value": round(p_value, 6)
+        })
+
+    missing = [name for name in baseline.get("results", {}) if name not in current["results"]]
+    counts: Dict[str, int] = {}
+    for item in comparisons:
+        counts[item["status"]] = counts.get(item["status"], 0) + 1
+
+    return {
+        "alpha": alpha,
+        "threshold_percent": threshold * 100,
+        "counts": counts,
+        "regressions": [item["name"] for item in comparisons if item["status"] == "regression"],
+        "missing": missing,
+        "comparisons": comparisons
+    }
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """读取基准结果文件"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results: Dict[str, Any], path: str):
+    """保存基准结果文件"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+# ============================================================================
+# 主函数
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CodeStudio Pro Ultimate - API与路径热点微基准测试")
+    parser.add_argument("--save", metavar="FILE", help="保存本次结果（可作为基准）")
+    parser.add_argument("--compare", metavar="BASELINE", help="与基准结果对比，存在回归时退出码为1")
+    parser.add_argument("--current", metavar="FILE", help="对比时使用已保存的结果，不重新运行")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_TREE_SIZES), help="合成目录树的文件数")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="每个用例的预热次数")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS, help="每个用例的样本数")
+    parser.add_argument("--max-time", type=float, default=DEFAULT_MAX_TIME, help="每个用例的测量时间上限（秒）")
+    parser.add_argument("--filter", help="只运行名称包含该字符串的用例")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="回归判定的显著性水平")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="回归判定的中位数变慢比例阈值")
+    args = parser.parse_args()
+
+    print("🚀 CodeStudio Pro Ultimate - API与路径热点微基准测试")
+    print("=" * 60)
+
+    if args.current:
+        current_results = load_results(args.current)
+    else:
+        current_results = run_suite(args.sizes, args.warmup, args.repetitions, args.max_time,
+                                    name_filter=args.filter)
+    if args.save:
+        save_results(current_results, args.save)
+        print(f"📄 基准结果已保存: {args.save}")
+
+    if args.compare:
+        report = compare_results(load_results(args.compare), current_results, args.alpha, args.threshold)
+        print("=" * 60)
+        print(f"🔍 与基准对比 (p < {args.alpha}，变化超过 {args.threshold * 100:g}%)")
+        icons = {"regression": "❌", "improvement": "🚀", "unchanged": "✅", "new": "🆕"}
+        for item in report["comparisons"]:
+            if item["status"] == "new":
+                print(f"  {icons['new']} {item['name']}: 基准中不存在")
+                continue
+            print(f"  {icons[item['status']]} {item['name']}: {item['baseline_median_us']} → "
+                  f"{item['current_median_us']} µs ({item['change_percent']:+.2f}%, p={item['p_value']:.4f})")
+        for name in report["missing"]:
+            print(f"  ⚠️ {name}: 本次结果中不存在")
+        if report["regressions"]:
+            print(f"❌ 检测到 {len(report['regressions'])} 个性能回归")
+            sys.exit(1)
+        print("✅ 未检测到性能回归")
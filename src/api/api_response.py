@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - API响应类型
+统一API管理器与HTTP前端共享的响应类型和状态码映射
+
+版本: 1.0
+作者: AI Assistant
+功能: 预序列化JSON响应、常量负载、可选的快速JSON后端、原始内容响应（非JSON）、统一响应到HTTP状态码的映射
+特色: 响应对进程内调用方仍是普通字典，HTTP前端直接取用只序列化一次的字节
+"""
+
+import json
+import time
+from typing import Dict, Any, Optional, Iterator, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ============================================================================
+# JSON序列化
+# ============================================================================
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps_bytes(payload: Any) -> bytes:
+    """序列化为UTF-8 JSON字节，安装了 orjson 时优先使用"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except (TypeError, ValueError):
+            pass  # orjson 不支持的值（如超出64位的整数）回退到标准库
+    return json.dumps(payload, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
+
+# ============================================================================
+# HTTP状态码映射
+# ============================================================================
+
+# 统一响应中的错误代码到HTTP状态码的映射，其余业务错误仍返回200
+ERROR_CODE_STATUS = {
+    "ENDPOINT_NOT_FOUND": 404,
+    "METHOD_NOT_ALLOWED": 405,
+    "INTERNAL_ERROR": 500,
+}
+
+
+def http_status_for(response: Any) -> int:
+    """根据统一响应确定HTTP状态码"""
+    if isinstance(response, (RawResponse, StreamingResponse)):
+        return response.status
+    if isinstance(response, dict) and not response.get("success", True):
+        error = response.get("error") or {}
+        return ERROR_CODE_STATUS.get(error.get("code"), 200)
+    return 200
+
+# ============================================================================
+# 预序列化JSON响应
+# ============================================================================
+
+class ConstantPayload:
+    """常量响应数据：值不变，序列化结果只计算一次
+
+    值会在多个响应之间共享，调用方不应修改。
+    """
+
+    __slots__ = ("value", "_body")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self._body: Optional[bytes] = None
+
+    @property
+    def body(self) -> bytes:
+        if self._body is None:
+            self._body = dumps_bytes(self.value)
+        return self._body
+
+
+class JSONResponse(dict):
+    """可缓存序列化结果的统一响应
+
+    对调用方表现为普通字典。to_bytes() 首次调用时序列化并缓存字节，
+    之后通过字典方法修改顶层字段会使缓存失效；嵌套数据在序列化后不应再修改。
+    data 来自 ConstantPayload 时直接拼接其预序列化字节。
+    """
+
+    __slots__ = ("_body", "_constant")
+
+    def __init__(self, fields: Dict[str, Any], constant: Optional[ConstantPayload] = None):
+        super().__init__(fields)
+        self._body: Optional[bytes] = None
+        self._constant = constant
+
+    def to_bytes(self) -> bytes:
+        """序列化为JSON字节（只序列化一次）"""
+        body = self._body
+        if body is None:
+            constant = self._constant
+            if constant is not None and constant.value is self.get("data"):
+                fields = dict(self)
+                del fields["data"]
+                head = dumps_bytes(fields)
+                body = head[:-1] + (b',"data":' if fields else b'"data":') + constant.body + b"}"
+            else:
+                body = dumps_bytes(dict(self))
+            self._body = body
+        return body
+
+    def copy(self) -> "JSONResponse":
+        """浅拷贝，保留已序列化的字节"""
+        clone = JSONResponse(self, self._constant)
+        clone._body = self._body
+        return clone
+
+    # 修改顶层字段时丢弃已缓存的字节
+
+    def __setitem__(self, key, value):
+        self._body = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._body = None
+        super().__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self._body = None
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._body = None
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self._body = None
+        return super().pop(*args)
+
+    def popitem(self):
+        self._body = None
+        return super().popitem()
+
+    def clear(self):
+        self._body = None
+        super().clear()
+
+    def __ior__(self, other):
+        self._body = None
+        return super().__ior__(other)
+
+
+def response_bytes(response: Any) -> bytes:
+    """获取响应的JSON字节，JSONResponse 复用已缓存的序列化结果"""
+    if isinstance(response, JSONResponse):
+        return response.to_bytes()
+    return dumps_bytes(response)
+
+
+def copy_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """浅拷贝响应，JSONResponse 保留类型和已序列化的字节"""
+    if isinstance(response, JSONResponse):
+        return response.copy()
+    return dict(response)
+
+# ============================================================================
+# 原始内容响应
+# ============================================================================
+
+class RawResponse(dict):
+    """原始内容响应
+
+    对进程内调用方表现为标准成功响应（data 为文本内容），
+    HTTP前端则直接以 content_type 输出 body，用于 Prometheus 文本格式等非JSON内容。
+    """
+
+    def __init__(self, body: Union[str, bytes], content_type: str = "text/plain; charset=utf-8",
+                 status: int = 200, message: str = "操作成功"):
+        if isinstance(body, str):
+            text, body = body, body.encode("utf-8")
+        else:
+            text = body.decode("utf-8", errors="replace")
+
+        super().__init__({
+            "success": True,
+            "message": message,
+            "data": text,
+            "timestamp": time.time(),
+            "error": None
+        })
+        self.body = body
+        self.content_type = content_type
+        self.status = status
+
+# ============================================================================
+# 流式响应
+# ============================================================================
+
+class StreamingResponse(dict):
+    """流式响应
+
+    chunks 是按需产生字节块的迭代器，HTTP前端以分块传输编码逐块写出，不在内存中拼接完整响应体。
+    进程内调用方可以直接迭代 chunks；该响应不会进入响应缓存。
+    """
+
+    def __init__(self, chunks: Iterator[bytes], content_type: str, status: int = 200,
+                 message: str = "操作成功", data: Any = None):
+        super().__init__({
+            "success": True,
+            "message": message,
+            "data": data,
+            "timestamp": time.time(),
+            "error": None
+        })
+        self.chunks = chunks
+        self.content_type = content_type
+        self.status = status
+
+    def read_all(self) -> bytes:
+        """读取全部内容（用于不支持分块传输的客户端）"""
+        return b"".join(self.chunks)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - API响应缓存
+为幂等GET端点提供带TTL的响应缓存，并在写操作完成后自动失效
+
+版本: 1.0
+作者: AI Assistant
+功能: 按端点配置TTL/条目上限/字节预算、LRU淘汰、写操作驱动失效、命中统计
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Iterable
+
+from api_route_table import split_request_target
+from api_response import StreamingResponse, response_bytes, copy_response
+
+# ============================================================================
+# 缓存规则与条目
+# ============================================================================
+
+class CacheRule:
+    """单个端点的缓存规则"""
+
+    __slots__ = ("ttl", "max_entries", "max_bytes", "entries", "total_bytes", "generation")
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # 缓存键 -> (过期时间, 字节数, 响应)，按访问顺序排列
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.total_bytes = 0
+        # 每次失效加1；处理函数执行前读取，写入时不一致说明期间发生过失效
+        self.generation = 0
+
+# ============================================================================
+# 响应缓存
+# ============================================================================
+
+class ResponseCache:
+    """API响应缓存
+
+    仅缓存GET请求的成功响应。缓存以路由模式为单位配置，写操作端点成功返回后
+    按 add_invalidation 注册的关系清除对应缓存。
+    """
+
+    CACHEABLE_METHODS = ("GET",)
+
+    def __init__(self):
+        self._rules: Dict[str, CacheRule] = {}
+        # 写操作路由模式 -> 需要失效的路由模式（None 表示全部）
+        self._invalidations: Dict[str, Optional[List[str]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "rejected": 0,
+            "stale_skips": 0,
+        }
+
+    def configure(self, pattern: str, ttl: float, max_entries: int = 64, max_bytes: int = 256 * 1024):
+        """为路由模式启用缓存"""
+        with self._lock:
+            self._rules[pattern] = CacheRule(ttl, max_entries, max_bytes)
+
+    def add_invalidation(self, trigger_pattern: str, targets: Iterable[str] = None):
+        """注册写操作端点，成功后清除 targets 对应缓存（默认全部）"""
+        self._invalidations[trigger_pattern] = list(targets) if targets is not None else None
+
+    def is_cached(self, pattern: str) -> bool:
+        """路由模式是否启用了缓存"""
+        return pattern in self._rules
+
+    # ------------------------------------------------------------------------
+    # 查找与写入
+    # ------------------------------------------------------------------------
+
+    def lookup(self, pattern: str, method: str, target: str, data: Any = None) -> Optional[Dict[str, Any]]:
+        """查找缓存的响应，未启用缓存或未命中时返回 None"""
+        rule = self._rules.get(pattern)
+        if rule is None or method not in self.CACHEABLE_METHODS:
+            return None
+
+        key = self._make_key(target, data)
+        if key is None:
+            return None
+
+        with self._lock:
+            entry = rule.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            expires_at, size, response = entry
+            if expires_at <= time.monotonic():
+                del rule.entries[key]
+                rule.total_bytes -= size
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            rule.entries.move_to_end(key)
+            self.stats["hits"] += 1
+
+        # 返回浅拷贝，避免调用方修改缓存内容；已序列化的字节随拷贝复用
+        return copy_response(response)
+
+    def generation(self, pattern: str) -> Optional[int]:
+        """路由模式当前的失效代数（未启用缓存时返回 None），应在执行处理函数前读取"""
+        rule = self._rules.get(pattern)
+        return rule.generation if rule is not None else None
+
+    def store(self, pattern: str, method: str, target: str, data: Any, response: Dict[str, Any],
+              generation: Optional[int] = None):
+        """缓存成功的GET响应
+
+        generation 为执行处理函数前读取的失效代数；期间发生过失效时响应可能已过时，不写入缓存。
+        """
+        rule = self._rules.get(pattern)
+        if rule is None or method not in self.CACHEABLE_METHODS:
+            return
+        if not isinstance(response, dict) or not response.get("success", False):
+            return
+        if isinstance(response, StreamingResponse):
+            return
+
+        key = self._make_key(target, data)
+        if key is None:
+            return
+
+        try:
+            # 同时预先序列化，命中缓存的响应无需再次序列化
+            size = len(response_bytes(response))
+        except (TypeError, ValueError):
+            return
+
+        with self._lock:
+            if generation is not None and generation != rule.generation:
+                self.stats["stale_skips"] += 1
+                return
+            if size > rule.max_bytes:
+                self.stats["rejected"] += 1
+                return
+
+            previous = rule.entries.pop(key, None)
+            if previous is not None:
+                rule.total_bytes -= previous[1]
+
+            rule.entries[key] = (time.monotonic() + rule.ttl, size, copy_response(response))
+            rule.total_bytes += size
+            self.stats["stores"] += 1
+
+            # 按条目数量和字节预算淘汰最久未使用的条目
+            while len(rule.entries) > rule.max_entries or rule.total_bytes > rule.max_bytes:
+                _, (_, evicted_size, _) = rule.entries.popitem(last=False)
+                rule.total_bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def notify_write(self, pattern: str, method: str, response: Dict[str, Any]):
+        """写操作完成后按注册关系清除缓存"""
+        if method in self.CACHEABLE_METHODS or pattern not in self._invalidations:
+            return
+        if not isinstance(response, dict) or not response.get("success", False):
+            return
+
+        targets = self._invalidations[pattern]
+        if targets is None:
+            self.invalidate()
+        else:
+            for target in targets:
+                self.invalidate(target)
+
+    def invalidate(self, pattern: str = None):
+        """清除指定路由模式（默认全部）的缓存"""
+        with self._lock:
+            rules = [self._rules[pattern]] if pattern in self._rules else (
+                list(self._rules.values()) if pattern is None else []
+            )
+            for rule in rules:
+                if rule.entries:
+                    self.stats["invalidations"] += len(rule.entries)
+                rule.entries.clear()
+                rule.total_bytes = 0
+                rule.generation += 1
+
+    # ------------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups * 100, 2) if lookups else 0.0,
+                "endpoints": {
+                    pattern: {
+                        "ttl": rule.ttl,
+                        "entries": len(rule.entries),
+                        "max_entries": rule.max_entries,
+                        "bytes": rule.total_bytes,
+                        "max_bytes": rule.max_bytes
+                    }
+                    for pattern, rule in self._rules.items()
+                }
+            }
+
+    @staticmethod
+    def _make_key(target: str, data: Any) -> Optional[str]:
+        """生成缓存键：规范化路径 + 排序后的查询参数 + 请求数据"""
+        path, query = split_request_target(target)
+        try:
+            return json.dumps([path.rstrip("/") or "/", query, data], sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 编译式路由表
+为统一API管理器提供路径参数匹配和查询字符串解析
+
+版本: 1.0
+作者: AI Assistant
+功能: 路由前缀树编译、静态段优先匹配、路径参数提取、查询字符串解析、路由查找基准测试
+特色: 路由在 register_endpoint 时一次性编译，查找耗时只与路径段数相关，与已注册路由数量无关
+"""
+
+import time
+from typing import Dict, Any, Optional, Callable, List, Tuple
+from urllib.parse import parse_qs, unquote
+
+# ============================================================================
+# 路由节点与匹配结果
+# ============================================================================
+
+class _RouteNode:
+    """路由前缀树节点"""
+
+    __slots__ = ("static_children", "param_child", "param_name", "methods", "accepts_data", "pattern")
+
+    def __init__(self):
+        self.static_children: Dict[str, "_RouteNode"] = {}
+        self.param_child: Optional["_RouteNode"] = None
+        self.param_name: Optional[str] = None
+        self.methods: Optional[Dict[str, Callable]] = None
+        self.accepts_data: Dict[str, bool] = {}
+        self.pattern: Optional[str] = None
+
+
+class RouteMatch:
+    """路由匹配结果"""
+
+    __slots__ = ("pattern", "methods", "params", "accepts_data")
+
+    def __init__(self, pattern: str, methods: Dict[str, Callable], params: Dict[str, str],
+                 accepts_data: Dict[str, bool] = None):
+        self.pattern = pattern
+        self.methods = methods
+        self.params = params
+        self.accepts_data = accepts_data if accepts_data is not None else {}
+
+# ============================================================================
+# 编译式路由表
+# ============================================================================
+
+class CompiledRouteTable:
+    """编译式路由表 - 静态段优先的前缀树匹配器
+
+    路由模式使用 ``{name}`` 声明路径参数，例如 ``/api/instances/{instance_id}/status``。
+    每个模式对应的方法字典与管理器 ``endpoints`` 中的字典是同一个对象，
+    因此后续为同一路径注册新方法无需重新编译；accepts_data 字典同样共享，
+    记录注册时检查的各方法处理函数是否接受请求数据参数。
+    """
+
+    def __init__(self):
+        self._root = _RouteNode()
+        # 纯静态路由直接走哈希查找
+        self._static_routes: Dict[str, _RouteNode] = {}
+        self.route_count = 0
+
+    def add_route(self, pattern: str, methods: Dict[str, Callable], accepts_data: Dict[str, bool] = None):
+        """编译并注册一个路由模式"""
+        segments = split_path_segments(pattern)
+        node = self._root
+        is_static = True
+
+        for segment in segments:
+            if segment.startswith("{") and segment.endswith("}"):
+                is_static = False
+                param_name = segment[1:-1]
+                if not param_name:
+                    raise ValueError(f"路径参数名称为空: {pattern}")
+                if node.param_child is None:
+                    node.param_child = _RouteNode()
+                    node.param_child.param_name = param_name
+                elif node.param_child.param_name != param_name:
+                    raise ValueError(
+                        f"路径参数冲突: {pattern} 中的 {{{param_name}}} 与已注册的 "
+                        f"{{{node.param_child.param_name}}} 位于同一位置"
+                    )
+                node = node.param_child
+            else:
+                child = node.static_children.get(segment)
+                if child is None:
+                    child = _RouteNode()
+                    node.static_children[segment] = child
+                node = child
+
+        if node.methods is None:
+            self.route_count += 1
+        node.methods = methods
+        node.accepts_data = accepts_data if accepts_data is not None else {}
+        node.pattern = pattern
+
+        if is_static:
+            self._static_routes[normalize_path(pattern)] = node
+
+    def match(self, path: str) -> Optional[RouteMatch]:
+        """匹配请求路径，返回匹配结果或 None"""
+        node = self._static_routes.get(normalize_path(path))
+        if node is not None:
+            return RouteMatch(node.pattern, node.methods, {}, node.accepts_data)
+
+        params: Dict[str, str] = {}
+        node = self._match_segments(self._root, split_path_segments(path), 0, params)
+        if node is None:
+            return None
+        return RouteMatch(node.pattern, node.methods, params, node.accepts_data)
+
+    def _match_segments(self, node: _RouteNode, segments: List[str], index: int,
+                        params: Dict[str, str]) -> Optional[_RouteNode]:
+        """逐段匹配，静态段优先，参数段兜底
+
+        静态分支未能匹配剩余路径时回溯到同层的参数分支。前缀树中每个节点只有一条到达路径，
+        因此单次查找最多访问每个节点一次：没有静态段与参数段重叠时耗时为 O(路径段数)，
+        最坏情况（每一层都同时存在静态与参数子路由）与深度不超过路径段数的已注册节点数成正比，
+        不会超过已注册路由的路径段总数。
+        """
+        if index == len(segments):
+            return node if node.methods is not None else None
+
+        segment = segments[index]
+
+        static_child = node.static_children.get(segment)
+        if static_child is not None:
+            found = self._match_segments(static_child, segments, index + 1, params)
+            if found is not None:
+                return found
+
+        param_child = node.param_child
+        if param_child is not None:
+            found = self._match_segments(param_child, segments, index + 1, params)
+            if found is not None:
+                params[param_child.param_name] = unquote(segment)
+                return found
+
+        return None
+
+# ============================================================================
+# 路径与查询字符串解析
+# ============================================================================
+
+def normalize_path(path: str) -> str:
+    """规范化路径：去除多余斜杠和末尾斜杠"""
+    return "/" + "/".join(split_path_segments(path))
+
+
+def split_path_segments(path: str) -> List[str]:
+    """拆分路径段，忽略空段"""
+    return [segment for segment in path.split("/") if segment]
+
+
+def split_request_target(target: str) -> Tuple[str, Dict[str, Any]]:
+    """拆分请求目标为路径和查询参数
+
+    单值查询参数展开为字符串，重复出现的参数保留为列表。
+    """
+    path, _, query_string = target.partition("?")
+    if not query_string:
+        return path, {}
+
+    query: Dict[str, Any] = {}
+    for key, values in parse_qs(query_string, keep_blank_values=True).items():
+        query[key] = values[0] if len(values) == 1 else values
+    return path, query
+
+# ============================================================================
+# 处理函数调用
+# ============================================================================
+
+def handler_accepts_data(handler: Callable) -> bool:
+    """判断处理函数是否接受请求数据参数（在注册端点时调用一次，结果保存在路由上）"""
+    import inspect
+
+    try:
+        signature = inspect.signature(handler)
+    except (TypeError, ValueError):
+        return True
+
+    for parameter in signature.parameters.values():
+        if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD,
+                              parameter.VAR_POSITIONAL):
+            return True
+    return False
+
+
+def build_handler_args(handler: Callable, data: Optional[Dict[str, Any]],
+                       params: Dict[str, str], query: Dict[str, Any],
+                       accepts_data: Optional[bool] = None) -> Tuple[Any, ...]:
+    """构造处理函数的调用参数
+
+    没有路径参数和查询参数时保持原有调用约定；否则将查询参数、请求数据、
+    路径参数依次合并（后者覆盖前者）。不接受数据参数的处理函数不传任何参数，
+    请求中附带的数据被忽略（例如批量请求中带 data 的无参 GET）。
+    accepts_data 为注册时记录的签名检查结果，缺省时现场检查。
+    """
+    if accepts_data is None:
+        accepts_data = handler_accepts_data(handler)
+    if not accepts_data:
+        return ()
+
+    if (params or query) and (data is None or isinstance(data, dict)):
+        merged: Dict[str, Any] = dict(query)
+        if data:
+            merged.update(data)
+        merged.update(params)
+        return (merged,)
+
+    if data is None:
+        return ()
+    return (data,)
+
+# ============================================================================
+# 路由查找基准测试
+# ============================================================================
+
+def benchmark_route_lookup(route_count: int = 10000, lookups: int = 100000) -> Dict[str, Any]:
+    """路由查找微基准测试
+
+    注册 route_count 个静态与参数混合的路由，测量静态命中、参数命中和未命中的平均查找耗时；
+    另外在每层静态段与参数段重叠的路由表上测量回溯最坏情况（overlap_backtrack）。
+    """
+    table = CompiledRouteTable()
+    handler_map = {"GET": lambda: None}
+
+    for i in range(route_count):
+        if i % 2 == 0:
+            table.add_route(f"/api/group-{i % 100}/resource-{i}", handler_map)
+        else:
+            table.add_route(f"/api/group-{i % 100}/resource-{i}/{{item_id}}/status", handler_map)
+
+    samples = {
+        "static_hit": f"/api/group-{(route_count - 2) % 100}/resource-{route_count - 2}",
+        "param_hit": f"/api/group-{(route_count - 1) % 100}/resource-{route_count - 1}/abc123/status",
+        "miss": "/api/group-0/resource-missing/xyz/status",
+    }
+
+    # 回溯最坏情况：每一层都同时注册静态段和参数段，请求沿静态分支走到末段才失败，
+    # 需要回溯访问全部 2^depth 个组合节点后才由全参数路由命中
+    depth = 8
+    overlap_table = CompiledRouteTable()
+    for mask in range(2 ** depth):
+        segments = [f"s{level}" if mask >> level & 1 else f"{{p{level}}}" for level in range(depth)]
+        overlap_table.add_route("/" + "/".join(segments) + "/other", handler_map)
+    overlap_table.add_route("/" + "/".join(f"{{p{level}}}" for level in range(depth)) + "/target", handler_map)
+
+    tables = {name: table for name in samples}
+    samples["overlap_backtrack"] = "/" + "/".join(f"s{level}" for level in range(depth)) + "/target"
+    tables["overlap_backtrack"] = overlap_table
+
+    results: Dict[str, Any] = {"route_count": table.route_count, "lookups": lookups,
+                               "overlap_route_count": overlap_table.route_count}
+    for name, sample_path in samples.items():
+        lookup_table = tables[name]
+        start = time.perf_counter()
+        for _ in range(lookups):
+            lookup_table.match(sample_path)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "path": sample_path,
+            "avg_ns": round(elapsed / lookups * 1e9, 1),
+            "lookups_per_second": round(lookups / elapsed, 1) if elapsed > 0 else None,
+        }
+
+    return results
+
+# ============================================================================
+# 主函数 - 用于基准测试
+# ============================================================================
+
+if __name__ == "__main__":
+    print("🚀 CodeStudio Pro Ultimate - 编译式路由表基准测试")
+    print("=" * 60)
+
+    for count in (100, 1000, 10000):
+        result = benchmark_route_lookup(route_count=count, lookups=50000)
+        print(f"📊 已注册路由: {result['route_count']}")
+        for name in ("static_hit", "param_hit", "miss", "overlap_backtrack"):
+            print(f"  {name}: {result[name]['avg_ns']} ns/次")
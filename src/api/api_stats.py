@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 延迟统计辅助函数
+为负载生成器、测试执行引擎、请求追踪和微基准测试提供共用的统计计算
+
+版本: 1.0
+作者: AI Assistant
+功能: 最近秩法百分位数
+"""
+
+import math
+from typing import List
+
+# ============================================================================
+# 百分位数
+# ============================================================================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法计算百分位数（输入需已排序）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
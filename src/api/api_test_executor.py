@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - API测试执行引擎
+为 APITestRunner 与 DynamicPathAPITestRunner 提供串行/并行执行与测试隔离
+
+版本: 1.0
+作者: AI Assistant
+功能: 工作线程池并行执行、按提交顺序汇总结果、共享/独占/独立管理器三种隔离方式、单测试超时看门狗、
+      重复执行与百分位延迟SLO检查
+特色: 报告与控制台输出的顺序与测试用例顺序一致，不受完成先后影响；挂起的处理函数不会阻塞整个测试运行
+"""
+
+import os
+import time
+import argparse
+import inspect
+import threading
+from typing import Dict, Any, List, Optional, Callable
+
+from api_route_table import split_request_target
+from api_stats import percentile
+
+# ============================================================================
+# 隔离方式
+# ============================================================================
+
+# 与其他测试并发执行，共用全局管理器
+ISOLATION_SHARED = "shared"
+# 执行期间不与任何其他测试并发（用于会修改全局状态的端点）
+ISOLATION_EXCLUSIVE = "exclusive"
+# 使用单独创建的管理器实例，不共享响应缓存等内存状态，结束后关闭
+ISOLATION_FRESH = "fresh"
+
+ISOLATION_MODES = (ISOLATION_SHARED, ISOLATION_EXCLUSIVE, ISOLATION_FRESH)
+
+
+def default_workers() -> int:
+    """默认并行度：CPU核心数"""
+    return os.cpu_count() or 1
+
+
+def parse_workers(value: str) -> int:
+    """解析 --workers 参数：正整数，0 或 auto 表示使用CPU核心数"""
+    if value.strip().lower() == "auto":
+        return default_workers()
+    try:
+        workers = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的并行度: {value}")
+    if workers < 0:
+        raise argparse.ArgumentTypeError(f"无效的并行度: {value}")
+    return workers or default_workers()
+
+
+class IsolationGate:
+    """共享/独占执行门（读写锁，独占请求优先，避免被持续到来的共享测试饿死）"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._waiting_exclusive = 0
+
+    def acquire(self, exclusive: bool):
+        with self._condition:
+            if exclusive:
+                self._waiting_exclusive += 1
+                while self._exclusive or self._shared:
+                    self._condition.wait()
+                self._waiting_exclusive -= 1
+                self._exclusive = True
+            else:
+                while self._exclusive or self._waiting_exclusive:
+                    self._condition.wait()
+                self._shared += 1
+
+    def release(self, exclusive: bool):
+        with self._condition:
+            if exclusive:
+                self._exclusive = False
+            else:
+                self._shared -= 1
+            self._condition.notify_all()
+
+
+class TestCaseOptionsMixin:
+    """APITestCase 与 DynamicPathAPITestCase 共用的执行选项设置方法（链式调用）"""
+
+    def set_isolation(self, isolation: str):
+        """设置并行执行时的隔离方式: shared / exclusive / fresh"""
+        if isolation not in ISOLATION_MODES:
+            raise ValueError(f"不支持的隔离方式: {isolation}")
+        self.isolation = isolation
+        return self
+
+    def set_repetitions(self, repetitions: int, warmup: int = 0):
+        """设置重复执行次数与预热次数（预热请求不计时、不校验）"""
+        if repetitions < 1 or warmup < 0:
+            raise ValueError(f"无效的重复次数: {repetitions} (预热 {warmup})")
+        self.repetitions = repetitions
+        self.warmup = warmup
+        return self
+
+    def assert_latency(self, percentile: float, max_ms: float):
+        """添加延迟SLO断言：第 percentile 百分位延迟不超过 max_ms 毫秒"""
+        if not 0 < percentile <= 100 or max_ms <= 0:
+            raise ValueError(f"无效的延迟SLO: p{percentile} <= {max_ms}ms")
+        self.latency_slos.append({"percentile": percentile, "max_ms": max_ms})
+        return self
+
+    def bypass_response_cache(self):
+        """每次请求（含预热）前清除端点的响应缓存，测量未命中缓存时的延迟"""
+        self.bypass_cache = True
+        return self
+
+# ============================================================================
+# 超时看门狗
+# ============================================================================
+
+# 协程被取消后等待其退出的宽限时间（秒），超过后同样放弃该工作线程
+CANCEL_GRACE = 1.0
+
+# 独占测试获取/释放执行门前等待被放弃工作线程退出的最长时间（秒）
+ABANDONED_DRAIN_TIMEOUT = 5.0
+
+_abandoned_workers: List[threading.Thread] = []
+_abandoned_lock = threading.Lock()
+# 当前线程中 run_requests 放弃的工作线程，供 TestExecutor 判断测试是否仍有残留请求在运行
+_local = threading.local()
+
+
+class TestTimeoutError(Exception):
+    """测试执行超时"""
+
+    def __init__(self, timeout: float, cancelled: bool, worker: Optional[threading.Thread] = None):
+        self.timeout = timeout
+        # True: 协程处理函数已被取消；False: 同步处理函数仍在被放弃的工作线程中运行
+        self.cancelled = cancelled
+        self.worker = worker
+        action = "已取消" if cancelled else "已放弃工作线程"
+        super().__init__(f"测试超时 (>{timeout:g}s，{action})")
+
+
+def _running_abandoned_workers() -> List[threading.Thread]:
+    """仍在运行的被放弃工作线程"""
+    with _abandoned_lock:
+        _abandoned_workers[:] = [thread for thread in _abandoned_workers if thread.is_alive()]
+        return list(_abandoned_workers)
+
+
+def get_abandoned_workers() -> List[str]:
+    """仍在运行的被放弃工作线程名称"""
+    return [thread.name for thread in _running_abandoned_workers()]
+
+
+def _take_local_abandoned() -> List[threading.Thread]:
+    """取出并清空当前线程放弃的工作线程"""
+    threads = getattr(_local, "abandoned", [])
+    _local.abandoned = []
+    return threads
+
+
+def _join_workers(threads: List[threading.Thread], timeout: float) -> List[threading.Thread]:
+    """在 timeout 秒内等待工作线程退出，返回仍在运行的线程"""
+    deadline = time.perf_counter() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.perf_counter()))
+    return [thread for thread in threads if thread.is_alive()]
+
+
+def _is_async_route(manager: Any, path: str, method: str) -> bool:
+    """请求是否由协程处理函数处理（且管理器提供异步入口）"""
+    if not hasattr(manager, "handle_request_async") or not hasattr(manager, "routes"):
+        return False
+    route = manager.routes.match(split_request_target(path)[0])
+    if route is None:
+        return False
+    return inspect.iscoroutinefunction(route.methods.get(method))
+
+
+def run_requests(manager: Any, path: str, method: str, data: Dict[str, Any] = None,
+                 timeout: Optional[float] = None, runs: int = 1, warmup: int = 0,
+                 check: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None,
+                 before_each: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """在看门狗下连续执行请求，超时抛出 TestTimeoutError
+
+    先执行 warmup 次预热（不计时、不校验），再计时执行 runs 次；check 返回错误信息时提前停止。
+    before_each 在每次请求前调用，不计入耗时（例如清除响应缓存）。
+    返回 {"response": 最后一次响应, "latencies": 每次耗时(秒), "error": check 的错误信息}。
+
+    全部请求在同一个守护线程中执行，timeout 作用于整个测试：协程处理函数经 handle_request_async
+    由 asyncio.wait_for 取消；同步处理函数无法中断，超时后放弃该线程（守护线程不阻止进程退出），
+    测试运行继续。被放弃的线程在当前请求返回后不再执行剩余的预热/计时请求与 before_each。
+    timeout 为 None 或不大于 0 时直接在当前线程执行。
+    """
+    outcome: Dict[str, Any] = {"response": None, "latencies": [], "error": None}
+    # 看门狗超时后置位，工作线程据此停止
+    cancelled = threading.Event()
+
+    def record(response: Dict[str, Any], elapsed: float) -> bool:
+        if cancelled.is_set():
+            return False
+        outcome["latencies"].append(elapsed)
+        outcome["response"] = response
+        if check is not None:
+            outcome["error"] = check(response)
+        return outcome["error"] is None
+
+    def prepare() -> bool:
+        """执行 before_each，已超时返回 False"""
+        if cancelled.is_set():
+            return False
+        if before_each is not None:
+            before_each()
+        return not cancelled.is_set()
+
+    def run_sync():
+        for _ in range(warmup):
+            if not prepare():
+                return
+            manager.handle_request(path, method, data)
+        for _ in range(runs):
+            if not prepare():
+                return
+            start = time.perf_counter()
+            response = manager.handle_request(path, method, data)
+            if not record(response, time.perf_counter() - start):
+                break
+
+    async def run_async():
+        for _ in range(warmup):
+            if not prepare():
+                return
+            await manager.handle_request_async(path, method, data)
+        for _ in range(runs):
+            if not prepare():
+                return
+            start = time.perf_counter()
+            response = await manager.handle_request_async(path, method, data)
+            if not record(response, time.perf_counter() - start):
+                break
+
+    if not timeout or timeout <= 0:
+        run_sync()
+        return outcome
+
+    use_async = _is_async_route(manager, path, method)
+    failure: Dict[str, BaseException] = {}
+
+    def worker():
+        try:
+            if use_async:
+                import asyncio
+                asyncio.run(asyncio.wait_for(run_async(), timeout))
+            else:
+                run_sync()
+        except BaseException as e:
+            failure["exception"] = e
+
+    thread = threading.Thread(target=worker, name=f"api-test-watchdog {method} {path}", daemon=True)
+    thread.start()
+    thread.join(timeout + CANCEL_GRACE if use_async else timeout)
+
+    if thread.is_alive():
+        cancelled.set()
+        with _abandoned_lock:
+            _abandoned_workers.append(thread)
+        _local.abandoned = getattr(_local, "abandoned", []) + [thread]
+        raise TestTimeoutError(timeout, cancelled=False, worker=thread)
+
+    exception = failure.get("exception")
+    if exception is not None:
+        import asyncio
+        if isinstance(exception, asyncio.TimeoutError):
+            cancelled.set()
+            raise TestTimeoutError(timeout, cancelled=True)
+        raise exception
+    return outcome
+
+
+def response_cache_clearer(manager: Any, path: str) -> Optional[Callable[[], None]]:
+    """返回清除请求所在路由响应缓存的函数，管理器没有响应缓存或路由不存在时返回 None"""
+    cache = getattr(manager, "response_cache", None)
+    if cache is None or not hasattr(manager, "routes"):
+        return None
+    route = manager.routes.match(split_request_target(path)[0])
+    if route is None:
+        return None
+    return lambda: cache.invalidate(route.pattern)
+
+
+def call_with_timeout(manager: Any, path: str, method: str, data: Dict[str, Any] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+    """在看门狗下执行单次请求，返回响应（见 run_requests）"""
+    return run_requests(manager, path, method, data, timeout)["response"]
+
+# ============================================================================
+# 结果校验与延迟SLO
+# ============================================================================
+
+def check_response(test_case: Any, response: Dict[str, Any]) -> Optional[str]:
+    """按测试用例的期望校验响应，返回错误信息，符合期望时返回 None"""
+    if test_case.expected_success:
+        if response.get("success", False):
+            return None
+        return f"期望成功但失败: {response.get('error', {}).get('message', '未知错误')}"
+
+    if response.get("success", True):
+        return "期望失败但成功了"
+    error_code = response.get("error", {}).get("code", "")
+    if test_case.expected_error_code and error_code != test_case.expected_error_code:
+        return f"错误代码不匹配: 期望 {test_case.expected_error_code}, 实际 {error_code}"
+    return None
+
+
+def summarize_latencies(latencies: List[float], slos: List[Dict[str, float]], warmup: int = 0) -> Dict[str, Any]:
+    """延迟统计（毫秒）与SLO检查结果"""
+    ordered = sorted(latencies)
+    to_ms = lambda value: round(value * 1000, 3)
+    summary: Dict[str, Any] = {
+        "runs": len(ordered),
+        "warmup": warmup,
+        "mean_ms": to_ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+        "p50_ms": to_ms(percentile(ordered, 50)),
+        "p90_ms": to_ms(percentile(ordered, 90)),
+        "p95_ms": to_ms(percentile(ordered, 95)),
+        "p99_ms": to_ms(percentile(ordered, 99)),
+        "max_ms": to_ms(ordered[-1]) if ordered else 0.0
+    }
+    summary["slos"] = [
+        {
+            "percentile": slo["percentile"],
+            "max_ms": slo["max_ms"],
+            "actual_ms": to_ms(percentile(ordered, slo["percentile"])),
+            "passed": percentile(ordered, slo["percentile"]) * 1000 <= slo["max_ms"]
+        }
+        for slo in slos
+    ]
+    return summary
+
+
+def describe_slo_violations(latency: Dict[str, Any]) -> Optional[str]:
+    """未满足的延迟SLO描述，全部满足时返回 None"""
+    violations = [
+        f"p{slo['percentile']:g} {slo['actual_ms']:.2f}ms > {slo['max_ms']:g}ms"
+        for slo in latency["slos"] if not slo["passed"]
+    ]
+    if not violations:
+        return None
+    return f"延迟SLO未满足 ({latency['runs']}次): " + ", ".join(violations)
+
+
+def format_latency(latency: Dict[str, Any]) -> str:
+    """延迟统计的单行描述"""
+    text = (f"p50 {latency['p50_ms']:.2f}ms / p95 {latency['p95_ms']:.2f}ms / p99 {latency['p99_ms']:.2f}ms "
+            f"({latency['runs']}次, 预热{latency['warmup']}次)")
+    for slo in latency["slos"]:
+        text += f" p{slo['percentile']:g}≤{slo['max_ms']:g}ms {'✅' if slo['passed'] else '❌'}"
+    return text
+
+# ============================================================================
+# 执行引擎
+# ============================================================================
+
+class TestExecutor:
+    """测试执行引擎
+
+    run_single(test_case, manager) 执行单个测试并返回结果字典，manager 为 None 时使用全局管理器；
+    隔离方式为 fresh 的测试由 manager_factory 创建专用管理器，结束后调用其 shutdown()（如有）。
+    workers 为 1 时在当前线程串行执行，行为与原实现一致。
+
+    超时后被放弃的工作线程仍可能在执行请求：独占测试在获取执行门后、以及自身超时后释放执行门前，
+    最多等待 ABANDONED_DRAIN_TIMEOUT 秒让这些线程退出；执行期间仍有被放弃线程在运行的测试，
+    结果中的 contaminated_by 列出这些线程名称，表示结果可能受其干扰。
+    """
+
+    def __init__(self, workers: int = 1, default_isolation: str = ISOLATION_SHARED,
+                 manager_factory: Optional[Callable[[], Any]] = None):
+        if default_isolation not in ISOLATION_MODES:
+            raise ValueError(f"不支持的隔离方式: {default_isolation}")
+        self.workers = max(1, int(workers or 1))
+        self.default_isolation = default_isolation
+        self.manager_factory = manager_factory
+        self._gate = IsolationGate()
+
+    def run(self, test_cases: List[Any], run_single: Callable[[Any, Any], Dict[str, Any]],
+            on_result: Optional[Callable[[int, Any, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """执行全部测试，结果按测试用例顺序返回；on_result(序号, 用例, 结果) 也按该顺序调用"""
+        if self.workers == 1 or len(test_cases) <= 1:
+            results = []
+            for index, test_case in enumerate(test_cases, 1):
+                result = self._run_isolated(test_case, run_single)
+                results.append(result)
+                if on_result:
+                    on_result(index, test_case, result)
+            return results
+
+        from concurrent.futures import ThreadPoolExecutor
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="api-test") as executor:
+            futures = [executor.submit(self._run_isolated, test_case, run_single) for test_case in test_cases]
+            # 按提交顺序收集：先完成的结果等待前面的测试，输出顺序与串行执行一致
+            for index, (test_case, future) in enumerate(zip(test_cases, futures), 1):
+                result = future.result()
+                results.append(result)
+                if on_result:
+                    on_result(index, test_case, result)
+        return results
+
+    def _run_isolated(self, test_case: Any, run_single: Callable[[Any, Any], Dict[str, Any]]) -> Dict[str, Any]:
+        """按测试用例的隔离方式执行"""
+        isolation = getattr(test_case, "isolation", None) or self.default_isolation
+        exclusive = isolation == ISOLATION_EXCLUSIVE and self.workers > 1
+
+        self._gate.acquire(exclusive)
+        manager = None
+        _take_local_abandoned()
+        try:
+            running = _running_abandoned_workers()
+            if exclusive and running:
+                running = _join_workers(running, ABANDONED_DRAIN_TIMEOUT)
+            if isolation == ISOLATION_FRESH and self.manager_factory is not None:
+                manager = self.manager_factory()
+            result = run_single(test_case, manager)
+            result.setdefault("isolation", isolation)
+            result["worker"] = threading.current_thread().name
+
+            own = _take_local_abandoned()
+            if exclusive and own:
+                _join_workers(own, ABANDONED_DRAIN_TIMEOUT)
+            overlapping = [thread for thread in running + _running_abandoned_workers() if thread not in own]
+            if overlapping:
+                result["contaminated_by"] = sorted({thread.name for thread in overlapping})
+            return result
+        finally:
+            if manager is not None and hasattr(manager, "shutdown"):
+                try:
+                    manager.shutdown()
+                except Exception as e:
+                    print(f"⚠️ 隔离管理器关闭失败: {e}")
+            self._gate.release(exclusive)
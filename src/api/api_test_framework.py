@@ -8,21 +8,26 @@ CodeStudio Pro Ultimate - API测试框架
 功能: API端点测试、回归测试、性能测试、错误处理验证
 """
 
+import sys
 import json
 import time
-import unittest
+import argparse
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 from datetime import datetime
 
 # 导入统一API管理器
-from unified_api_clean import api_manager, APIResponse
+from unified_api_clean import get_api_manager, APIResponse, UnifiedAPIManager
+from api_test_executor import (TestExecutor, TestCaseOptionsMixin, ISOLATION_SHARED, ISOLATION_EXCLUSIVE,
+                               TestTimeoutError, run_requests, check_response, summarize_latencies,
+                               describe_slo_violations, format_latency, get_abandoned_workers, parse_workers,
+                               response_cache_clearer)
 
 # ============================================================================
 # 测试用例基类
 # ============================================================================
 
-class APITestCase:
+class APITestCase(TestCaseOptionsMixin):
     """API测试用例基类"""
 
     def __init__(self, name: str, endpoint: str, method: str, data: Dict[str, Any] = None):
@@ -33,6 +38,11 @@ class APITestCase:
         self.expected_success = True
         self.expected_error_code = None
         self.timeout = 30.0
+        self.isolation = None  # None 表示使用执行器的默认隔离方式
+        self.repetitions = 1
+        self.warmup = 0
+        self.latency_slos: List[Dict[str, float]] = []
+        self.bypass_cache = False
 
     def set_expected_error(self, error_code: str):
         """设置期望的错误代码"""
@@ -52,37 +62,57 @@ class APITestCase:
 class APITestRunner:
     """API测试执行器"""
 
-    def __init__(self):
+    def __init__(self, workers: int = 1, isolation: str = ISOLATION_SHARED):
         self.test_cases: List[APITestCase] = []
         self.results: List[Dict[str, Any]] = []
+        self.workers = workers
+        self.isolation = isolation
 
     def add_test_case(self, test_case: APITestCase):
         """添加测试用例"""
         self.test_cases.append(test_case)
 
-    def run_all_tests(self) -> Dict[str, Any]:
-        """运行所有测试用例"""
-        print("🧪 开始API回归测试...")
+    def run_all_tests(self, workers: Optional[int] = None) -> Dict[str, Any]:
+        """运行所有测试用例（workers > 1 时并行执行，结果顺序与测试用例顺序一致）"""
+        workers = self.workers if workers is None else workers
+        executor = TestExecutor(workers, self.isolation, UnifiedAPIManager)
+
+        print(f"🧪 开始API回归测试... (并行度: {executor.workers})")
         print("=" * 60)
 
         start_time = time.time()
         passed = 0
         failed = 0
+        timed_out = 0
+        slo_violations = 0
 
-        for i, test_case in enumerate(self.test_cases, 1):
+        def on_result(i: int, test_case: APITestCase, result: Dict[str, Any]):
+            nonlocal passed, failed, timed_out, slo_violations
             print(f"[{i}/{len(self.test_cases)}] 测试: {test_case.name}")
-
-            result = self._run_single_test(test_case)
-            self.results.append(result)
-
             if result["passed"]:
                 passed += 1
                 print(f"  ✅ 通过 ({result['duration']:.2f}s)")
+                if result.get("latency"):
+                    print(f"    ⏱️ 延迟: {format_latency(result['latency'])}")
+            elif result.get("timed_out"):
+                failed += 1
+                timed_out += 1
+                print(f"  ⏰ 超时: {result['error']}")
+            elif result.get("slo_violated"):
+                failed += 1
+                slo_violations += 1
+                print(f"  🐢 性能不达标: {result['error']}")
+                print(f"    ⏱️ 延迟: {format_latency(result['latency'])}")
             else:
                 failed += 1
                 print(f"  ❌ 失败: {result['error']}")
+            if result.get("contaminated_by"):
+                print(f"    ⚠️ 执行期间仍有被放弃的工作线程在运行，结果可能受干扰: {', '.join(result['contaminated_by'])}")
+
+        self.results = executor.run(self.test_cases, self._run_single_test, on_result)
 
         total_time = time.time() - start_time
+        test_time = sum(result["duration"] for result in self.results)
 
         # 生成测试报告
         report = {
@@ -90,8 +120,15 @@ class APITestRunner:
                 "total": len(self.test_cases),
                 "passed": passed,
                 "failed": failed,
+                "timed_out": timed_out,
+                "slo_tests": sum(1 for test_case in self.test_cases if test_case.latency_slos),
+                "slo_violations": slo_violations,
                 "success_rate": round(passed / len(self.test_cases) * 100, 2),
-                "total_duration": round(total_time, 2)
+                "total_duration": round(total_time, 2),
+                "test_duration_sum": round(test_time, 2),
+                "workers": executor.workers,
+                "abandoned_workers": len(get_abandoned_workers()),
+                "contaminated": sum(1 for result in self.results if result.get("contaminated_by"))
             },
             "results": self.results,
             "timestamp": datetime.now().isoformat()
@@ -99,82 +136,74 @@ class APITestRunner:
 
         print("=" * 60)
         print(f"🎯 测试完成: {passed}/{len(self.test_cases)} 通过 ({report['summary']['success_rate']}%)")
-        print(f"⏱️ 总耗时: {total_time:.2f}秒")
+        print(f"⏱️ 总耗时: {total_time:.2f}秒 (测试累计耗时: {test_time:.2f}秒)")
+        if slo_violations:
+            print(f"🐢 延迟SLO未满足: {slo_violations} 个")
+        if timed_out:
+            print(f"⏰ 超时测试: {timed_out} 个 (仍在运行的被放弃工作线程: {report['summary']['abandoned_workers']})")
+        if report["summary"]["contaminated"]:
+            print(f"⚠️ 可能受被放弃工作线程干扰的测试: {report['summary']['contaminated']} 个")
 
         # 保存测试报告
         self._save_test_report(report)
 
         return report
 
-    def _run_single_test(self, test_case: APITestCase) -> Dict[str, Any]:
-        """运行单个测试用例"""
+    def _run_single_test(self, test_case: APITestCase, manager: Optional[UnifiedAPIManager] = None) -> Dict[str, Any]:
+        """运行单个测试用例（manager 为 None 时使用全局管理器）"""
         start_time = time.time()
 
         try:
-            # 执行API调用
-            response = api_manager.handle_request(
+            # 执行API调用（设置了重复次数时先预热再逐次计时，遇到不符合期望的响应即停止）
+            manager = manager or get_api_manager()
+            outcome = run_requests(
+                manager,
                 test_case.endpoint,
                 test_case.method,
-                test_case.data
+                test_case.data,
+                test_case.timeout,
+                runs=test_case.repetitions,
+                warmup=test_case.warmup,
+                check=lambda response: check_response(test_case, response),
+                before_each=response_cache_clearer(manager, test_case.endpoint) if test_case.bypass_cache else None
             )
 
             duration = time.time() - start_time
 
-            # 验证响应
-            if test_case.expected_success:
-                # 期望成功
-                if response.get("success", False):
-                    return {
-                        "test_name": test_case.name,
-                        "endpoint": test_case.endpoint,
-                        "method": test_case.method,
-                        "passed": True,
-                        "duration": duration,
-                        "response": response
-                    }
-                else:
-                    return {
-                        "test_name": test_case.name,
-                        "endpoint": test_case.endpoint,
-                        "method": test_case.method,
-                        "passed": False,
-                        "duration": duration,
-                        "error": f"期望成功但失败: {response.get('error', {}).get('message', '未知错误')}",
-                        "response": response
-                    }
-            else:
-                # 期望失败
-                if not response.get("success", True):
-                    error_code = response.get("error", {}).get("code", "")
-                    if test_case.expected_error_code and error_code != test_case.expected_error_code:
-                        return {
-                            "test_name": test_case.name,
-                            "endpoint": test_case.endpoint,
-                            "method": test_case.method,
-                            "passed": False,
-                            "duration": duration,
-                            "error": f"错误代码不匹配: 期望 {test_case.expected_error_code}, 实际 {error_code}",
-                            "response": response
-                        }
-                    else:
-                        return {
-                            "test_name": test_case.name,
-                            "endpoint": test_case.endpoint,
-                            "method": test_case.method,
-                            "passed": True,
-                            "duration": duration,
-                            "response": response
-                        }
-                else:
-                    return {
-                        "test_name": test_case.name,
-                        "endpoint": test_case.endpoint,
-                        "method": test_case.method,
-                        "passed": False,
-                        "duration": duration,
-                        "error": "期望失败但成功了",
-                        "response": response
-                    }
+            result = {
+                "test_name": test_case.name,
+                "endpoint": test_case.endpoint,
+                "method": test_case.method,
+                "passed": outcome["error"] is None,
+                "duration": duration,
+                "response": outcome["response"]
+            }
+            if outcome["error"] is not None:
+                result["error"] = outcome["error"]
+
+            # 延迟统计与SLO检查（仅在响应符合期望时判定SLO）
+            if test_case.repetitions > 1 or test_case.latency_slos:
+                result["latency"] = summarize_latencies(outcome["latencies"], test_case.latency_slos, test_case.warmup)
+                slo_error = describe_slo_violations(result["latency"])
+                if result["passed"] and slo_error:
+                    result["passed"] = False
+                    result["slo_violated"] = True
+                    result["error"] = slo_error
+
+            return result
+
+        except TestTimeoutError as e:
+            duration = time.time() - start_time
+            return {
+                "test_name": test_case.name,
+                "endpoint": test_case.endpoint,
+                "method": test_case.method,
+                "passed": False,
+                "timed_out": True,
+                "cancelled": e.cancelled,
+                "duration": duration,
+                "error": str(e)
+            }
 
         except Exception as e:
             duration = time.time() - start_time
@@ -201,9 +230,14 @@ class APITestRunner:
 # 预定义测试套件
 # ============================================================================
 
-def create_basic_test_suite() -> APITestRunner:
+# 完整测试套件中的延迟SLO：预热后重复执行，p95 延迟超标即判定失败
+SLO_REPETITIONS = 200
+SLO_WARMUP = 20
+SLO_P95_MS = 20.0
+
+def create_basic_test_suite(workers: int = 1) -> APITestRunner:
     """创建基础测试套件"""
-    runner = APITestRunner()
+    runner = APITestRunner(workers)
 
     # 基础状态测试
     runner.add_test_case(APITestCase(
@@ -242,9 +276,9 @@ def create_basic_test_suite() -> APITestRunner:
 
     return runner
 
-def create_full_test_suite() -> APITestRunner:
+def create_full_test_suite(workers: int = 1) -> APITestRunner:
     """创建完整测试套件"""
-    runner = create_basic_test_suite()
+    runner = create_basic_test_suite(workers)
 
     # POST端点测试（当前都是NOT_IMPLEMENTED状态）
     post_endpoints = [
@@ -257,6 +291,9 @@ def create_full_test_suite() -> APITestRunner:
         ("插件修复", "/api/fix-augment-plugin")
     ]
 
+    # 会修改全局状态的端点，并行执行时独占运行
+    exclusive_endpoints = {"/api/clean", "/api/reset"}
+
     for name, endpoint in post_endpoints:
         if endpoint == "/api/clean":
             # 清理操作需要特殊处理 - 测试无选项的情况
@@ -273,15 +310,25 @@ def create_full_test_suite() -> APITestRunner:
                 endpoint,
                 "POST",
                 {"smart_clean_database": True}
-            ))
+            ).set_isolation(ISOLATION_EXCLUSIVE))
         else:
             # 其他端点正常测试
-            runner.add_test_case(APITestCase(
+            test_case = APITestCase(
                 name,
                 endpoint,
                 "POST",
                 {"test": True}
-            ))
+            )
+            if endpoint in exclusive_endpoints:
+                test_case.set_isolation(ISOLATION_EXCLUSIVE)
+            runner.add_test_case(test_case)
+
+    # 延迟SLO测试（独占执行，避免并行测试干扰测量）
+    # 每次请求前清除响应缓存，测量的是处理函数的实际耗时而不是缓存命中
+    for name, endpoint in (("基础状态", "/api/status"), ("系统状态", "/api/system-status")):
+        test_case = APITestCase(f"{name} - 延迟SLO", endpoint, "GET").bypass_response_cache()
+        test_case.set_repetitions(SLO_REPETITIONS, warmup=SLO_WARMUP).assert_latency(95, SLO_P95_MS)
+        runner.add_test_case(test_case.set_isolation(ISOLATION_EXCLUSIVE))
 
     return runner
 
@@ -289,14 +336,14 @@ def create_full_test_suite() -> APITestRunner:
 # 便捷函数
 # ============================================================================
 
-def run_basic_tests() -> Dict[str, Any]:
+def run_basic_tests(workers: int = 1) -> Dict[str, Any]:
     """运行基础测试"""
-    runner = create_basic_test_suite()
+    runner = create_basic_test_suite(workers)
     return runner.run_all_tests()
 
-def run_full_tests() -> Dict[str, Any]:
+def run_full_tests(workers: int = 1) -> Dict[str, Any]:
     """运行完整测试"""
-    runner = create_full_test_suite()
+    runner = create_full_test_suite(workers)
     return runner.run_all_tests()
 
 # ============================================================================
@@ -304,16 +351,28 @@ def run_full_tests() -> Dict[str, Any]:
 # ============================================================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CodeStudio Pro Ultimate - API测试框架")
+    parser.add_argument("--suite", choices=["basic", "full"], help="测试套件（不指定时交互选择）")
+    parser.add_argument("--workers", type=parse_workers, default=1,
+                        help="并行执行的工作线程数，0 或 auto 表示CPU核心数 (默认: 1，串行)")
+    args = parser.parse_args()
+
     print("🚀 CodeStudio Pro Ultimate - API测试框架")
-    print("选择测试模式:")
-    print("1. 基础测试")
-    print("2. 完整测试")
+    choice = {"basic": "1", "full": "2"}.get(args.suite)
+    if choice is None:
+        print("选择测试模式:")
+        print("1. 基础测试")
+        print("2. 完整测试")
 
-    choice = input("请输入选择 (1-2): ").strip()
+        choice = input("请输入选择 (1-2): ").strip()
 
     if choice == "1":
-        run_basic_tests()
+        report = run_basic_tests(args.workers)
     elif choice == "2":
-        run_full_tests()
+        report = run_full_tests(args.workers)
     else:
         print("❌ 无效选择")
+        sys.exit(2)
+
+    # 存在失败（含超时和延迟SLO未满足）时以非零退出码结束
+    sys.exit(1 if report["summary"]["failed"] else 0)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 请求阶段追踪
+为统一API管理器记录单次请求内各处理阶段的耗时，并导出为 Chrome Trace / Perfetto JSON
+
+版本: 1.0
+作者: AI Assistant
+功能: perf_counter_ns 阶段打点、环形缓冲区、阶段耗时汇总、Chrome Trace 事件导出
+特色: 默认关闭，关闭时每个打点只是一次空方法调用；开启后请求完成时整体写入环形缓冲区
+"""
+
+import os
+import json
+import time
+import heapq
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, List, Tuple
+
+from api_stats import percentile
+
+# ============================================================================
+# 常量
+# ============================================================================
+
+# 通过环境变量在启动时开启追踪
+TRACE_ENV_VAR = "CODESTUDIO_API_TRACE"
+
+DEFAULT_TRACE_CAPACITY = 10000
+
+# ============================================================================
+# 单次请求追踪
+# ============================================================================
+
+class _NullTrace:
+    """追踪关闭时使用的空追踪对象"""
+
+    __slots__ = ()
+
+    def mark(self, stage: str):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+class RequestTrace:
+    """单次请求的阶段记录
+
+    每次 mark(stage) 记录一个阶段：从上一次打点（或请求开始）到当前时刻。
+    """
+
+    __slots__ = ("method", "path", "pattern", "status", "thread_id", "thread_name",
+                 "start_ns", "end_ns", "last_ns", "stages")
+
+    def __init__(self, path: str, method: str):
+        current = threading.current_thread()
+        self.method = method
+        self.path = path
+        self.pattern: Optional[str] = None
+        self.status: Optional[int] = None
+        self.thread_id = current.ident
+        self.thread_name = current.name
+        self.start_ns = self.last_ns = time.perf_counter_ns()
+        self.end_ns = self.start_ns
+        self.stages: List[Tuple[str, int, int]] = []
+
+    def mark(self, stage: str):
+        """结束一个阶段"""
+        now = time.perf_counter_ns()
+        self.stages.append((stage, self.last_ns, now))
+        self.last_ns = now
+
+# ============================================================================
+# 请求追踪器
+# ============================================================================
+
+class RequestTracer:
+    """请求阶段追踪器
+
+    begin() 在追踪关闭时返回 NULL_TRACE；finish() 把完成的追踪放入固定容量的环形缓冲区，
+    缓冲区满后丢弃最早的记录。
+    """
+
+    def __init__(self, capacity: int = DEFAULT_TRACE_CAPACITY, enabled: Optional[bool] = None):
+        if enabled is None:
+            enabled = os.environ.get(TRACE_ENV_VAR, "").lower() in ("1", "true", "yes", "on")
+        self.enabled = enabled
+        self._buffer: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._buffer.maxlen
+
+    # ------------------------------------------------------------------------
+    # 记录
+    # ------------------------------------------------------------------------
+
+    def begin(self, path: str, method: str):
+        """开始追踪一个请求"""
+        if not self.enabled:
+            return NULL_TRACE
+        return RequestTrace(path, method)
+
+    def finish(self, trace: Any, pattern: Optional[str], response: Any):
+        """结束追踪并写入环形缓冲区"""
+        if trace is NULL_TRACE:
+            return
+        from api_response import http_status_for
+
+        trace.end_ns = trace.last_ns
+        trace.pattern = pattern
+        trace.status = http_status_for(response)
+        # deque.append 本身是原子的，计数器由锁保护
+        self._buffer.append(trace)
+        with self._lock:
+            self.recorded += 1
+
+    # ------------------------------------------------------------------------
+    # 控制
+    # ------------------------------------------------------------------------
+
+    def configure(self, enabled: Optional[bool] = None, capacity: Optional[int] = None,
+                  clear: bool = False):
+        """开关追踪、调整缓冲区容量或清空已记录的追踪"""
+        with self._lock:
+            if capacity is not None and capacity > 0 and capacity != self._buffer.maxlen:
+                self._buffer = deque(self._buffer, maxlen=capacity)
+            if clear:
+                self._buffer.clear()
+                self.recorded = 0
+        if enabled is not None:
+            self.enabled = bool(enabled)
+
+    def traces(self) -> List[RequestTrace]:
+        """已记录追踪的快照（按完成顺序）"""
+        return list(self._buffer)
+
+    # ------------------------------------------------------------------------
+    # 导出
+    # ------------------------------------------------------------------------
+
+    def summarize(self) -> Dict[str, Any]:
+        """按阶段汇总耗时（毫秒）"""
+        traces = self.traces()
+        durations: Dict[str, List[float]] = {}
+        for trace in traces:
+            for stage, start_ns, end_ns in trace.stages:
+                durations.setdefault(stage, []).append((end_ns - start_ns) / 1e6)
+
+        stages = {}
+        for stage, values in durations.items():
+            values.sort()
+            stages[stage] = {
+                "count": len(values),
+                "total_ms": round(sum(values), 3),
+                "average_ms": round(sum(values) / len(values), 4),
+                "p50_ms": round(percentile(values, 50), 4),
+                "p99_ms": round(percentile(values, 99), 4),
+                "max_ms": round(values[-1], 4),
+            }
+
+        return {
+            "enabled": self.enabled,
+            "capacity": self.capacity,
+            "buffered": len(traces),
+            "recorded": self.recorded,
+            "stages": stages
+        }
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """导出为 Chrome Trace Event 格式（可在 chrome://tracing 或 ui.perfetto.dev 打开）
+
+        每个请求是一个完整事件，各阶段是嵌套在其中的子事件。并发请求按时间分配到不同的轨道，
+        互不重叠的请求复用同一轨道，轨道数约等于最大并发数。
+        """
+        pid = os.getpid()
+        traces = sorted(self.traces(), key=lambda t: t.start_ns)
+        events: List[Dict[str, Any]] = []
+
+        # 贪心分配轨道: (结束时间, 轨道号)
+        busy: List[Tuple[int, int]] = []
+        free_lanes: List[int] = []
+        lane_count = 0
+
+        for trace in traces:
+            while busy and busy[0][0] <= trace.start_ns:
+                heapq.heappush(free_lanes, heapq.heappop(busy)[1])
+            if free_lanes:
+                lane = heapq.heappop(free_lanes)
+            else:
+                lane = lane_count
+                lane_count += 1
+            heapq.heappush(busy, (trace.end_ns, lane))
+
+            events.append({
+                "name": f"{trace.method} {trace.pattern or trace.path}",
+                "cat": "request",
+                "ph": "X",
+                "ts": trace.start_ns / 1000,
+                "dur": (trace.end_ns - trace.start_ns) / 1000,
+                "pid": pid,
+                "tid": lane,
+                "args": {
+                    "path": trace.path,
+                    "status": trace.status,
+                    "thread": trace.thread_name,
+                    "thread_id": trace.thread_id
+                }
+            })
+            for stage, start_ns, end_ns in trace.stages:
+                events.append({
+                    "name": stage,
+                    "cat": "stage",
+                    "ph": "X",
+                    "ts": start_ns / 1000,
+                    "dur": (end_ns - start_ns) / 1000,
+                    "pid": pid,
+                    "tid": lane
+                })
+
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "CodeStudio API"}})
+        for lane in range(lane_count):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": lane,
+                           "args": {"name": f"requests #{lane}"}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, file_path: str) -> int:
+        """将 Chrome Trace JSON 写入文件，返回导出的请求数"""
+        trace = self.to_chrome_trace()
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False)
+        return sum(1 for event in trace["traceEvents"] if event.get("cat") == "request")
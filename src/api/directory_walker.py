@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 目录树遍历引擎
+基于 os.scandir 的并行目录遍历，生成与 _get_directory_structure 相同格式的嵌套结构
+
+版本: 1.0
+作者: AI Assistant
+功能: DirEntry 类型缓存（普通条目不再额外 stat）、按顶层目录及其子目录分发到线程池、权限错误记录、符号链接环检测、合成目录树基准测试
+特色: scandir 在系统调用期间释放 GIL，多个子树可以真正并行读取目录
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Union
+
+PathLike = Union[str, Path]
+
+# ============================================================================
+# 目录树遍历引擎
+# ============================================================================
+
+class DirectoryTreeWalker:
+    """目录树遍历引擎
+
+    输出格式与原有实现一致::
+
+        {"exists": True, "files": [文件名...], "directories": {目录名: 子结构}, "error": "权限不足"(可选)}
+
+    到达深度上限的目录输出 {"exists": True}。符号链接与原实现一样跟随，
+    指向自身祖先目录的链接输出 {"exists": True, "symlink_loop": True} 而不再展开。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or min(16, (os.cpu_count() or 1) * 2)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    # ------------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------------
+
+    def build_structure(self, directory: PathLike, max_depth: int = 2) -> Dict[str, Any]:
+        """遍历单个目录（子目录分发到线程池）"""
+        return self.build_structures({"root": directory}, max_depth)["root"]
+
+    def build_structures(self, directories: Dict[str, PathLike], max_depth: int = 2) -> Dict[str, Dict[str, Any]]:
+        """并行遍历多个顶层目录，返回 {键: 结构}
+
+        顶层目录在当前线程读取，其下每个子目录的子树作为一个任务提交到线程池，
+        任务之间互不等待，不会出现线程池内嵌套等待导致的死锁。
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: List[Tuple[Dict[str, Any], str, Any]] = []
+
+        for key, directory in directories.items():
+            directory = str(directory)
+            if max_depth <= 0 or not os.path.isdir(directory):
+                results[key] = {"exists": os.path.exists(directory)}
+                continue
+
+            real = os.path.realpath(directory)
+            structure, subdirs = self._scan(directory)
+            results[key] = structure
+
+            for name, path, is_link in subdirs:
+                child_real = os.path.realpath(path) if is_link else os.path.join(real, name)
+                if is_link and _is_ancestor(child_real, real):
+                    structure["directories"][name] = {"exists": True, "symlink_loop": True}
+                    continue
+                if max_depth <= 1:
+                    structure["directories"][name] = {"exists": True}
+                    continue
+                future = self._get_executor().submit(
+                    self._walk, path, child_real, max_depth, 1, (real,)
+                )
+                # 先占位保持条目顺序与 scandir 顺序一致
+                structure["directories"][name] = None
+                pending.append((structure["directories"], name, future))
+
+        for container, name, future in pending:
+            container[name] = future.result()
+        return results
+
+    def shutdown(self, wait: bool = True):
+        """关闭线程池"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    # ------------------------------------------------------------------------
+    # 遍历实现
+    # ------------------------------------------------------------------------
+
+    def _walk(self, directory: str, real: str, max_depth: int, current_depth: int,
+              ancestors: Tuple[str, ...]) -> Dict[str, Any]:
+        """在单个线程内递归遍历子树"""
+        if current_depth >= max_depth:
+            return {"exists": True}
+
+        structure, subdirs = self._scan(directory)
+        ancestors = ancestors + (real,)
+        for name, path, is_link in subdirs:
+            child_real = os.path.realpath(path) if is_link else os.path.join(real, name)
+            if is_link and any(_is_ancestor(child_real, ancestor) for ancestor in ancestors):
+                structure["directories"][name] = {"exists": True, "symlink_loop": True}
+                continue
+            structure["directories"][name] = self._walk(path, child_real, max_depth, current_depth + 1, ancestors)
+        return structure
+
+    @staticmethod
+    def _scan(directory: str) -> Tuple[Dict[str, Any], List[Tuple[str, str, bool]]]:
+        """读取单个目录，返回 (结构, [(子目录名, 路径, 是否符号链接)])
+
+        普通条目的类型来自 DirEntry 缓存的 d_type，不产生额外系统调用；
+        只有符号链接需要 stat 其目标。
+        """
+        structure: Dict[str, Any] = {"exists": True, "files": [], "directories": {}}
+        subdirs: List[Tuple[str, str, bool]] = []
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_file():
+                            structure["files"].append(entry.name)
+                        elif entry.is_dir():
+                            structure["directories"][entry.name] = None
+                            subdirs.append((entry.name, entry.path, entry.is_symlink()))
+                    except OSError:
+                        continue
+        except PermissionError:
+            structure["error"] = "权限不足"
+        except OSError as e:
+            structure["error"] = str(e)
+        return structure, subdirs
+
+    def _get_executor(self):
+        """获取线程池（延迟创建）"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="tree-walker"
+                    )
+        return self._executor
+
+
+def _is_ancestor(target: str, directory: str) -> bool:
+    """target 是否为 directory 本身或其祖先目录"""
+    return directory == target or directory.startswith(target.rstrip(os.sep) + os.sep)
+
+# ============================================================================
+# 原有实现（基准对照）
+# ============================================================================
+
+def legacy_directory_structure(directory: Path, max_depth: int = 2, current_depth: int = 0) -> Dict[str, Any]:
+    """原 _get_directory_structure 实现：iterdir 后逐项 is_file/is_dir"""
+    if current_depth >= max_depth or not directory.exists():
+        return {"exists": directory.exists()}
+
+    structure = {
+        "exists": True,
+        "files": [],
+        "directories": {}
+    }
+
+    try:
+        for item in directory.iterdir():
+            if item.is_file():
+                structure["files"].append(item.name)
+            elif item.is_dir():
+                structure["directories"][item.name] = legacy_directory_structure(
+                    item, max_depth, current_depth + 1
+                )
+    except PermissionError:
+        structure["error"] = "权限不足"
+
+    return structure
+
+# ============================================================================
+# 基准测试
+# ============================================================================
+
+def create_synthetic_tree(root: PathLike, total_entries: int = 100000, top_dirs: int = 5,
+                          subdirs_per_dir: int = 20, files_per_dir: int = 50) -> int:
+    """创建合成目录树，返回创建的条目数（文件+目录）
+
+    结构为 top_dirs 个顶层目录，每层 subdirs_per_dir 个子目录，叶子目录放 files_per_dir 个文件，
+    直到条目总数达到 total_entries。
+    """
+    root = Path(root)
+    created = 0
+    level2 = 0
+    while created < total_entries:
+        for top in range(top_dirs):
+            top_dir = root / f"top-{top}"
+            if not top_dir.exists():
+                top_dir.mkdir(parents=True)
+                created += 1
+            mid_dir = top_dir / f"mid-{level2 // subdirs_per_dir}" / f"leaf-{level2 % subdirs_per_dir}"
+            mid_dir.mkdir(parents=True, exist_ok=True)
+            created += 2
+            for index in range(files_per_dir):
+                (mid_dir / f"file-{index}.txt").touch()
+            created += files_per_dir
+            if created >= total_entries:
+                break
+        level2 += 1
+    return created
+
+
+def benchmark_walkers(total_entries: int = 100000, max_depth: int = 4, runs: int = 3,
+                      workers: Tuple[int, ...] = (1, 4, 8)) -> Dict[str, Any]:
+    """在合成目录树上比较原实现与 scandir 遍历引擎（取多次运行的最优值）"""
+    root = Path(tempfile.mkdtemp(prefix="codestudio-walker-"))
+    try:
+        created = create_synthetic_tree(root, total_entries)
+        tops = {path.name: path for path in sorted(root.iterdir())}
+
+        def best_of(func) -> Tuple[float, Any]:
+            best, result = None, None
+            for _ in range(runs):
+                start = time.perf_counter()
+                result = func()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best, result
+
+        legacy_time, legacy_result = best_of(
+            lambda: {key: legacy_directory_structure(path, max_depth) for key, path in tops.items()}
+        )
+
+        results: Dict[str, Any] = {
+            "entries": created,
+            "max_depth": max_depth,
+            "legacy_ms": round(legacy_time * 1000, 1),
+            "scandir": {}
+        }
+        for count in workers:
+            walker = DirectoryTreeWalker(max_workers=count)
+            try:
+                elapsed, result = best_of(lambda: walker.build_structures(tops, max_depth))
+            finally:
+                walker.shutdown()
+            results["scandir"][f"workers_{count}"] = {
+                "ms": round(elapsed * 1000, 1),
+                "speedup": round(legacy_time / elapsed, 2) if elapsed > 0 else None,
+                "identical": result == legacy_result
+            }
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+# ============================================================================
+# 主函数 - 用于基准测试
+# ============================================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CodeStudio Pro Ultimate - 目录树遍历基准测试")
+    parser.add_argument("--entries", type=int, default=100000, help="合成目录树的条目数")
+    parser.add_argument("--depth", type=int, default=4, help="遍历深度上限")
+    parser.add_argument("--runs", type=int, default=3, help="每种实现的运行次数")
+    args = parser.parse_args()
+
+    print("🚀 CodeStudio Pro Ultimate - 目录树遍历基准测试")
+    print("=" * 60)
+
+    report = benchmark_walkers(args.entries, args.depth, args.runs)
+    print(f"📁 合成条目: {report['entries']}  深度上限: {report['max_depth']}")
+    print(f"  原实现 (iterdir + is_file/is_dir): {report['legacy_ms']} ms")
+    for name, item in report["scandir"].items():
+        print(f"  scandir {name}: {item['ms']} ms  (x{item['speedup']}, 结果一致: {'✅' if item['identical'] else '❌'})")
@@ -13,10 +13,43 @@ import json
 import time
 import os
 import sys
-from typing import Dict, Any, Optional, Callable, List
+import inspect
+import socket
+import sqlite3
+import functools
+import ipaddress
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, List, Set, Tuple
 from pathlib import Path
 from datetime import datetime
 
+from api_route_table import CompiledRouteTable, split_request_target, build_handler_args, handler_accepts_data
+from api_response_cache import ResponseCache
+from api_log_writer import BackgroundLogWriter, acquire_log_writer
+from api_metrics import APIMetrics, PROMETHEUS_CONTENT_TYPE
+from api_response import RawResponse, JSONResponse, ConstantPayload, StreamingResponse, http_status_for
+from api_tracing import RequestTracer, NULL_TRACE
+from dynamic_path_watcher import PathWatcher, stat_metadata
+from directory_walker import DirectoryTreeWalker
+from project_structure_stream import (StructureQuery, STRUCTURE_QUERY_KEYS, NDJSON_CONTENT_TYPE,
+                                      collect_page, iter_ndjson_page)
+from project_structure_index import ProjectStructureIndex, INDEX_FILE_NAME
+from file_index import (FileIndex, ExcludeRules, DEFAULT_EXCLUDES, DEFAULT_CHECK_INTERVAL,
+                        compile_glob, iter_glob)
+from path_validator import PathValidator, check_path, summarize_results, ACCESS_READ, MAX_BULK_PATHS
+from project_root_resolver import resolve_project_root, get_project_root_resolver
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _is_string_list(value: Any) -> bool:
+    """请求参数是否为字符串列表"""
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
 # ============================================================================
 # 动态路径管理器
 # ============================================================================
@@ -24,43 +57,78 @@ from datetime import datetime
 class DynamicPathManager:
     """动态路径管理器 - 核心路径计算引擎"""
 
+    # 项目信息快照的mtime复查间隔（秒），间隔内读取快照不产生文件系统调用
+    PROJECT_INFO_CHECK_INTERVAL = 1.0
+
+    # 按 (脚本目录, 项目根目录) 共享的路径映射，所有实例只读共用
+    _shared_paths: Dict[tuple, Dict[str, Path]] = {}
+    _shared_paths_lock = threading.Lock()
+
+    # 按 (搜索目录, 排除规则) 共享的文件索引，以及多目录并行查找的线程池
+    _file_indexes: Dict[tuple, FileIndex] = {}
+    _file_index_lock = threading.Lock()
+    _search_executor = None
+    FILE_INDEX_CHECK_INTERVAL = DEFAULT_CHECK_INTERVAL
+
+    # 多实例目录布局（与 scripts/cleanup_execution.py 的 calculate_paths 一致）
+    INSTANCE_PATH_LAYOUT = {
+        "project_root": (),
+        "user_data": ("user-data",),
+        "extensions": ("extensions",),
+        "workspace": ("workspace",),
+        "logs": ("logs",),
+        "temp": ("temp",)
+    }
+
+    # 实例路径映射的 LRU 缓存容量
+    INSTANCE_CACHE_SIZE = 1024
+
     def __init__(self):
-        # 获取项目根目录：从脚本位置向上计算
+        # 获取项目根目录：共享解析器按脚本位置记忆，进程内只查找一次
         self.script_dir = Path(__file__).parent
         self.project_root = self._calculate_project_root()
-        self.paths = self._initialize_paths()
+        self.paths = self._get_shared_paths()
 
-    def _calculate_project_root(self) -> Path:
-        """动态计算项目根目录"""
-        # 从当前脚本位置向上查找项目根目录
-        current = self.script_dir
-
-        # 查找标志性文件来确定项目根目录
-        root_indicators = [
-            "codestudiopro.exe",
-            "data",
-            "resources",
-            "tools"
-        ]
+        # 项目信息快照
+        self._project_info_lock = threading.Lock()
+        self._project_info: Optional[Dict[str, Any]] = None
+        self._project_info_mtimes: Optional[tuple] = None
+        self._project_info_checked = 0.0
+        self.project_info_version = 0
 
-        # 最多向上查找5级目录
-        for _ in range(5):
-            # 检查是否包含项目根目录的标志性文件/目录
-            indicators_found = sum(1 for indicator in root_indicators
-                                 if (current / indicator).exists())
+        # 路径监视器（start_watching 后路径元数据从内存读取）
+        self.watcher: Optional[PathWatcher] = None
 
-            # 如果找到至少2个标志性文件/目录，认为是项目根目录
-            if indicators_found >= 2:
-                return current
+        # 多实例路径注册表：未登记的实例位于 instances_root/<实例ID>
+        self.instances_root = self.project_root / "instances"
+        self._instance_roots: Dict[str, Path] = {}
+        self._instance_paths: "OrderedDict[str, Dict[str, Path]]" = OrderedDict()
+        self._instance_lock = threading.Lock()
+        self.instance_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
 
-            # 向上一级目录
-            parent = current.parent
-            if parent == current:  # 已到达文件系统根目录
-                break
-            current = parent
-
-        # 如果没找到，使用脚本目录的上两级作为默认值
-        return self.script_dir.parent.parent
+    def _calculate_project_root(self) -> Path:
+        """动态计算项目根目录（CODESTUDIO_PROJECT_ROOT 环境变量优先）"""
+        return resolve_project_root(self.script_dir)
+
+    def _get_shared_paths(self) -> Dict[str, Path]:
+        """获取共享路径映射，同一项目根目录的实例共用一个字典"""
+        key = (str(self.script_dir), str(self.project_root))
+        paths = self._shared_paths.get(key)
+        if paths is None:
+            with self._shared_paths_lock:
+                paths = self._shared_paths.get(key)
+                if paths is None:
+                    paths = self._shared_paths[key] = self._initialize_paths()
+        return paths
+
+    @classmethod
+    def clear_path_cache(cls):
+        """清空项目根目录记忆和共享路径映射（环境变量或目录布局变化后调用）"""
+        get_project_root_resolver().clear()
+        with cls._shared_paths_lock:
+            cls._shared_paths.clear()
+        with cls._file_index_lock:
+            cls._file_indexes.clear()
 
     def _initialize_paths(self) -> Dict[str, Path]:
         """初始化所有路径"""
@@ -125,36 +193,299 @@ class DynamicPathManager:
     def ensure_directory(self, path_key: str) -> Path:
         """确保目录存在"""
         path = self.get_path(path_key)
-        path.mkdir(parents=True, exist_ok=True)
+        if not path.is_dir():
+            path.mkdir(parents=True, exist_ok=True)
+            self.refresh_project_info()
         return path
 
-    def find_files(self, pattern: str, search_dirs: List[str] = None) -> List[Path]:
-        """在指定目录中查找文件"""
+    def find_files(self, pattern: str, search_dirs: List[str] = None,
+                   exclude: Optional[List[str]] = DEFAULT_EXCLUDES, use_index: bool = True,
+                   refresh: bool = False) -> List[Path]:
+        """在指定目录中查找文件（模式语义同 Path.glob）
+
+        默认经由按文件名/后缀索引的内存文件索引查找，索引按目录mtime增量刷新（最多滞后
+        FILE_INDEX_CHECK_INTERVAL 秒，refresh=True 时立即刷新）。exclude 中的子树
+        （默认 resources/app、node_modules 等）不参与查找；模式的字面前缀本身指向被排除目录时，
+        直接在该目录内剪枝遍历。多个搜索目录在线程池中并行查找，结果按 search_dirs 顺序合并。
+        与 Path.glob 一致，Windows 上匹配不区分大小写，其他平台区分大小写。
+        """
         if search_dirs is None:
             search_dirs = ["project_root"]
 
-        found_files = []
-        for dir_key in search_dirs:
-            search_dir = self.get_path(dir_key)
-            if search_dir.exists():
-                found_files.extend(search_dir.glob(pattern))
+        compiled = compile_glob(pattern)
+        rules = ExcludeRules(exclude or (), self.project_root)
+        search_paths = [self.get_path(dir_key) for dir_key in search_dirs]
+
+        def search(search_dir: Path) -> List[Path]:
+            if not search_dir.is_dir():
+                return []
+            root = str(search_dir)
+            if rules.excluded_along(root, compiled.literal_prefix):
+                return list(iter_glob(search_dir, compiled, rules.without_ancestors_of(
+                    os.path.join(root, *compiled.literal_prefix.split("/")))))
+            if not use_index:
+                return list(iter_glob(search_dir, compiled, rules))
+            return self._get_file_index(root, rules).find(compiled, refresh=refresh)
+
+        if len(search_paths) == 1:
+            return search(search_paths[0])
 
+        found_files = []
+        for files in self._get_search_executor().map(search, search_paths):
+            found_files.extend(files)
         return found_files
 
+    @classmethod
+    def _get_file_index(cls, root: str, rules: ExcludeRules) -> FileIndex:
+        """获取共享文件索引（首次查找时建立）"""
+        key = (root, rules.key())
+        index = cls._file_indexes.get(key)
+        if index is None:
+            with cls._file_index_lock:
+                index = cls._file_indexes.get(key)
+                if index is None:
+                    index = cls._file_indexes[key] = FileIndex(root, rules, cls.FILE_INDEX_CHECK_INTERVAL)
+        return index
+
+    @classmethod
+    def _get_search_executor(cls):
+        """获取多目录查找线程池（延迟创建）"""
+        if cls._search_executor is None:
+            with cls._file_index_lock:
+                if cls._search_executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    cls._search_executor = ThreadPoolExecutor(
+                        max_workers=min(8, (os.cpu_count() or 1) + 2),
+                        thread_name_prefix="find-files"
+                    )
+        return cls._search_executor
+
+    def get_file_index_stats(self) -> List[Dict[str, Any]]:
+        """文件索引统计"""
+        with self._file_index_lock:
+            indexes = list(self._file_indexes.values())
+        return [index.get_stats() for index in indexes]
+
+    # ------------------------------------------------------------------------
+    # 多实例路径
+    # ------------------------------------------------------------------------
+
+    def register_instance(self, instance_id: str, root: Optional[Path] = None) -> Dict[str, Path]:
+        """登记实例根目录（默认 instances_root/<实例ID>），返回实例路径映射"""
+        instance_id = self._check_instance_id(instance_id)
+        with self._instance_lock:
+            self._instance_roots[instance_id] = Path(root) if root is not None else self.instances_root / instance_id
+            self._instance_paths.pop(instance_id, None)
+        return self.get_instance_paths(instance_id)
+
+    def unregister_instance(self, instance_id: str) -> bool:
+        """注销实例并移出缓存（不删除磁盘上的目录）"""
+        with self._instance_lock:
+            self._instance_paths.pop(instance_id, None)
+            return self._instance_roots.pop(instance_id, None) is not None
+
+    def list_instances(self) -> List[str]:
+        """已登记的实例ID"""
+        with self._instance_lock:
+            return list(self._instance_roots)
+
+    def is_registered(self, instance_id: str) -> bool:
+        """实例是否已登记（不复制实例列表）"""
+        with self._instance_lock:
+            return instance_id in self._instance_roots
+
+    def get_instance_paths(self, instance_id: str) -> Dict[str, Path]:
+        """获取实例路径映射（LRU 缓存，查找耗时与实例数量无关）"""
+        with self._instance_lock:
+            paths = self._instance_paths.get(instance_id)
+            if paths is not None:
+                self._instance_paths.move_to_end(instance_id)
+                self.instance_cache_stats["hits"] += 1
+                return paths
+
+            root = self._instance_roots.get(instance_id)
+            if root is None:
+                root = self.instances_root / self._check_instance_id(instance_id)
+            paths = {key: root.joinpath(*parts) for key, parts in self.INSTANCE_PATH_LAYOUT.items()}
+
+            self.instance_cache_stats["misses"] += 1
+            self._instance_paths[instance_id] = paths
+            if len(self._instance_paths) > self.INSTANCE_CACHE_SIZE:
+                self._instance_paths.popitem(last=False)
+                self.instance_cache_stats["evictions"] += 1
+            return paths
+
+    def get_instance_path(self, instance_id: str, path_key: str) -> Path:
+        """获取实例的指定路径"""
+        paths = self.get_instance_paths(instance_id)
+        if path_key not in paths:
+            raise ValueError(f"未知的实例路径键: {path_key}")
+        return paths[path_key]
+
+    def ensure_paths_exist(self, instance_ids: Optional[List[str]] = None,
+                           path_keys: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """批量创建实例目录（默认全部已登记实例的全部路径），返回 {实例ID: {success, created, error}}
+
+        同一实例中作为其他目标父目录的路径不单独创建，由子目录的 makedirs 一并完成，
+        已存在的目录只产生一次 stat。instance_ids / path_keys 不是字符串列表时抛出 ValueError。
+        """
+        if instance_ids is None:
+            instance_ids = self.list_instances()
+        elif not _is_string_list(instance_ids):
+            raise ValueError("instance_ids 必须是字符串列表")
+        if path_keys is not None and not _is_string_list(path_keys):
+            raise ValueError("path_keys 必须是字符串列表")
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for instance_id in instance_ids:
+            try:
+                paths = self.get_instance_paths(instance_id)
+                targets = [paths[key] for key in (path_keys or paths)]
+            except (KeyError, ValueError) as e:
+                results[instance_id] = {"success": False, "created": 0, "error": str(e)}
+                continue
+
+            parents = {parent for target in targets for parent in target.parents}
+            created = 0
+            error = None
+            for target in targets:
+                if target in parents:
+                    continue
+                try:
+                    if not os.path.isdir(target):
+                        os.makedirs(target, exist_ok=True)
+                        created += 1
+                except (OSError, ValueError) as e:
+                    error = str(e)
+            results[instance_id] = {"success": error is None, "created": created, "error": error}
+        return results
+
+    def get_instance_cache_stats(self) -> Dict[str, Any]:
+        """实例路径缓存统计"""
+        with self._instance_lock:
+            return {
+                "registered": len(self._instance_roots),
+                "cached": len(self._instance_paths),
+                "capacity": self.INSTANCE_CACHE_SIZE,
+                **self.instance_cache_stats
+            }
+
+    @staticmethod
+    def _check_instance_id(instance_id: str) -> str:
+        """实例ID只能是单个路径段"""
+        instance_id = str(instance_id)
+        if (not instance_id or instance_id in (".", "..") or "/" in instance_id or "\\" in instance_id
+                or "\0" in instance_id):
+            raise ValueError(f"无效的实例ID: {instance_id}")
+        return instance_id
+
+    # 项目信息依赖的路径键
+    PROJECT_INFO_PATH_KEYS = ("project_root", "codestudio_exe", "data_dir", "src_dir", "core_dir", "api_dir")
+
+    def start_watching(self, backend: str = "auto", poll_interval: float = 2.0) -> PathWatcher:
+        """启动路径监视器，之后路径元数据和项目信息由文件系统事件驱动更新"""
+        if self.watcher is None:
+            watcher = PathWatcher(self.paths, backend=backend, poll_interval=poll_interval)
+            watcher.subscribe(self._on_path_change)
+            self.watcher = watcher.start()
+            self.refresh_project_info()
+        return self.watcher
+
+    def stop_watching(self):
+        """停止路径监视器"""
+        watcher, self.watcher = self.watcher, None
+        if watcher is not None:
+            watcher.stop()
+
+    def get_path_metadata(self, path_key: str) -> Dict[str, Any]:
+        """获取路径元数据（存在性、类型、大小、修改时间），监视器运行时不产生文件系统调用"""
+        watcher = self.watcher
+        if watcher is not None and watcher.running:
+            metadata = watcher.get(path_key)
+            if metadata is not None:
+                return metadata
+        return stat_metadata(self.get_path(path_key))
+
+    def _on_path_change(self, event: Dict[str, Any]):
+        """路径变化时重建项目信息快照"""
+        if event["key"] in self.PROJECT_INFO_PATH_KEYS:
+            self.refresh_project_info()
+
+    def _path_exists(self, path_key: str) -> bool:
+        """路径是否存在，监视器运行时读取内存元数据"""
+        watcher = self.watcher
+        if watcher is not None and watcher.running:
+            return watcher.exists(path_key)
+        return self.get_path(path_key).exists()
+
     def get_project_info(self) -> Dict[str, Any]:
-        """获取项目信息"""
+        """获取项目信息
+
+        项目根目录和 src 目录的 mtime 未变化时复用快照（2次 stat 代替5次 exists）。
+        """
+        return dict(self._check_project_info())
+
+    def get_project_info_snapshot(self) -> Dict[str, Any]:
+        """获取项目信息快照 - 供错误响应等高频路径使用
+
+        距上次检查不足 PROJECT_INFO_CHECK_INTERVAL 时直接返回缓存的快照，不产生文件系统调用。
+        """
+        snapshot = self._project_info
+        if snapshot is None or time.monotonic() - self._project_info_checked >= self.PROJECT_INFO_CHECK_INTERVAL:
+            snapshot = self._check_project_info()
+        return dict(snapshot)
+
+    def refresh_project_info(self) -> Dict[str, Any]:
+        """立即重建项目信息快照"""
+        with self._project_info_lock:
+            self._rebuild_project_info(self._project_info_mtime_key())
+            return dict(self._project_info)
+
+    def _check_project_info(self) -> Dict[str, Any]:
+        """按目录mtime校验快照，变化时重建；监视器运行时快照由变化事件维护"""
+        watcher = self.watcher
+        if watcher is not None and watcher.running and self._project_info is not None:
+            return self._project_info
+
+        mtimes = self._project_info_mtime_key()
+        with self._project_info_lock:
+            if self._project_info is None or mtimes != self._project_info_mtimes:
+                self._rebuild_project_info(mtimes)
+            self._project_info_checked = time.monotonic()
+            return self._project_info
+
+    def _project_info_mtime_key(self) -> tuple:
+        """项目信息依赖的目录mtime：条目的增删会改变其父目录的mtime"""
+        key = []
+        for path_key in ("project_root", "src_dir"):
+            try:
+                key.append(os.stat(self.paths[path_key]).st_mtime_ns)
+            except OSError:
+                key.append(None)
+        return tuple(key)
+
+    def _rebuild_project_info(self, mtimes: tuple):
+        """重建项目信息快照（调用方需持有锁）"""
+        self.project_info_version += 1
+        self._project_info = self._build_project_info()
+        self._project_info_mtimes = mtimes
+        self._project_info_checked = time.monotonic()
+
+    def _build_project_info(self) -> Dict[str, Any]:
+        """收集项目信息"""
         return {
             "project_root": str(self.project_root),
             "script_location": str(self.script_dir),
-            "codestudio_exe_exists": self.get_path("codestudio_exe").exists(),
-            "data_dir_exists": self.get_path("data_dir").exists(),
+            "codestudio_exe_exists": self._path_exists("codestudio_exe"),
+            "data_dir_exists": self._path_exists("data_dir"),
             "src_structure_exists": all([
-                self.get_path("src_dir").exists(),
-                self.get_path("core_dir").exists(),
-                self.get_path("api_dir").exists()
+                self._path_exists("src_dir"),
+                self._path_exists("core_dir"),
+                self._path_exists("api_dir")
             ]),
             "total_paths": len(self.paths),
-            "calculation_method": "dynamic_from_script_location"
+            "calculation_method": "dynamic_from_script_location",
+            "info_version": self.project_info_version
         }
 
 # ============================================================================
@@ -167,8 +498,12 @@ class EnhancedAPIResponse:
     @staticmethod
     def success(data: Any = None, message: str = "操作成功",
                 path_info: Dict[str, Any] = None) -> Dict[str, Any]:
-        """成功响应"""
-        response = {
+        """成功响应（data 可以是预序列化的 ConstantPayload）"""
+        constant = None
+        if isinstance(data, ConstantPayload):
+            constant, data = data, data.value
+
+        fields = {
             "success": True,
             "message": message,
             "data": data,
@@ -177,15 +512,15 @@ class EnhancedAPIResponse:
         }
 
         if path_info:
-            response["path_info"] = path_info
+            fields["path_info"] = path_info
 
-        return response
+        return JSONResponse(fields, constant)
 
     @staticmethod
     def error(error_msg: str, error_code: str = "UNKNOWN_ERROR",
               data: Any = None, path_info: Dict[str, Any] = None) -> Dict[str, Any]:
         """错误响应"""
-        response = {
+        fields = {
             "success": False,
             "message": "操作失败",
             "data": data,
@@ -197,9 +532,9 @@ class EnhancedAPIResponse:
         }
 
         if path_info:
-            response["path_info"] = path_info
+            fields["path_info"] = path_info
 
-        return response
+        return JSONResponse(fields)
 
 # ============================================================================
 # 动态路径API日志记录器
@@ -208,7 +543,8 @@ class EnhancedAPIResponse:
 class DynamicPathAPILogger:
     """动态路径API日志记录器"""
 
-    def __init__(self, path_manager: DynamicPathManager, log_file: str = "api_calls.log"):
+    def __init__(self, path_manager: DynamicPathManager, log_file: str = "api_calls.log",
+                 writer: BackgroundLogWriter = None):
         self.path_manager = path_manager
         try:
             self.log_dir = path_manager.ensure_directory("logs_dir")
@@ -218,6 +554,11 @@ class DynamicPathAPILogger:
             self.log_dir = Path.cwd()
             self.log_file = self.log_dir / log_file
 
+        # 后台批量写入，保持日志文件打开
+        # 同一日志文件的记录器共享一个后台写入器
+        self.writer = writer or acquire_log_writer(self.log_file)
+        self._closed = False
+
     def log_request(self, endpoint: str, method: str, data: Dict[str, Any] = None):
         """记录API请求"""
         log_entry = {
@@ -244,13 +585,44 @@ class DynamicPathAPILogger:
         self._write_log(log_entry)
 
     def _write_log(self, entry: Dict[str, Any]):
-        """写入日志文件"""
+        """写入日志文件（交给后台写入器批量写入）"""
         try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.writer.write(entry)
         except Exception:
             pass  # 静默处理日志写入失败
 
+    def flush(self, timeout: float = 5.0) -> bool:
+        """等待已记录的日志写入文件"""
+        return self.writer.flush(timeout)
+
+    def close(self):
+        """刷写并关闭日志写入器（共享写入器在最后一个记录器关闭时停止）"""
+        if self._closed:
+            return
+        self._closed = True
+        self.writer.close()
+
+# ============================================================================
+# 单次请求的处理状态
+# ============================================================================
+
+class _RequestContext:
+    """handle_request / handle_request_async 在公共步骤之间传递的请求状态"""
+
+    __slots__ = ("path", "method", "data", "trace", "start_time", "route", "started", "response",
+                 "cache_generation")
+
+    def __init__(self, path: str, method: str, data: Any, trace: Any):
+        self.path = path
+        self.method = method
+        self.data = data
+        self.trace = trace
+        self.start_time = time.time()
+        self.route = None
+        self.started = False
+        self.response: Any = {}
+        self.cache_generation: Optional[int] = None
+
 # ============================================================================
 # 动态路径统一API管理器
 # ============================================================================
@@ -258,14 +630,46 @@ class DynamicPathAPILogger:
 class DynamicPathUnifiedAPIManager:
     """动态路径统一API管理器 - 增强版核心架构"""
 
-    def __init__(self):
+    def __init__(self, max_handler_workers: int = None, watch_paths: bool = False):
         self.path_manager = DynamicPathManager()
         self.endpoints: Dict[str, Dict[str, Callable]] = {}
+        self.routes = CompiledRouteTable()
+        self._handler_accepts_data: Dict[str, Dict[str, bool]] = {}
         self.logger = DynamicPathAPILogger(self.path_manager)
         self.middleware: List[Callable] = []
+        self.response_cache = ResponseCache()
+        self.metrics = APIMetrics()
+        self.metrics.add_collector(self._collect_component_metrics)
+        self.tracer = RequestTracer()
+        # HTTP服务启动时回填的监听地址 (host, port)，http 模式压测只允许回环地址或这些地址
+        self.server_addresses: Set[Tuple[str, int]] = set()
+        self.tree_walker = DirectoryTreeWalker()
+        self.path_validator = PathValidator()
+
+        # 项目结构增量索引（首次请求时创建，不可用时回退到目录遍历）
+        self._structure_index = None
+        self._structure_index_failed = False
+        # 最近一次索引创建/查询失败的原因，随项目结构响应返回
+        self.structure_index_error: Optional[str] = None
+        self._structure_index_lock = threading.Lock()
+
+        # 异步入口中同步处理函数使用的有界线程池
+        self.max_handler_workers = max_handler_workers or min(32, (os.cpu_count() or 1) + 4)
+        self._handler_executor = None
+        self._executor_lock = threading.Lock()
+
+        # 批量请求限制
+        self.max_batch_size = 50
+        self.batch_timeout = 10.0
 
         # 注册所有API端点
         self._register_endpoints()
+        self._configure_response_cache()
+
+        # 路径接口从监视器的内存元数据应答，路径变化时清除相关缓存；
+        # 监视线程只由长期运行的全局实例（HTTP服务）开启，临时创建的管理器不启动
+        if watch_paths:
+            self.path_manager.start_watching().subscribe(self._on_path_change)
 
     def _register_endpoints(self):
         """注册所有API端点"""
@@ -273,7 +677,10 @@ class DynamicPathUnifiedAPIManager:
         self.register_endpoint('/api/status', 'GET', self.get_basic_status)
         self.register_endpoint('/api/system-status', 'GET', self.get_system_status)
         self.register_endpoint('/api/path-info', 'GET', self.get_path_info)
+        self.register_endpoint('/api/path-events', 'GET', self.get_path_events)
         self.register_endpoint('/api/project-structure', 'GET', self.get_project_structure)
+        self.register_endpoint('/api/instances/{instance_id}/status', 'GET', self.get_instance_status)
+        self.register_endpoint('/api/instances/ensure-paths', 'POST', self.ensure_instance_paths)
         self.register_endpoint('/api/augment-plugin-status', 'GET', self.get_augment_plugin_status)
 
         # POST端点
@@ -285,17 +692,43 @@ class DynamicPathUnifiedAPIManager:
         self.register_endpoint('/api/one-click-renewal', 'POST', self.execute_one_click_renewal)
         self.register_endpoint('/api/fix-augment-plugin', 'POST', self.execute_augment_plugin_fix)
         self.register_endpoint('/api/validate-paths', 'POST', self.validate_project_paths)
+        self.register_endpoint('/api/validate-paths/bulk', 'POST', self.validate_paths_bulk)
+        self.register_endpoint('/api/batch', 'POST', self.execute_batch)
+        self.register_endpoint('/api/cache-stats', 'GET', self.get_cache_stats)
+        self.register_endpoint('/api/log-stats', 'GET', self.get_log_stats)
+        self.register_endpoint('/api/metrics', 'GET', self.get_metrics)
+        self.register_endpoint('/api/trace', 'GET', self.get_trace)
+        self.register_endpoint('/api/trace', 'POST', self.configure_trace)
+        self.register_endpoint('/api/trace/summary', 'GET', self.get_trace_summary)
 
         # 测试端点
         self.register_endpoint('/api/test/basic-paths', 'POST', self.test_basic_paths)
         self.register_endpoint('/api/test/full-paths', 'POST', self.test_full_paths)
         self.register_endpoint('/api/test/stress-paths', 'POST', self.test_stress_paths)
 
+    def _configure_response_cache(self):
+        """配置高频轮询端点的响应缓存"""
+        self.response_cache.configure('/api/system-status', ttl=2.0)
+        self.response_cache.configure('/api/path-info', ttl=5.0)
+        self.response_cache.configure('/api/augment-plugin-status', ttl=5.0)
+        self.response_cache.configure('/api/project-structure', ttl=10.0, max_entries=16,
+                                      max_bytes=4 * 1024 * 1024)
+
+        # 会修改文件系统或系统状态的写操作完成后清除全部缓存
+        for path in ('/api/clean', '/api/reset', '/api/fix-augment-plugin', '/api/quick-start',
+                     '/api/plugin-action', '/api/one-click-renewal', '/api/instances/ensure-paths'):
+            self.response_cache.add_invalidation(path)
+
     def register_endpoint(self, path: str, method: str, handler: Callable):
         """注册API端点"""
         if path not in self.endpoints:
             self.endpoints[path] = {}
+            # 编译路由，方法字典与endpoints共享
+            self._handler_accepts_data[path] = {}
+            self.routes.add_route(path, self.endpoints[path], self._handler_accepts_data[path])
         self.endpoints[path][method] = handler
+        # 处理函数签名只在注册时检查一次，结果随路由保存（不缓存处理函数，避免延长管理器生命周期）
+        self._handler_accepts_data[path][method] = handler_accepts_data(handler)
 
     def add_middleware(self, middleware: Callable):
         """添加中间件"""
@@ -303,111 +736,577 @@ class DynamicPathUnifiedAPIManager:
 
     def handle_request(self, path: str, method: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """处理API请求 - 统一入口"""
-        start_time = time.time()
-        response = {}
-
+        request = self._begin_request(path, method, data)
         try:
-            # 记录请求
-            self.logger.log_request(path, method, data)
+            handler, args = self._dispatch_request(request)
+            if handler is None:
+                return request.response
 
-            # 检查端点是否存在
-            if path not in self.endpoints:
-                return EnhancedAPIResponse.error(
-                    f"API端点不存在: {path}",
-                    "ENDPOINT_NOT_FOUND",
-                    path_info=self.path_manager.get_project_info()
-                )
+            response = handler(*args)
+            if inspect.isawaitable(response):
+                response = self._run_awaitable(response)
+            return self._complete_request(request, response)
 
-            if method not in self.endpoints[path]:
-                return EnhancedAPIResponse.error(
-                    f"不支持的HTTP方法: {method}",
-                    "METHOD_NOT_ALLOWED",
-                    path_info=self.path_manager.get_project_info()
-                )
+        except Exception as e:
+            return self._fail_request(request, e)
+
+        finally:
+            self._finish_request(request)
 
-            # 执行中间件
-            for middleware in self.middleware:
-                result = middleware(path, method, data)
-                if result is not None:
-                    return result
+    async def handle_request_async(self, path: str, method: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """处理API请求 - 异步统一入口
 
-            # 调用处理函数
-            handler = self.endpoints[path][method]
-            if data is None:
-                response = handler()
+        协程处理函数直接await，同步处理函数转交有界线程池执行，
+        中间件、日志记录和错误响应格式与 handle_request 保持一致。
+        """
+        request = self._begin_request(path, method, data)
+        try:
+            handler, args = self._dispatch_request(request)
+            if handler is None:
+                if inspect.isawaitable(request.response):
+                    request.response = await request.response
+                return request.response
+
+            if inspect.iscoroutinefunction(handler):
+                response = await handler(*args)
             else:
-                response = handler(data)
-
-            # 确保响应格式标准化
-            if not isinstance(response, dict) or 'success' not in response:
-                response = EnhancedAPIResponse.success(
-                    response,
-                    path_info=self.path_manager.get_project_info()
+                import asyncio
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(
+                    self._get_handler_executor(),
+                    functools.partial(handler, *args)
                 )
-
-            return response
+                if inspect.isawaitable(response):
+                    response = await response
+            return self._complete_request(request, response)
 
         except Exception as e:
+            return self._fail_request(request, e)
+
+        finally:
+            self._finish_request(request)
+
+    # ------------------------------------------------------------------------
+    # 请求处理公共步骤（同步与异步入口只在调用处理函数的方式上不同）
+    # ------------------------------------------------------------------------
+
+    def _begin_request(self, path: str, method: str, data: Dict[str, Any] = None) -> "_RequestContext":
+        """开始计时与追踪"""
+        return _RequestContext(path, method, data, self.tracer.begin(path, method))
+
+    def _dispatch_request(self, request: "_RequestContext") -> Tuple[Optional[Callable], Tuple[Any, ...]]:
+        """记录请求、匹配路由并执行中间件
+
+        返回 (处理函数, 调用参数)；处理函数为 None 时 request.response 为提前响应。
+        """
+        trace = request.trace
+        self.logger.log_request(request.path, request.method, request.data)
+        trace.mark("log_request")
+
+        early_response, handler, args, request.route = self._prepare_request(
+            request.path, request.method, request.data, trace)
+        if handler is None:
+            request.response = early_response
+            return None, ()
+
+        # 先记录缓存失效代数，处理期间发生失效时不缓存结果
+        request.cache_generation = self.response_cache.generation(request.route.pattern)
+        self.metrics.request_started(request.route.pattern, request.method)
+        request.started = True
+        return handler, args
+
+    def _complete_request(self, request: "_RequestContext", response: Any) -> Dict[str, Any]:
+        """标准化处理函数的返回值并更新响应缓存"""
+        request.response = response
+        request.trace.mark("handler")
+
+        # 确保响应格式标准化
+        request.response = response = self._normalize_response(response)
+        request.trace.mark("normalize")
+
+        # 更新响应缓存
+        self._update_response_cache(request.route.pattern, request.method, request.path, request.data,
+                                    response, request.cache_generation)
+        request.trace.mark("cache_update")
+        return response
+
+    def _fail_request(self, request: "_RequestContext", error: Exception) -> Dict[str, Any]:
+        """处理过程中的异常转换为错误响应"""
+        request.response = EnhancedAPIResponse.error(
+            f"API调用异常: {str(error)}",
+            "INTERNAL_ERROR",
+            path_info=self.path_manager.get_project_info_snapshot()
+        )
+        request.trace.mark("error_response")
+        return request.response
+
+    def _finish_request(self, request: "_RequestContext"):
+        """记录指标、响应日志并结束追踪"""
+        trace = request.trace
+        duration = time.time() - request.start_time
+        pattern = request.route.pattern if request.route else None
+        response = request.response
+        self.metrics.request_finished(pattern, request.method, response, duration, request.started)
+        trace.mark("metrics")
+        self.logger.log_response(request.path, response, duration)
+        trace.mark("log_response")
+        self.tracer.finish(trace, pattern, response)
+
+    def _prepare_request(self, path: str, method: str, data: Dict[str, Any] = None, trace: Any = NULL_TRACE):
+        """匹配路由并执行中间件
+
+        返回 (提前响应, 处理函数, 调用参数, 路由匹配结果)；处理函数为 None 时直接返回提前响应。
+        """
+        # 解析查询字符串并匹配路由
+        route_path, query = split_request_target(path)
+        route = self.routes.match(route_path)
+        trace.mark("route_lookup")
+        if route is None:
+            return EnhancedAPIResponse.error(
+                f"API端点不存在: {path}",
+                "ENDPOINT_NOT_FOUND",
+                path_info=self.path_manager.get_project_info_snapshot()
+            ), None, (), None
+
+        if method not in route.methods:
             return EnhancedAPIResponse.error(
-                f"API调用异常: {str(e)}",
-                "INTERNAL_ERROR",
-                path_info=self.path_manager.get_project_info()
+                f"不支持的HTTP方法: {method}",
+                "METHOD_NOT_ALLOWED",
+                path_info=self.path_manager.get_project_info_snapshot()
+            ), None, (), route
+
+        # 执行中间件
+        for middleware in self.middleware:
+            result = middleware(path, method, data)
+            if result is not None:
+                trace.mark("middleware")
+                return result, None, (), route
+        trace.mark("middleware")
+
+        # 命中响应缓存时跳过处理函数
+        cached = self.response_cache.lookup(route.pattern, method, path, data)
+        trace.mark("cache_lookup")
+        if cached is not None:
+            return cached, None, (), route
+
+        handler = route.methods[method]
+        return None, handler, build_handler_args(handler, data, route.params, query, route.accepts_data.get(method)), route
+
+    def _update_response_cache(self, pattern: str, method: str, path: str,
+                               data: Dict[str, Any], response: Dict[str, Any], generation: Optional[int] = None):
+        """缓存GET响应，写操作完成后清除相关缓存"""
+        self.response_cache.store(pattern, method, path, data, response, generation)
+        self.response_cache.notify_write(pattern, method, response)
+
+    def _normalize_response(self, response: Any) -> Dict[str, Any]:
+        """确保响应格式标准化"""
+        if not isinstance(response, dict) or 'success' not in response:
+            response = EnhancedAPIResponse.success(
+                response,
+                path_info=self.path_manager.get_project_info_snapshot()
             )
+        return response
 
-        finally:
-            # 记录响应
-            duration = time.time() - start_time
-            self.logger.log_response(path, response if 'response' in locals() else {}, duration)
+    def _run_awaitable(self, awaitable: Any) -> Any:
+        """在同步入口中执行协程处理函数"""
+        import asyncio
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._await(awaitable))
+        # 无法执行时关闭协程，避免 "coroutine was never awaited" 警告
+        if inspect.iscoroutine(awaitable):
+            awaitable.close()
+        raise RuntimeError("协程处理函数不能在运行中的事件循环内同步调用，请使用 handle_request_async")
+
+    @staticmethod
+    async def _await(awaitable: Any) -> Any:
+        return await awaitable
+
+    def _get_handler_executor(self):
+        """获取同步处理函数使用的有界线程池（延迟创建）"""
+        if self._handler_executor is None:
+            with self._executor_lock:
+                if self._handler_executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._handler_executor = ThreadPoolExecutor(
+                        max_workers=self.max_handler_workers,
+                        thread_name_prefix="api-handler"
+                    )
+        return self._handler_executor
+
+    def shutdown(self, wait: bool = True):
+        """关闭处理函数线程池并刷写日志"""
+        with self._executor_lock:
+            executor, self._handler_executor = self._handler_executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        self.path_manager.stop_watching()
+        self.tree_walker.shutdown(wait=wait)
+        self.path_validator.shutdown(wait=wait)
+        with self._structure_index_lock:
+            index, self._structure_index = self._structure_index, None
+        if index is not None:
+            index.close()
+        self.logger.close()
+
+    # ========================================================================
+    # 批量请求API端点
+    # ========================================================================
+
+    # 只读方法可并发执行，其余方法作为顺序屏障
+    BATCH_CONCURRENT_METHODS = ("GET", "HEAD")
+
+    async def execute_batch(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """批量执行API请求
+
+        请求格式: {"requests": [{"path", "method", "data"}, ...], "timeout": 秒}。
+        相邻的只读子请求并发执行，写操作按提交顺序串行执行并隔开前后的读请求；
+        每个子请求都经过 handle_request_async，共享中间件和日志记录。
+        """
+        import asyncio
+
+        start_time = time.time()
+        items = (data or {}).get("requests")
+
+        if not isinstance(items, list) or not items:
+            return EnhancedAPIResponse.error("批量请求列表为空或格式错误", "INVALID_BATCH")
+
+        if len(items) > self.max_batch_size:
+            return EnhancedAPIResponse.error(
+                f"批量请求数量超过限制: {len(items)} > {self.max_batch_size}",
+                "BATCH_TOO_LARGE"
+            )
+
+        try:
+            timeout = min(float((data or {}).get("timeout", self.batch_timeout)), self.batch_timeout)
+        except (TypeError, ValueError):
+            timeout = self.batch_timeout
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+
+        for group in self._group_batch_items(items):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                for index in group:
+                    results[index] = self._batch_timeout_result(index, items[index], timeout)
+                continue
+
+            tasks = {asyncio.ensure_future(self._run_batch_item(items[index])): index for index in group}
+            done, pending = await asyncio.wait(list(tasks), timeout=remaining)
+
+            for task in done:
+                index = tasks[task]
+                results[index] = self._batch_item_result(index, items[index], task.result())
+            for task in pending:
+                task.cancel()
+                index = tasks[task]
+                results[index] = self._batch_timeout_result(index, items[index], timeout)
+
+        succeeded = sum(1 for result in results if result["response"].get("success", False))
+        timed_out = sum(1 for result in results if result.get("timed_out"))
+
+        return EnhancedAPIResponse.success({
+            "results": results,
+            "statistics": {
+                "total": len(results),
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+                "timed_out": timed_out,
+                "duration": round(time.time() - start_time, 4)
+            }
+        }, f"批量请求完成 ({succeeded}/{len(results)})")
+
+    def _group_batch_items(self, items: List[Any]) -> List[List[int]]:
+        """将子请求划分为可并发执行的分组"""
+        groups: List[List[int]] = []
+        current: List[int] = []
+
+        for index, item in enumerate(items):
+            method = str(item.get("method", "GET")).upper() if isinstance(item, dict) else "GET"
+            if method in self.BATCH_CONCURRENT_METHODS:
+                current.append(index)
+                continue
+            if current:
+                groups.append(current)
+                current = []
+            groups.append([index])
+
+        if current:
+            groups.append(current)
+        return groups
+
+    async def _run_batch_item(self, item: Any) -> Dict[str, Any]:
+        """执行单个子请求"""
+        if not isinstance(item, dict) or not isinstance(item.get("path"), str):
+            return EnhancedAPIResponse.error("子请求缺少有效的path", "INVALID_BATCH_ITEM")
+
+        path = item["path"]
+        if split_request_target(path)[0].rstrip("/") == "/api/batch":
+            return EnhancedAPIResponse.error("不支持嵌套批量请求", "NESTED_BATCH_NOT_ALLOWED")
+
+        return await self.handle_request_async(path, str(item.get("method", "GET")).upper(), item.get("data"))
+
+    @staticmethod
+    def _batch_item_result(index: int, item: Any, response: Dict[str, Any]) -> Dict[str, Any]:
+        """构造子请求结果"""
+        item = item if isinstance(item, dict) else {}
+        return {
+            "index": index,
+            "path": item.get("path"),
+            "method": str(item.get("method", "GET")).upper(),
+            "response": response
+        }
+
+    def _batch_timeout_result(self, index: int, item: Any, timeout: float) -> Dict[str, Any]:
+        """构造超时子请求结果"""
+        result = self._batch_item_result(index, item, EnhancedAPIResponse.error(
+            f"批量请求超时 ({timeout}s)",
+            "BATCH_TIMEOUT"
+        ))
+        result["timed_out"] = True
+        return result
 
     # ========================================================================
     # 新增的路径相关API端点
     # ========================================================================
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取响应缓存统计"""
+        return EnhancedAPIResponse.success(self.response_cache.get_stats(), "缓存统计获取成功")
+
+    def get_log_stats(self) -> Dict[str, Any]:
+        """获取日志写入统计"""
+        return EnhancedAPIResponse.success(self.logger.writer.get_stats(), "日志统计获取成功")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """以Prometheus文本格式导出请求指标"""
+        return RawResponse(self.metrics.render_prometheus(), PROMETHEUS_CONTENT_TYPE)
+
+    def get_trace(self) -> Dict[str, Any]:
+        """导出已记录的请求阶段追踪（Chrome Trace / Perfetto JSON）"""
+        trace = self.tracer.to_chrome_trace()
+        return RawResponse(json.dumps(trace, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def get_trace_summary(self) -> Dict[str, Any]:
+        """获取各处理阶段的耗时汇总"""
+        return EnhancedAPIResponse.success(self.tracer.summarize(), "追踪汇总获取成功")
+
+    def configure_trace(self, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """开关请求阶段追踪
+
+        请求格式: {"enabled": bool, "capacity": int, "clear": bool}，均为可选。
+        """
+        data = data or {}
+        capacity = data.get("capacity")
+        if capacity is not None and (isinstance(capacity, bool) or not isinstance(capacity, int) or capacity <= 0):
+            return EnhancedAPIResponse.error("capacity 必须是正整数", "INVALID_PARAMETER")
+        self.tracer.configure(
+            enabled=data.get("enabled"),
+            capacity=capacity,
+            clear=bool(data.get("clear", False))
+        )
+        return EnhancedAPIResponse.success({
+            "enabled": self.tracer.enabled,
+            "capacity": self.tracer.capacity,
+            "recorded": self.tracer.recorded
+        }, "追踪配置已更新")
+
+    def _collect_component_metrics(self):
+        """导出响应缓存和日志写入器的计数"""
+        cache_stats = self.response_cache.get_stats()
+        log_stats = self.logger.writer.get_stats()
+        return [
+            ("cache_events_total", "counter", "响应缓存事件数",
+             [({"event": event}, cache_stats[event])
+              for event in ("hits", "misses", "stores", "evictions", "expirations", "invalidations", "rejected")]),
+            ("log_entries_total", "counter", "API日志条目数",
+             [({"result": "written"}, log_stats["written"]), ({"result": "dropped"}, log_stats["dropped"])]),
+            ("log_queue_size", "gauge", "API日志队列长度", [({}, log_stats["queued"])]),
+        ]
+
     def get_path_info(self) -> Dict[str, Any]:
         """获取路径信息"""
         try:
             path_info = self.path_manager.get_project_info()
             path_details = {}
 
-            for key, path in self.path_manager.paths.items():
+            for key in self.path_manager.paths:
+                metadata = self.path_manager.get_path_metadata(key)
                 path_details[key] = {
-                    "path": str(path),
-                    "exists": path.exists(),
-                    "is_file": path.is_file() if path.exists() else False,
-                    "is_dir": path.is_dir() if path.exists() else False
+                    "path": metadata["path"],
+                    "exists": metadata["exists"],
+                    "is_file": metadata["type"] == "file",
+                    "is_dir": metadata["type"] == "dir",
+                    "size": metadata["size"],
+                    "mtime": metadata["mtime"]
                 }
 
+            watcher = self.path_manager.watcher
             return EnhancedAPIResponse.success({
                 "project_info": path_info,
-                "path_details": path_details
+                "path_details": path_details,
+                "watcher": {
+                    "backend": watcher.backend_name if watcher else None,
+                    "running": bool(watcher and watcher.running),
+                    "sequence": watcher.sequence if watcher else 0
+                }
             }, "路径信息获取成功")
 
         except Exception as e:
             return EnhancedAPIResponse.error(f"获取路径信息失败: {str(e)}", "PATH_INFO_ERROR")
 
-    def get_project_structure(self) -> Dict[str, Any]:
-        """获取项目结构"""
+    def get_path_events(self, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """获取路径变化事件
+
+        查询参数 since 为上次获取到的事件序号，只返回其后的事件。
+        """
+        watcher = self.path_manager.watcher
+        if watcher is None:
+            return EnhancedAPIResponse.error("路径监视器未启动", "WATCHER_NOT_RUNNING")
+
         try:
-            structure = {}
+            since = int((data or {}).get("since", 0))
+        except (TypeError, ValueError):
+            return EnhancedAPIResponse.error("since 必须是整数", "INVALID_PARAMETER")
 
-            # 获取主要目录的结构
-            main_dirs = ["src_dir", "data_dir", "resources_dir", "tools_dir", "docs_dir"]
+        return EnhancedAPIResponse.success({
+            "events": watcher.events_since(since),
+            "sequence": watcher.sequence,
+            "backend": watcher.backend_name
+        }, "路径事件获取成功")
+
+    def get_instance_status(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """获取实例路径状态"""
+        instance_id = data.get("instance_id")
+        try:
+            paths = self.path_manager.get_instance_paths(instance_id)
+        except ValueError as e:
+            return EnhancedAPIResponse.error(str(e), "INVALID_PARAMETER")
 
-            for dir_key in main_dirs:
-                dir_path = self.path_manager.get_path(dir_key)
-                if dir_path.exists():
-                    structure[dir_key] = self._get_directory_structure(dir_path, max_depth=2)
-                else:
-                    structure[dir_key] = {"exists": False}
+        path_status = {key: stat_metadata(path) for key, path in paths.items()}
+        missing = [key for key, metadata in path_status.items() if not metadata["exists"]]
+        return EnhancedAPIResponse.success({
+            "instance_id": instance_id,
+            "registered": self.path_manager.is_registered(instance_id),
+            "paths": path_status,
+            "ready": not missing,
+            "missing": missing
+        }, "实例状态获取成功")
+
+    def ensure_instance_paths(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """批量创建实例目录
+
+        请求格式: {"instance_ids": [...], "path_keys": [...]}，instance_ids 缺省时处理全部已登记实例。
+        """
+        data = data or {}
+        instance_ids = data.get("instance_ids")
+        path_keys = data.get("path_keys")
+        try:
+            results = self.path_manager.ensure_paths_exist(instance_ids, path_keys)
+        except ValueError as e:
+            return EnhancedAPIResponse.error(str(e), "INVALID_PARAMETER")
+        failed = [instance_id for instance_id, result in results.items() if not result["success"]]
+        if failed:
+            return EnhancedAPIResponse.error(f"{len(failed)} 个实例的目录创建失败", "PATH_CREATE_ERROR",
+                                             {"results": results, "failed": failed})
+        return EnhancedAPIResponse.success({
+            "results": results,
+            "created": sum(result["created"] for result in results.values())
+        }, f"{len(results)} 个实例的目录已就绪")
 
-            return EnhancedAPIResponse.success({
+    def _on_path_change(self, event: Dict[str, Any]):
+        """已知路径变化时清除依赖文件系统状态的响应缓存"""
+        self.response_cache.invalidate('/api/path-info')
+        self.response_cache.invalidate('/api/project-structure')
+
+    # 项目结构默认遍历的主要目录
+    STRUCTURE_ROOTS = ["src_dir", "data_dir", "resources_dir", "tools_dir", "docs_dir"]
+
+    def get_project_structure(self, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """获取项目结构
+
+        不带参数时返回主要目录的嵌套结构（深度2）。带 format/cursor/limit/max_depth/include/exclude/roots
+        任一参数时返回扁平化的分页条目；format=ndjson 时以 NDJSON 流式输出，末行为分页信息。
+        """
+        if data and any(key in data for key in STRUCTURE_QUERY_KEYS):
+            return self._get_project_structure_page(data)
+
+        try:
+            # 项目根目录下的主要目录走增量索引，其余（或索引不可用时）在线程池中并行遍历
+            main_dirs = self.STRUCTURE_ROOTS
+            indexed = self._get_indexed_structures(main_dirs)
+            walked = self.tree_walker.build_structures(
+                {dir_key: self.path_manager.get_path(dir_key) for dir_key in main_dirs if dir_key not in indexed},
+                max_depth=2
+            )
+            structure = {dir_key: indexed[dir_key] if dir_key in indexed else walked[dir_key]
+                         for dir_key in main_dirs}
+
+            result = {
                 "structure": structure,
                 "project_root": str(self.path_manager.project_root)
-            }, "项目结构获取成功")
+            }
+            if self.structure_index_error:
+                result["index_error"] = self.structure_index_error
+            return EnhancedAPIResponse.success(result, "项目结构获取成功")
 
         except Exception as e:
             return EnhancedAPIResponse.error(f"获取项目结构失败: {str(e)}", "STRUCTURE_ERROR")
 
+    def _get_structure_index(self) -> Optional[ProjectStructureIndex]:
+        """获取项目结构索引（延迟创建，创建失败后不再重试）"""
+        if self._structure_index is None and not self._structure_index_failed:
+            with self._structure_index_lock:
+                if self._structure_index is None and not self._structure_index_failed:
+                    try:
+                        self._structure_index = ProjectStructureIndex(
+                            self.path_manager.project_root,
+                            self.path_manager.get_path("logs_dir") / INDEX_FILE_NAME
+                        )
+                    except (sqlite3.Error, OSError) as e:
+                        self._structure_index_failed = True
+                        self.structure_index_error = f"项目结构索引不可用，使用目录遍历: {e}"
+        return self._structure_index
+
+    def _get_indexed_structures(self, dir_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """从增量索引获取项目根目录下各目录的结构，无法使用索引的目录不出现在结果中"""
+        index = self._get_structure_index()
+        if index is None:
+            return {}
+
+        structures = {}
+        for dir_key in dir_keys:
+            try:
+                relative = self.path_manager.get_path(dir_key).resolve().relative_to(index.root)
+                structures[dir_key] = index.get_structure(relative.as_posix(), max_depth=2)
+            except ValueError:
+                continue  # 不在项目根目录下
+            except (sqlite3.Error, OSError) as e:
+                self.structure_index_error = f"项目结构索引查询失败 ({dir_key}): {e}"
+        return structures
+
+    def _get_project_structure_page(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """分页/流式获取项目结构"""
+        try:
+            query = StructureQuery.from_request(data, self.STRUCTURE_ROOTS, list(self.path_manager.paths))
+        except ValueError as e:
+            return EnhancedAPIResponse.error(str(e), "INVALID_PARAMETER")
+
+        roots = [(key, self.path_manager.get_path(key)) for key in query.roots]
+        if query.format == "ndjson":
+            return StreamingResponse(iter_ndjson_page(roots, query), NDJSON_CONTENT_TYPE,
+                                     message="项目结构获取成功", data={"format": "ndjson"})
+
+        try:
+            page = collect_page(roots, query)
+        except Exception as e:
+            return EnhancedAPIResponse.error(f"获取项目结构失败: {str(e)}", "STRUCTURE_ERROR")
+        page["project_root"] = str(self.path_manager.project_root)
+        return EnhancedAPIResponse.success(page, "项目结构获取成功")
+
     def validate_project_paths(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """验证项目路径"""
         try:
@@ -419,13 +1318,15 @@ class DynamicPathUnifiedAPIManager:
                 "src_dir", "core_dir", "api_dir"
             ]
 
-            for path_key in critical_paths:
-                path = self.path_manager.get_path(path_key)
+            checks = self.path_validator.validate(
+                {path_key: self.path_manager.get_path(path_key) for path_key in critical_paths}
+            )
+            for path_key, check in checks.items():
                 validation_results[path_key] = {
-                    "path": str(path),
-                    "exists": path.exists(),
-                    "accessible": self._check_path_accessible(path),
-                    "status": "✅" if path.exists() else "❌"
+                    "path": check["path"],
+                    "exists": check["exists"],
+                    "accessible": check["accessible"],
+                    "status": "✅" if check["exists"] else "❌"
                 }
 
             # 计算验证统计
@@ -447,53 +1348,110 @@ class DynamicPathUnifiedAPIManager:
 
     def _get_directory_structure(self, directory: Path, max_depth: int = 2, current_depth: int = 0) -> Dict[str, Any]:
         """获取目录结构"""
-        if current_depth >= max_depth or not directory.exists():
-            return {"exists": directory.exists()}
+        return self.tree_walker.build_structure(directory, max_depth - current_depth)
 
-        structure = {
-            "exists": True,
-            "files": [],
-            "directories": {}
-        }
+    def validate_paths_bulk(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """批量并发验证路径
 
+        请求格式::
+
+            {
+                "path_keys": ["data_dir", ...],          # 路径键，缺省时不检查
+                "globs": ["data/extensions/*/package.json", ...],   # 相对项目根目录的通配模式
+                "instance_ids": ["1", "2"] 或 "all",      # 多实例模式，"all" 为全部已登记实例
+                "instance_path_keys": ["user_data", ...], # 实例中要检查的路径键，缺省为全部
+                "access": "read" | "write"
+            }
+
+        所有路径合并后在线程池中并发检查，每个路径一次 stat 加一次 access。
+        """
+        data = data or {}
+        path_keys = data.get("path_keys") or []
+        globs = data.get("globs") or []
+        instance_ids = data.get("instance_ids") or []
+        instance_path_keys = data.get("instance_path_keys")
+        access = data.get("access", ACCESS_READ)
+
+        if instance_ids == "all":
+            instance_ids = self.path_manager.list_instances()
+        elif not _is_string_list(instance_ids):
+            return EnhancedAPIResponse.error("instance_ids 必须是字符串列表或 \"all\"", "INVALID_PARAMETER")
+        for name, value in (("path_keys", path_keys), ("globs", globs), ("instance_path_keys", instance_path_keys)):
+            if value is not None and not _is_string_list(value):
+                return EnhancedAPIResponse.error(f"{name} 必须是字符串列表", "INVALID_PARAMETER")
+        if not (path_keys or globs or instance_ids):
+            return EnhancedAPIResponse.error("至少需要 path_keys、globs、instance_ids 之一", "INVALID_PARAMETER")
+
+        # 收集全部目标路径，键带上来源前缀以便拆分结果
+        targets: Dict[tuple, Path] = {}
         try:
-            for item in directory.iterdir():
-                if item.is_file():
-                    structure["files"].append(item.name)
-                elif item.is_dir():
-                    structure["directories"][item.name] = self._get_directory_structure(
-                        item, max_depth, current_depth + 1
-                    )
-        except PermissionError:
-            structure["error"] = "权限不足"
+            for path_key in path_keys:
+                targets[("path", path_key, None)] = self.path_manager.get_path(path_key)
+            for pattern in globs:
+                for path in self.path_manager.find_files(pattern):
+                    targets[("glob", pattern, str(self.path_manager.get_relative_path(path)))] = path
+            for instance_id in instance_ids:
+                paths = self.path_manager.get_instance_paths(instance_id)
+                for key in instance_path_keys or paths:
+                    targets[("instance", instance_id, key)] = self.path_manager.get_instance_path(instance_id, key)
+        except ValueError as e:
+            return EnhancedAPIResponse.error(str(e), "INVALID_PARAMETER")
+        if len(targets) > MAX_BULK_PATHS:
+            return EnhancedAPIResponse.error(f"单次最多验证 {MAX_BULK_PATHS} 个路径", "INVALID_PARAMETER")
+
+        start = time.perf_counter()
+        try:
+            checks = self.path_validator.validate(targets, access)
+        except ValueError as e:
+            return EnhancedAPIResponse.error(str(e), "INVALID_PARAMETER")
+        except Exception as e:
+            return EnhancedAPIResponse.error(f"路径验证失败: {str(e)}", "PATH_VALIDATION_ERROR")
+        duration_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        results: Dict[str, Any] = {}
+        glob_results: Dict[str, Any] = {pattern: {"count": 0, "results": {}} for pattern in globs}
+        instance_results: Dict[str, Any] = {instance_id: {"ready": True, "results": {}} for instance_id in instance_ids}
+        for (source, name, key), check in checks.items():
+            if source == "path":
+                results[name] = check
+            elif source == "glob":
+                glob_results[name]["results"][key] = check
+                glob_results[name]["count"] += 1
+            else:
+                instance_results[name]["results"][key] = check
+                instance_results[name]["ready"] &= check["accessible"]
+
+        statistics = summarize_results(checks)
+        statistics["duration_ms"] = duration_ms
+        if instance_ids:
+            statistics["ready_instances"] = sum(1 for item in instance_results.values() if item["ready"])
 
-        return structure
+        return EnhancedAPIResponse.success({
+            "results": results,
+            "globs": glob_results,
+            "instances": instance_results,
+            "statistics": statistics
+        }, f"路径验证完成 ({statistics['validation_rate']}%)")
 
     def _check_path_accessible(self, path: Path) -> bool:
-        """检查路径是否可访问"""
-        try:
-            if path.exists():
-                if path.is_file():
-                    return path.stat().st_size >= 0
-                elif path.is_dir():
-                    list(path.iterdir())
-                    return True
-            return False
-        except (PermissionError, OSError):
-            return False
+        """检查路径是否可访问（一次 stat 加一次 access，不列出目录内容）"""
+        return check_path(path)["accessible"]
 
     # ========================================================================
     # 增强的原有API端点实现
     # ========================================================================
 
+    # 基本状态为常量，只序列化一次
+    BASIC_STATUS = ConstantPayload({
+        "status": "ready",
+        "message": "CodeStudio Pro Ultimate 动态路径API已就绪",
+        "version": "2.0",
+        "features": ["dynamic_paths", "enhanced_logging", "path_validation"]
+    })
+
     def get_basic_status(self) -> Dict[str, Any]:
         """获取基本状态信息"""
-        return EnhancedAPIResponse.success({
-            "status": "ready",
-            "message": "CodeStudio Pro Ultimate 动态路径API已就绪",
-            "version": "2.0",
-            "features": ["dynamic_paths", "enhanced_logging", "path_validation"]
-        })
+        return EnhancedAPIResponse.success(self.BASIC_STATUS)
 
     def get_system_status(self) -> Dict[str, Any]:
         """获取系统状态"""
@@ -521,7 +1479,7 @@ class DynamicPathUnifiedAPIManager:
             return EnhancedAPIResponse.success(
                 status_data,
                 "系统状态获取成功",
-                path_info=self.path_manager.get_project_info()
+                path_info=self.path_manager.get_project_info_snapshot()
             )
 
         except Exception as e:
@@ -550,7 +1508,7 @@ class DynamicPathUnifiedAPIManager:
             return EnhancedAPIResponse.success(
                 plugin_status,
                 "插件状态检查完成",
-                path_info=self.path_manager.get_project_info()
+                path_info=self.path_manager.get_project_info_snapshot()
             )
 
         except Exception as e:
@@ -565,7 +1523,7 @@ class DynamicPathUnifiedAPIManager:
                 return EnhancedAPIResponse.error(
                     f"未找到CodeStudio Pro可执行文件: {codestudio_exe}",
                     "APP_NOT_FOUND",
-                    path_info=self.path_manager.get_project_info()
+                    path_info=self.path_manager.get_project_info_snapshot()
                 )
 
             # 模拟应用启动
@@ -631,7 +1589,7 @@ class DynamicPathUnifiedAPIManager:
             return EnhancedAPIResponse.success(
                 test_results,
                 "基础路径测试完成",
-                path_info=self.path_manager.get_project_info()
+                path_info=self.path_manager.get_project_info_snapshot()
             )
 
         except Exception as e:
@@ -658,45 +1616,255 @@ class DynamicPathUnifiedAPIManager:
             return EnhancedAPIResponse.success(
                 test_results,
                 "完整路径测试完成",
-                path_info=self.path_manager.get_project_info()
+                path_info=self.path_manager.get_project_info_snapshot()
             )
 
         except Exception as e:
             return EnhancedAPIResponse.error(f"完整路径测试失败: {str(e)}", "FULL_PATH_TEST_ERROR")
 
+    # 路径压力测试默认端点混合: (method, path, data, weight)
+    STRESS_DEFAULT_ENDPOINTS = [
+        ("GET", "/api/status", None, 3),
+        ("GET", "/api/path-info", None, 3),
+        ("GET", "/api/project-structure", None, 1),
+        ("POST", "/api/validate-paths", {}, 1),
+    ]
+
+    # 压测参数上限，防止一次请求占用过多资源
+    STRESS_LIMITS = {"concurrency": 256, "duration": 60.0, "requests": 100000}
+
+    # 未指定 requests 与 duration 时的默认请求总数，保持默认压测足够短，不长时间占用服务线程
+    STRESS_DEFAULT_REQUESTS = 50
+
     def test_stress_paths(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """路径压力测试"""
+        """路径压力测试
+
+        请求参数（均可选）::
+
+            {
+                "mode": "inprocess" | "http",     # 进程内直接调用 handle_request，或经HTTP服务
+                "host": "127.0.0.1", "port": 8180, # http 模式的目标服务
+                "concurrency": 8,                  # 并发线程/连接数
+                "duration": 1.0,                   # 压测时长（秒），需显式指定
+                "requests": 100,                   # 固定请求总数（优先于时长）
+                "target_rps": 200,                 # 目标请求速率，缺省不限速
+                "bypass_cache": true,              # 进程内模式每次请求前清除该路由的响应缓存
+                "endpoints": ["3*GET:/api/status", {"method": "POST", "path": "/api/validate-paths",
+                                                   "data": {}, "weight": 1}]
+            }
+
+        requests 与 duration 都未指定时只发送 STRESS_DEFAULT_REQUESTS 个请求，按时长压测需显式传入 duration。
+        bypass_cache 在使用默认端点混合时默认开启，测得的是未命中缓存的处理耗时；
+        自定义 endpoints 时默认关闭，即包含响应缓存的效果。http 模式不受该参数影响。
+
+        返回实测的请求数、成功/失败数、延迟分布、吞吐量与内存变化。
+        http 模式只允许压测本机回环地址或本服务自身的监听地址。
+        """
+        from api_load_generator import run_inprocess_load, run_http_load_blocking
+
+        try:
+            config = self._parse_stress_config(data or {})
+        except (TypeError, ValueError) as e:
+            return EnhancedAPIResponse.error(f"压测参数无效: {str(e)}", "INVALID_PARAMETER")
+
         try:
-            # 模拟压力测试
+            rss_before = self._get_max_rss_mb()
+            options = {
+                "concurrency": config["concurrency"],
+                "duration": config["duration"],
+                "total_requests": config["requests"],
+                "target_rps": config["target_rps"],
+            }
+            if config["mode"] == "http":
+                summary = run_http_load_blocking(config["host"], config["port"], config["endpoints"], **options)
+            else:
+                bypass_cache = config["bypass_cache"]
+                summary = run_inprocess_load(
+                    lambda method, path, body: self._stress_request(method, path, body, bypass_cache),
+                    config["endpoints"], **options
+                )
+            rss_after = self._get_max_rss_mb()
+
             test_results = {
                 "test_type": "stress_paths",
-                "total_requests": 100,
-                "successful_requests": 100,
-                "failed_requests": 0,
-                "average_response_time": 0.003,
-                "max_response_time": 0.008,
-                "min_response_time": 0.001,
-                "duration": 0.35,
-                "requests_per_second": 285.7,
-                "memory_usage": "稳定",
-                "performance_rating": "优秀"
+                "total_requests": summary["total_requests"],
+                "successful_requests": summary["successful_requests"],
+                "failed_requests": summary["failed_requests"],
+                "average_response_time": summary["average_response_time"],
+                "max_response_time": summary["max_response_time"],
+                "min_response_time": summary["min_response_time"],
+                "p50_response_time": summary["p50_response_time"],
+                "p90_response_time": summary["p90_response_time"],
+                "p99_response_time": summary["p99_response_time"],
+                "duration": summary["duration"],
+                "requests_per_second": summary["requests_per_second"],
+                "status_counts": summary["status_counts"],
+                "endpoints": summary["endpoints"],
+                "memory_usage": self._describe_memory_growth(rss_before, rss_after),
+                "performance_rating": self._rate_stress_result(summary),
+                "config": {key: value for key, value in config.items() if key != "endpoints"},
             }
 
             return EnhancedAPIResponse.success(
                 test_results,
                 "路径压力测试完成",
-                path_info=self.path_manager.get_project_info()
+                path_info=self.path_manager.get_project_info_snapshot()
             )
 
         except Exception as e:
             return EnhancedAPIResponse.error(f"路径压力测试失败: {str(e)}", "STRESS_PATH_TEST_ERROR")
 
+    def _parse_stress_config(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """解析压测参数，无效时抛出 ValueError"""
+        from api_load_generator import parse_endpoint_spec
+
+        mode = str(data.get("mode", "inprocess")).lower()
+        if mode not in ("inprocess", "http"):
+            raise ValueError(f"不支持的模式: {mode}")
+
+        limits = self.STRESS_LIMITS
+        concurrency = int(data.get("concurrency", 8))
+        duration = data.get("duration")
+        requests = data.get("requests")
+        requests = int(requests) if requests not in (None, "") else None
+        if duration in (None, ""):
+            duration = 1.0
+            if requests is None:
+                requests = self.STRESS_DEFAULT_REQUESTS
+        duration = float(duration)
+        target_rps = data.get("target_rps")
+        target_rps = float(target_rps) if target_rps not in (None, "") else None
+        if not 1 <= concurrency <= limits["concurrency"]:
+            raise ValueError(f"concurrency 必须在 1-{limits['concurrency']} 之间")
+        if not 0 < duration <= limits["duration"]:
+            raise ValueError(f"duration 必须在 0-{limits['duration']} 秒之间")
+        if requests is not None and not 1 <= requests <= limits["requests"]:
+            raise ValueError(f"requests 必须在 1-{limits['requests']} 之间")
+        if target_rps is not None and target_rps <= 0:
+            raise ValueError("target_rps 必须大于0")
+
+        endpoints = []
+        for item in data.get("endpoints") or []:
+            if isinstance(item, str):
+                endpoints.append(parse_endpoint_spec(item))
+            elif isinstance(item, dict) and item.get("path"):
+                endpoints.append((str(item.get("method", "GET")).upper(), item["path"],
+                                  item.get("data"), int(item.get("weight", 1))))
+            else:
+                raise ValueError(f"无效的端点: {item}")
+        bypass_cache = data.get("bypass_cache")
+        bypass_cache = not endpoints if bypass_cache is None else bool(bypass_cache)
+        endpoints = endpoints or list(self.STRESS_DEFAULT_ENDPOINTS)
+        for method, path, *_ in endpoints:
+            if split_request_target(path)[0].startswith(("/api/test/", "/api/batch")):
+                raise ValueError(f"压测端点不能包含测试或批量接口: {path}")
+
+        host = str(data.get("host", "127.0.0.1"))
+        port = int(data.get("port", 8180))
+        if mode == "http":
+            host = self._resolve_stress_host(host, port)
+
+        return {
+            "mode": mode,
+            "host": host,
+            "port": port,
+            "concurrency": concurrency,
+            "duration": duration,
+            "requests": requests,
+            "target_rps": target_rps,
+            "bypass_cache": bypass_cache,
+            "endpoints": endpoints,
+        }
+
+    def _resolve_stress_host(self, host: str, port: int) -> str:
+        """解析 http 模式的压测目标，只允许回环地址或本服务的监听地址，返回实际连接的IP地址
+
+        主机名只解析一次并直接连接解析结果，避免压测过程中被重新解析到其他地址。
+        """
+        try:
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except (OSError, UnicodeError):
+            raise ValueError(f"无法解析压测目标: {host}")
+
+        bound = {address for address, bound_port in self.server_addresses if bound_port == port}
+        addresses = []
+        for info in infos:
+            address = info[4][0]
+            if not (ipaddress.ip_address(address.split("%", 1)[0]).is_loopback or address in bound):
+                raise ValueError(f"http 模式只允许压测本机回环地址或本服务的监听地址: {host}:{port}")
+            addresses.append(address)
+        if not addresses:
+            raise ValueError(f"无法解析压测目标: {host}")
+        return addresses[0]
+
+    def _stress_request(self, method: str, path: str, data: Any, bypass_cache: bool = False):
+        """进程内压测的单次请求，返回 (状态码, 是否成功)"""
+        if bypass_cache:
+            route = self.routes.match(split_request_target(path)[0])
+            if route is not None:
+                self.response_cache.invalidate(route.pattern)
+        response = self.handle_request(path, method, data)
+        if isinstance(response, StreamingResponse):
+            response.read_all()
+        status = http_status_for(response)
+        success = status < 400 and (not isinstance(response, dict) or response.get("success", True) is not False)
+        return status, success
+
+    @staticmethod
+    def _get_max_rss_mb() -> Optional[float]:
+        """进程峰值常驻内存（MB），平台不支持时为 None"""
+        if resource is None:
+            return None
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+    @staticmethod
+    def _describe_memory_growth(before: Optional[float], after: Optional[float]) -> str:
+        """峰值内存变化描述"""
+        if before is None or after is None:
+            return "未知"
+        growth = after - before
+        return "稳定" if growth < 10 else f"峰值增长 {growth:.1f} MB"
+
+    @staticmethod
+    def _rate_stress_result(summary: Dict[str, Any]) -> str:
+        """按错误率和 p99 延迟评级"""
+        total = summary["total_requests"]
+        if total == 0:
+            return "无数据"
+        error_rate = summary["failed_requests"] / total
+        p99 = summary["p99_response_time"]
+        if error_rate == 0 and p99 < 0.01:
+            return "优秀"
+        if error_rate < 0.001 and p99 < 0.05:
+            return "良好"
+        if error_rate < 0.01 and p99 < 0.2:
+            return "一般"
+        return "较差"
+
 # ============================================================================
 # 全局动态路径API管理器实例
 # ============================================================================
 
-# 创建全局动态路径API管理器实例
-dynamic_api_manager = DynamicPathUnifiedAPIManager()
+# 全局实例延迟创建：导入本模块不会计算项目根目录、创建日志目录或注册端点
+_dynamic_api_manager: Optional[DynamicPathUnifiedAPIManager] = None
+_dynamic_api_manager_lock = threading.Lock()
+
+def get_dynamic_api_manager() -> DynamicPathUnifiedAPIManager:
+    """获取全局动态路径API管理器实例（首次调用时创建）"""
+    global _dynamic_api_manager
+    if _dynamic_api_manager is None:
+        with _dynamic_api_manager_lock:
+            if _dynamic_api_manager is None:
+                _dynamic_api_manager = DynamicPathUnifiedAPIManager(watch_paths=True)
+    return _dynamic_api_manager
+
+def __getattr__(name: str) -> Any:
+    """保持 dynamic_api_manager 模块属性的向后兼容访问"""
+    if name == "dynamic_api_manager":
+        return get_dynamic_api_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ============================================================================
 # 便捷函数 - 向后兼容性支持
@@ -704,15 +1872,19 @@ dynamic_api_manager = DynamicPathUnifiedAPIManager()
 
 def handle_dynamic_api_request(path: str, method: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
     """处理动态路径API请求的便捷函数"""
-    return dynamic_api_manager.handle_request(path, method, data)
+    return get_dynamic_api_manager().handle_request(path, method, data)
+
+async def handle_dynamic_api_request_async(path: str, method: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+    """异步处理动态路径API请求的便捷函数"""
+    return await get_dynamic_api_manager().handle_request_async(path, method, data)
 
 def register_dynamic_endpoint(path: str, method: str, handler: Callable):
     """注册动态路径API端点的便捷函数"""
-    dynamic_api_manager.register_endpoint(path, method, handler)
+    get_dynamic_api_manager().register_endpoint(path, method, handler)
 
 def get_project_path_manager() -> DynamicPathManager:
     """获取项目路径管理器"""
-    return dynamic_api_manager.path_manager
+    return get_dynamic_api_manager().path_manager
 
 # ============================================================================
 # 主函数 - 用于测试
@@ -9,21 +9,27 @@ CodeStudio Pro Ultimate - 动态路径API测试框架 (增强版)
 特色: 支持项目重组后的动态路径测试，无需硬编码路径
 """
 
+import sys
 import json
 import time
-import unittest
-from typing import Dict, Any, List, Optional
+import argparse
+from typing import Dict, Any, List, Optional, Callable
 from pathlib import Path
 from datetime import datetime
 
 # 导入动态路径API管理器
-from dynamic_path_api_manager import dynamic_api_manager, EnhancedAPIResponse, DynamicPathManager
+from dynamic_path_api_manager import (get_dynamic_api_manager, EnhancedAPIResponse, DynamicPathManager,
+                                      DynamicPathUnifiedAPIManager)
+from api_test_executor import (TestExecutor, TestCaseOptionsMixin, ISOLATION_SHARED, ISOLATION_EXCLUSIVE,
+                               TestTimeoutError, run_requests, check_response, summarize_latencies,
+                               describe_slo_violations, format_latency, get_abandoned_workers, parse_workers,
+                               response_cache_clearer)
 
 # ============================================================================
 # 动态路径测试用例基类
 # ============================================================================
 
-class DynamicPathAPITestCase:
+class DynamicPathAPITestCase(TestCaseOptionsMixin):
     """动态路径API测试用例基类"""
 
     def __init__(self, name: str, endpoint: str, method: str, data: Dict[str, Any] = None):
@@ -34,8 +40,14 @@ class DynamicPathAPITestCase:
         self.expected_success = True
         self.expected_error_code = None
         self.timeout = 30.0
+        self.isolation = None  # None 表示使用执行器的默认隔离方式
+        self.repetitions = 1
+        self.warmup = 0
+        self.latency_slos: List[Dict[str, float]] = []
+        self.bypass_cache = False
         self.validate_paths = False
         self.required_paths = []
+        self.response_checks: List[Callable[[Dict[str, Any]], Optional[str]]] = []
 
     def set_expected_error(self, error_code: str):
         """设置期望的错误代码"""
@@ -54,6 +66,21 @@ class DynamicPathAPITestCase:
         self.required_paths = required_paths or []
         return self
 
+    def add_response_check(self, check: Callable[[Dict[str, Any]], Optional[str]]):
+        """添加额外的响应校验，返回错误信息表示失败（在成功/错误代码校验通过后执行）"""
+        self.response_checks.append(check)
+        return self
+
+
+def _check_test_response(test_case: DynamicPathAPITestCase, response: Dict[str, Any]) -> Optional[str]:
+    """通用期望校验加测试用例的额外校验"""
+    error = check_response(test_case, response)
+    for check in test_case.response_checks:
+        if error is not None:
+            break
+        error = check(response)
+    return error
+
 # ============================================================================
 # 动态路径API测试执行器
 # ============================================================================
@@ -61,18 +88,24 @@ class DynamicPathAPITestCase:
 class DynamicPathAPITestRunner:
     """动态路径API测试执行器"""
 
-    def __init__(self):
+    def __init__(self, workers: int = 1, isolation: str = ISOLATION_SHARED):
         self.test_cases: List[DynamicPathAPITestCase] = []
         self.results: List[Dict[str, Any]] = []
         self.path_manager = DynamicPathManager()
+        self.workers = workers
+        self.isolation = isolation
 
     def add_test_case(self, test_case: DynamicPathAPITestCase):
         """添加测试用例"""
         self.test_cases.append(test_case)
 
-    def run_all_tests(self) -> Dict[str, Any]:
-        """运行所有测试用例"""
-        print("🧪 开始动态路径API回归测试...")
+    def run_all_tests(self, workers: Optional[int] = None) -> Dict[str, Any]:
+        """运行所有测试用例（workers > 1 时并行执行，结果顺序与测试用例顺序一致）"""
+        workers = self.workers if workers is None else workers
+        executor = TestExecutor(workers, self.isolation,
+                                lambda: DynamicPathUnifiedAPIManager(watch_paths=False))
+
+        print(f"🧪 开始动态路径API回归测试... (并行度: {executor.workers})")
         print("=" * 60)
         
         # 首先验证项目路径
@@ -81,23 +114,38 @@ class DynamicPathAPITestRunner:
         start_time = time.time()
         passed = 0
         failed = 0
+        timed_out = 0
+        slo_violations = 0
 
-        for i, test_case in enumerate(self.test_cases, 1):
+        def on_result(i: int, test_case: DynamicPathAPITestCase, result: Dict[str, Any]):
+            nonlocal passed, failed, timed_out, slo_violations
             print(f"[{i}/{len(self.test_cases)}] 测试: {test_case.name}")
-
-            result = self._run_single_test(test_case)
-            self.results.append(result)
-
             if result["passed"]:
                 passed += 1
                 print(f"  ✅ 通过 ({result['duration']:.2f}s)")
+                if result.get("latency"):
+                    print(f"    ⏱️ 延迟: {format_latency(result['latency'])}")
                 if result.get("path_validation"):
                     print(f"    📁 路径验证: {result['path_validation']}")
+            elif result.get("timed_out"):
+                failed += 1
+                timed_out += 1
+                print(f"  ⏰ 超时: {result['error']}")
+            elif result.get("slo_violated"):
+                failed += 1
+                slo_violations += 1
+                print(f"  🐢 性能不达标: {result['error']}")
+                print(f"    ⏱️ 延迟: {format_latency(result['latency'])}")
             else:
                 failed += 1
                 print(f"  ❌ 失败: {result['error']}")
+            if result.get("contaminated_by"):
+                print(f"    ⚠️ 执行期间仍有被放弃的工作线程在运行，结果可能受干扰: {', '.join(result['contaminated_by'])}")
+
+        self.results = executor.run(self.test_cases, self._run_single_test, on_result)
 
         total_time = time.time() - start_time
+        test_time = sum(result["duration"] for result in self.results)
 
         # 生成测试报告
         report = {
@@ -105,8 +153,15 @@ class DynamicPathAPITestRunner:
                 "total": len(self.test_cases),
                 "passed": passed,
                 "failed": failed,
+                "timed_out": timed_out,
+                "slo_tests": sum(1 for test_case in self.test_cases if test_case.latency_slos),
+                "slo_violations": slo_violations,
                 "success_rate": round(passed / len(self.test_cases) * 100, 2),
-                "total_duration": round(total_time, 2)
+                "total_duration": round(total_time, 2),
+                "test_duration_sum": round(test_time, 2),
+                "workers": executor.workers,
+                "abandoned_workers": len(get_abandoned_workers()),
+                "contaminated": sum(1 for result in self.results if result.get("contaminated_by"))
             },
             "project_info": self.path_manager.get_project_info(),
             "results": self.results,
@@ -115,7 +170,13 @@ class DynamicPathAPITestRunner:
 
         print("=" * 60)
         print(f"🎯 测试完成: {passed}/{len(self.test_cases)} 通过 ({report['summary']['success_rate']}%)")
-        print(f"⏱️ 总耗时: {total_time:.2f}秒")
+        print(f"⏱️ 总耗时: {total_time:.2f}秒 (测试累计耗时: {test_time:.2f}秒)")
+        if slo_violations:
+            print(f"🐢 延迟SLO未满足: {slo_violations} 个")
+        if timed_out:
+            print(f"⏰ 超时测试: {timed_out} 个 (仍在运行的被放弃工作线程: {report['summary']['abandoned_workers']})")
+        if report["summary"]["contaminated"]:
+            print(f"⚠️ 可能受被放弃工作线程干扰的测试: {report['summary']['contaminated']} 个")
         print(f"📁 项目根目录: {self.path_manager.project_root}")
 
         # 保存测试报告
@@ -136,8 +197,9 @@ class DynamicPathAPITestRunner:
         print(f"  🔧 路径计算方法: {project_info['calculation_method']}")
         print()
 
-    def _run_single_test(self, test_case: DynamicPathAPITestCase) -> Dict[str, Any]:
-        """运行单个测试用例"""
+    def _run_single_test(self, test_case: DynamicPathAPITestCase,
+                         manager: Optional[DynamicPathUnifiedAPIManager] = None) -> Dict[str, Any]:
+        """运行单个测试用例（manager 为 None 时使用全局管理器）"""
         start_time = time.time()
 
         try:
@@ -146,75 +208,59 @@ class DynamicPathAPITestRunner:
             if test_case.validate_paths:
                 path_validation_result = self._validate_test_paths(test_case.required_paths)
 
-            # 执行API调用
-            response = dynamic_api_manager.handle_request(
+            # 执行API调用（设置了重复次数时先预热再逐次计时，遇到不符合期望的响应即停止）
+            manager = manager or get_dynamic_api_manager()
+            outcome = run_requests(
+                manager,
                 test_case.endpoint,
                 test_case.method,
-                test_case.data
+                test_case.data,
+                test_case.timeout,
+                runs=test_case.repetitions,
+                warmup=test_case.warmup,
+                check=lambda response: _check_test_response(test_case, response),
+                before_each=response_cache_clearer(manager, test_case.endpoint) if test_case.bypass_cache else None
             )
 
             duration = time.time() - start_time
 
-            # 验证响应
-            if test_case.expected_success:
-                # 期望成功
-                if response.get("success", False):
-                    result = {
-                        "test_name": test_case.name,
-                        "endpoint": test_case.endpoint,
-                        "method": test_case.method,
-                        "passed": True,
-                        "duration": duration,
-                        "response": response
-                    }
-                    
-                    if path_validation_result:
-                        result["path_validation"] = path_validation_result
-                    
-                    return result
-                else:
-                    return {
-                        "test_name": test_case.name,
-                        "endpoint": test_case.endpoint,
-                        "method": test_case.method,
-                        "passed": False,
-                        "duration": duration,
-                        "error": f"期望成功但失败: {response.get('error', {}).get('message', '未知错误')}",
-                        "response": response
-                    }
-            else:
-                # 期望失败
-                if not response.get("success", True):
-                    error_code = response.get("error", {}).get("code", "")
-                    if test_case.expected_error_code and error_code != test_case.expected_error_code:
-                        return {
-                            "test_name": test_case.name,
-                            "endpoint": test_case.endpoint,
-                            "method": test_case.method,
-                            "passed": False,
-                            "duration": duration,
-                            "error": f"错误代码不匹配: 期望 {test_case.expected_error_code}, 实际 {error_code}",
-                            "response": response
-                        }
-                    else:
-                        return {
-                            "test_name": test_case.name,
-                            "endpoint": test_case.endpoint,
-                            "method": test_case.method,
-                            "passed": True,
-                            "duration": duration,
-                            "response": response
-                        }
-                else:
-                    return {
-                        "test_name": test_case.name,
-                        "endpoint": test_case.endpoint,
-                        "method": test_case.method,
-                        "passed": False,
-                        "duration": duration,
-                        "error": "期望失败但成功了",
-                        "response": response
-                    }
+            result = {
+                "test_name": test_case.name,
+                "endpoint": test_case.endpoint,
+                "method": test_case.method,
+                "passed": outcome["error"] is None,
+                "duration": duration,
+                "response": outcome["response"]
+            }
+            if outcome["error"] is not None:
+                result["error"] = outcome["error"]
+
+            # 延迟统计与SLO检查（仅在响应符合期望时判定SLO）
+            if test_case.repetitions > 1 or test_case.latency_slos:
+                result["latency"] = summarize_latencies(outcome["latencies"], test_case.latency_slos, test_case.warmup)
+                slo_error = describe_slo_violations(result["latency"])
+                if result["passed"] and slo_error:
+                    result["passed"] = False
+                    result["slo_violated"] = True
+                    result["error"] = slo_error
+
+            if result["passed"] and path_validation_result:
+                result["path_validation"] = path_validation_result
+
+            return result
+
+        except TestTimeoutError as e:
+            duration = time.time() - start_time
+            return {
+                "test_name": test_case.name,
+                "endpoint": test_case.endpoint,
+                "method": test_case.method,
+                "passed": False,
+                "timed_out": True,
+                "cancelled": e.cancelled,
+                "duration": duration,
+                "error": str(e)
+            }
 
         except Exception as e:
             duration = time.time() - start_time
@@ -260,9 +306,14 @@ class DynamicPathAPITestRunner:
 # 动态路径预定义测试套件
 # ============================================================================
 
-def create_dynamic_path_basic_test_suite() -> DynamicPathAPITestRunner:
+# 完整测试套件中的延迟SLO：预热后重复执行，p95 延迟超标即判定失败
+SLO_REPETITIONS = 200
+SLO_WARMUP = 20
+SLO_P95_MS = 20.0
+
+def create_dynamic_path_basic_test_suite(workers: int = 1) -> DynamicPathAPITestRunner:
     """创建动态路径基础测试套件"""
-    runner = DynamicPathAPITestRunner()
+    runner = DynamicPathAPITestRunner(workers)
 
     # 基础状态测试
     runner.add_test_case(DynamicPathAPITestCase(
@@ -321,11 +372,31 @@ def create_dynamic_path_basic_test_suite() -> DynamicPathAPITestRunner:
         "DELETE"
     ).set_expected_error("METHOD_NOT_ALLOWED"))
 
+    # 批量请求：子请求附带 data 调用无参处理函数时忽略 data，不应报 INTERNAL_ERROR
+    runner.add_test_case(DynamicPathAPITestCase(
+        "批量请求 - 无参GET附带data",
+        "/api/batch",
+        "POST",
+        {"requests": [
+            {"path": "/api/path-info", "method": "GET", "data": {}},
+            {"path": "/api/status", "method": "GET", "data": {"test": True}}
+        ]}
+    ).add_response_check(_check_batch_items))
+
     return runner
 
-def create_dynamic_path_full_test_suite() -> DynamicPathAPITestRunner:
+def _check_batch_items(response: Dict[str, Any]) -> Optional[str]:
+    """批量响应中的全部子请求都应成功"""
+    failures = [
+        f"{item['method']} {item['path']}: {item['response'].get('error', {}).get('code')}"
+        for item in response.get("data", {}).get("results", [])
+        if not item["response"].get("success", False)
+    ]
+    return f"批量子请求失败: {', '.join(failures)}" if failures else None
+
+def create_dynamic_path_full_test_suite(workers: int = 1) -> DynamicPathAPITestRunner:
     """创建动态路径完整测试套件"""
-    runner = create_dynamic_path_basic_test_suite()
+    runner = create_dynamic_path_basic_test_suite(workers)
 
     # POST端点测试
     post_endpoints = [
@@ -349,14 +420,25 @@ def create_dynamic_path_full_test_suite() -> DynamicPathAPITestRunner:
         # 为启动应用测试添加路径验证
         if endpoint == "/api/launch-app":
             test_case.enable_path_validation(["codestudio_exe"])
+
+        # 会修改全局状态的端点，并行执行时独占运行
+        if endpoint in ("/api/clean", "/api/reset"):
+            test_case.set_isolation(ISOLATION_EXCLUSIVE)
         
         runner.add_test_case(test_case)
 
+    # 延迟SLO测试（独占执行，避免并行测试干扰测量）
+    # 每次请求前清除响应缓存，测量的是处理函数的实际耗时而不是缓存命中
+    for name, endpoint in (("基础状态", "/api/status"), ("路径信息", "/api/path-info")):
+        test_case = DynamicPathAPITestCase(f"{name} - 延迟SLO", endpoint, "GET").bypass_response_cache()
+        test_case.set_repetitions(SLO_REPETITIONS, warmup=SLO_WARMUP).assert_latency(95, SLO_P95_MS)
+        runner.add_test_case(test_case.set_isolation(ISOLATION_EXCLUSIVE))
+
     return runner
 
-def create_path_stress_test_suite() -> DynamicPathAPITestRunner:
+def create_path_stress_test_suite(workers: int = 1) -> DynamicPathAPITestRunner:
     """创建路径压力测试套件"""
-    runner = DynamicPathAPITestRunner()
+    runner = DynamicPathAPITestRunner(workers)
     
     # 大量路径信息请求
     for i in range(10):
@@ -381,19 +463,19 @@ def create_path_stress_test_suite() -> DynamicPathAPITestRunner:
 # 便捷函数
 # ============================================================================
 
-def run_dynamic_basic_tests() -> Dict[str, Any]:
+def run_dynamic_basic_tests(workers: int = 1) -> Dict[str, Any]:
     """运行动态路径基础测试"""
-    runner = create_dynamic_path_basic_test_suite()
+    runner = create_dynamic_path_basic_test_suite(workers)
     return runner.run_all_tests()
 
-def run_dynamic_full_tests() -> Dict[str, Any]:
+def run_dynamic_full_tests(workers: int = 1) -> Dict[str, Any]:
     """运行动态路径完整测试"""
-    runner = create_dynamic_path_full_test_suite()
+    runner = create_dynamic_path_full_test_suite(workers)
     return runner.run_all_tests()
 
-def run_path_stress_tests() -> Dict[str, Any]:
+def run_path_stress_tests(workers: int = 1) -> Dict[str, Any]:
     """运行路径压力测试"""
-    runner = create_path_stress_test_suite()
+    runner = create_path_stress_test_suite(workers)
     return runner.run_all_tests()
 
 # ============================================================================
@@ -401,38 +483,52 @@ def run_path_stress_tests() -> Dict[str, Any]:
 # ============================================================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CodeStudio Pro Ultimate - 动态路径API测试框架")
+    parser.add_argument("--suite", choices=["basic", "full", "stress", "all"], help="测试套件（不指定时交互选择）")
+    parser.add_argument("--workers", type=parse_workers, default=1,
+                        help="并行执行的工作线程数，0 或 auto 表示CPU核心数 (默认: 1，串行)")
+    args = parser.parse_args()
+    workers = args.workers
+
     print("🚀 CodeStudio Pro Ultimate - 动态路径API测试框架 v2.0")
-    print("选择测试模式:")
-    print("1. 基础测试")
-    print("2. 完整测试")
-    print("3. 路径压力测试")
-    print("4. 所有测试")
+    choice = {"basic": "1", "full": "2", "stress": "3", "all": "4"}.get(args.suite)
+    if choice is None:
+        print("选择测试模式:")
+        print("1. 基础测试")
+        print("2. 完整测试")
+        print("3. 路径压力测试")
+        print("4. 所有测试")
 
-    choice = input("请输入选择 (1-4): ").strip()
+        choice = input("请输入选择 (1-4): ").strip()
 
+    reports = []
     if choice == "1":
-        run_dynamic_basic_tests()
+        reports.append(run_dynamic_basic_tests(workers))
     elif choice == "2":
-        run_dynamic_full_tests()
+        reports.append(run_dynamic_full_tests(workers))
     elif choice == "3":
-        run_path_stress_tests()
+        reports.append(run_path_stress_tests(workers))
     elif choice == "4":
         print("\n🔄 运行所有测试...")
         print("\n" + "="*60)
         print("📋 基础测试")
         print("="*60)
-        run_dynamic_basic_tests()
+        reports.append(run_dynamic_basic_tests(workers))
         
         print("\n" + "="*60)
         print("📋 完整测试")
         print("="*60)
-        run_dynamic_full_tests()
+        reports.append(run_dynamic_full_tests(workers))
         
         print("\n" + "="*60)
         print("📋 路径压力测试")
         print("="*60)
-        run_path_stress_tests()
+        reports.append(run_path_stress_tests(workers))
         
         print("\n🎉 所有测试完成！")
     else:
-        print("❌ 无效选择")
\ No newline at end of file
+        print("❌ 无效选择")
+        sys.exit(2)
+
+    # 存在失败（含超时和延迟SLO未满足）时以非零退出码结束
+    sys.exit(1 if any(report["summary"]["failed"] for report in reports) else 0)
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 动态路径监视器
+为 DynamicPathManager 的已知路径维护内存中的元数据表，并向订阅者推送变化事件
+
+版本: 1.0
+作者: AI Assistant
+功能: 路径元数据表（存在性、类型、大小、修改时间）、Linux inotify 监视（ctypes）、跨平台轮询回退、变化事件订阅与回放
+特色: 路径接口直接读取内存元数据，只有文件系统发生变化时才重新 stat 受影响的路径
+"""
+
+import os
+import stat
+import time
+import select
+import struct
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable, List, Iterable, Tuple
+
+# ============================================================================
+# 常量
+# ============================================================================
+
+BACKEND_AUTO = "auto"
+BACKEND_INOTIFY = "inotify"
+BACKEND_POLLING = "polling"
+
+CHANGE_CREATED = "created"
+CHANGE_DELETED = "deleted"
+CHANGE_MODIFIED = "modified"
+
+# inotify 事件掩码（linux/inotify.h）
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+# 会改变所在目录自身 mtime 的子条目事件
+ENTRY_CHANGE_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# ============================================================================
+# 路径元数据
+# ============================================================================
+
+def stat_metadata(path: Path) -> Dict[str, Any]:
+    """一次 stat 获取路径元数据"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {"path": str(path), "exists": False, "type": None, "size": None, "mtime": None}
+
+    if stat.S_ISDIR(st.st_mode):
+        path_type = "dir"
+    elif stat.S_ISREG(st.st_mode):
+        path_type = "file"
+    else:
+        path_type = "other"
+    return {"path": str(path), "exists": True, "type": path_type, "size": st.st_size, "mtime": st.st_mtime}
+
+
+def _classify_change(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Optional[str]:
+    """比较前后元数据，返回变化类型，无变化时返回 None"""
+    if previous is None or previous["exists"] != current["exists"]:
+        return CHANGE_CREATED if current["exists"] else CHANGE_DELETED
+    if (previous["type"], previous["size"], previous["mtime"]) != (current["type"], current["size"], current["mtime"]):
+        return CHANGE_MODIFIED
+    return None
+
+# ============================================================================
+# 路径监视器
+# ============================================================================
+
+class PathWatcher:
+    """路径监视器
+
+    维护 {路径键: 元数据} 内存表。start() 后由后台线程在文件系统变化时更新受影响的条目，
+    并按顺序把变化事件推送给订阅者；最近的事件保留在有界队列中供 events_since() 回放。
+    """
+
+    def __init__(self, paths: Dict[str, Path], backend: str = BACKEND_AUTO, poll_interval: float = 2.0,
+                 rescan_interval: float = 30.0, max_events: int = 256):
+        self.requested_backend = backend
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.backend_name: Optional[str] = None
+
+        self._paths: Dict[str, Path] = {key: Path(path) for key, path in paths.items()}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self._events: deque = deque(maxlen=max_events)
+        self._sequence = 0
+        self._backend = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.stats = {"events": 0, "refreshes": 0, "rescans": 0, "watch_errors": 0}
+
+    # ------------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "PathWatcher":
+        """初始扫描并启动后台监视线程"""
+        if self.running:
+            return self
+
+        self.refresh(notify=False)
+        self._stop_event.clear()
+
+        backend = None
+        if self.requested_backend in (BACKEND_AUTO, BACKEND_INOTIFY):
+            try:
+                backend = _InotifyBackend(self)
+            except OSError:
+                if self.requested_backend == BACKEND_INOTIFY:
+                    raise
+        if backend is None:
+            backend = _PollingBackend(self)
+
+        self._backend = backend
+        self.backend_name = backend.name
+        self._thread = threading.Thread(target=self._run_backend, args=(backend,), name="path-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> bool:
+        """停止后台监视线程，返回线程是否已在超时内退出
+
+        后端描述符由监视线程退出时关闭：超时后线程仍在运行（例如订阅者回调阻塞）时不会关闭，
+        避免线程继续读取一个已关闭、编号可能已被复用的描述符。
+        """
+        thread, backend = self._thread, self._backend
+        if thread is None:
+            return True
+        self._stop_event.set()
+        backend.wakeup()
+        thread.join(timeout)
+        self._thread = None
+        self._backend = None
+        return not thread.is_alive()
+
+    @staticmethod
+    def _run_backend(backend):
+        """监视线程入口：运行后端，退出时关闭后端资源"""
+        try:
+            backend.run()
+        finally:
+            backend.close()
+
+    # ------------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """获取单个路径的元数据副本"""
+        with self._lock:
+            metadata = self._metadata.get(key)
+            return dict(metadata) if metadata is not None else None
+
+    def exists(self, key: str) -> bool:
+        """路径是否存在（读取内存元数据）"""
+        metadata = self._metadata.get(key)
+        return bool(metadata and metadata["exists"])
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """全部路径元数据的副本"""
+        with self._lock:
+            return {key: dict(metadata) for key, metadata in self._metadata.items()}
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    def events_since(self, sequence: int = 0) -> List[Dict[str, Any]]:
+        """返回序号大于 sequence 的已保留事件"""
+        with self._lock:
+            return [dict(event) for event in self._events if event["sequence"] > sequence]
+
+    # ------------------------------------------------------------------------
+    # 订阅与更新
+    # ------------------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> Callable[[], None]:
+        """订阅变化事件，返回取消订阅函数；回调在监视线程中执行"""
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def add_path(self, key: str, path: Path):
+        """登记新的监视路径"""
+        with self._lock:
+            self._paths[key] = Path(path)
+        self.refresh([key], notify=False)
+        backend = self._backend
+        if backend is not None:
+            backend.sync()
+
+    def refresh(self, keys: Optional[Iterable[str]] = None, notify: bool = True) -> List[Dict[str, Any]]:
+        """重新 stat 指定路径（默认全部），返回产生的变化事件"""
+        with self._lock:
+            targets = [(key, self._paths[key]) for key in (keys if keys is not None else self._paths)
+                       if key in self._paths]
+        current = [(key, stat_metadata(path)) for key, path in targets]
+
+        events = []
+        with self._lock:
+            self.stats["refreshes"] += 1
+            for key, metadata in current:
+                previous = self._metadata.get(key)
+                self._metadata[key] = metadata
+                change = _classify_change(previous, metadata)
+                if change is None or not notify:
+                    continue
+                self._sequence += 1
+                event = {
+                    "sequence": self._sequence,
+                    "key": key,
+                    "path": metadata["path"],
+                    "change": change,
+                    "metadata": dict(metadata),
+                    "previous": dict(previous) if previous else None,
+                    "timestamp": time.time()
+                }
+                self._events.append(event)
+                events.append(event)
+            self.stats["events"] += len(events)
+
+        for event in events:
+            for callback in list(self._subscribers):
+                try:
+                    callback(dict(event))
+                except Exception:
+                    pass  # 订阅者异常不影响监视线程
+        return events
+
+    def _keys_for_change(self, directory: str, name: str, mask: int) -> List[str]:
+        """根据 inotify 事件找出受影响的路径键
+
+        受影响的是事件条目本身、条目下的所有路径（祖先目录被创建/删除/移动），
+        以及子条目增删时所在目录自身（mtime 变化）。
+        """
+        target = os.path.join(directory, name) if name else directory
+        prefix = target.rstrip(os.sep) + os.sep
+        include_directory = bool(name) and mask & ENTRY_CHANGE_MASK
+
+        keys = []
+        with self._lock:
+            for key, path in self._paths.items():
+                path_str = str(path)
+                if path_str == target or path_str.startswith(prefix):
+                    keys.append(key)
+                elif include_directory and path_str == directory:
+                    keys.append(key)
+        return keys
+
+    def _watch_directories(self) -> List[str]:
+        """需要 inotify 监视的目录：每个已存在的目录路径，以及每个路径最近的已存在祖先目录"""
+        with self._lock:
+            items = [(key, path, self._metadata.get(key)) for key, path in self._paths.items()]
+
+        directories = set()
+        for key, path, metadata in items:
+            if metadata and metadata["type"] == "dir":
+                directories.add(str(path))
+            parent = path.parent
+            while not parent.is_dir() and parent != parent.parent:
+                parent = parent.parent
+            directories.add(str(parent))
+        return sorted(directories)
+
+# ============================================================================
+# 监视后端
+# ============================================================================
+
+class _PollingBackend:
+    """跨平台轮询后端：每隔 poll_interval 秒重新 stat 全部路径"""
+
+    name = BACKEND_POLLING
+
+    def __init__(self, watcher: PathWatcher):
+        self.watcher = watcher
+
+    def run(self):
+        while not self.watcher._stop_event.wait(self.watcher.poll_interval):
+            self.watcher.refresh()
+
+    def sync(self):
+        pass
+
+    def wakeup(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _InotifyBackend:
+    """Linux inotify 后端（通过 ctypes 调用 libc）"""
+
+    name = BACKEND_INOTIFY
+
+    def __init__(self, watcher: PathWatcher):
+        self.watcher = watcher
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(_ctypes_errno(), "inotify_init1 失败")
+        self._wake_read, self._wake_write = os.pipe()
+        self._wd_directories: Dict[int, str] = {}
+        self._directory_wds: Dict[str, int] = {}
+        self._sync_lock = threading.Lock()
+        self.sync()
+
+    def sync(self):
+        """使 inotify 监视集合与当前需要监视的目录一致"""
+        with self._sync_lock:
+            if self._fd < 0:
+                return
+            desired = set(self.watcher._watch_directories())
+
+            for directory in list(self._directory_wds):
+                if directory not in desired:
+                    wd = self._directory_wds.pop(directory)
+                    self._wd_directories.pop(wd, None)
+                    self._libc.inotify_rm_watch(self._fd, wd)
+
+            for directory in desired:
+                if directory in self._directory_wds:
+                    continue
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+                if wd < 0:
+                    self.watcher.stats["watch_errors"] += 1
+                    continue
+                self._directory_wds[directory] = wd
+                self._wd_directories[wd] = directory
+
+    def run(self):
+        watcher = self.watcher
+        while not watcher._stop_event.is_set():
+            try:
+                readable, _, _ = select.select([self._fd, self._wake_read], [], [], watcher.rescan_interval)
+            except (OSError, ValueError):
+                return
+            if watcher._stop_event.is_set():
+                return
+
+            if not readable:
+                # 兜底全量复查，覆盖监视数量超限等漏报情况
+                watcher.stats["rescans"] += 1
+                self._apply(watcher.refresh())
+                continue
+
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return
+
+            keys, rescan, watches_changed = self._parse_events(buffer)
+            if rescan:
+                watcher.stats["rescans"] += 1
+                events = watcher.refresh()
+            elif keys:
+                events = watcher.refresh(sorted(keys))
+            else:
+                events = []
+            self._apply(events, watches_changed)
+
+    def _parse_events(self, buffer: bytes) -> Tuple[set, bool, bool]:
+        """解析 inotify_event 序列，返回 (受影响路径键, 是否需要全量复查, 监视集合是否失效)"""
+        keys = set()
+        rescan = False
+        watches_changed = False
+        offset = 0
+
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].split(b"\0", 1)[0]
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                rescan = True
+                continue
+            if mask & IN_IGNORED:
+                with self._sync_lock:
+                    directory = self._wd_directories.pop(wd, None)
+                    if directory is not None:
+                        self._directory_wds.pop(directory, None)
+                watches_changed = True
+                continue
+
+            directory = self._wd_directories.get(wd)
+            if directory is None:
+                continue
+            keys.update(self.watcher._keys_for_change(directory, os.fsdecode(name), mask))
+
+        return keys, rescan, watches_changed
+
+    def _apply(self, events: List[Dict[str, Any]], watches_changed: bool = False):
+        """路径创建/删除或监视失效后重新同步监视集合"""
+        if watches_changed or any(event["change"] != CHANGE_MODIFIED for event in events):
+            self.sync()
+
+    def wakeup(self):
+        with self._sync_lock:
+            if self._wake_write < 0:
+                return
+            try:
+                os.write(self._wake_write, b"\0")
+            except OSError:
+                pass
+
+    def close(self):
+        """关闭 inotify 与唤醒管道描述符（只关闭一次）"""
+        with self._sync_lock:
+            fds = (self._fd, self._wake_read, self._wake_write)
+            self._fd = self._wake_read = self._wake_write = -1
+        for fd in fds:
+            if fd < 0:
+                continue
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def _load_libc():
+    """加载支持 inotify 的 libc，非 Linux 平台抛出 OSError"""
+    import sys
+    if not sys.platform.startswith("linux"):
+        raise OSError("inotify 仅在 Linux 上可用")
+
+    import ctypes
+    import ctypes.util
+
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    try:
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except AttributeError:
+        raise OSError("libc 不支持 inotify")
+    return libc
+
+
+def _ctypes_errno() -> int:
+    import ctypes
+    return ctypes.get_errno()
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 文件索引与通配查找
+为 DynamicPathManager.find_files 提供按文件名/后缀索引的查找和剪枝通配遍历
+
+版本: 1.0
+作者: AI Assistant
+功能: 通配模式编译（按路径段匹配、字面前缀定位、** 递归）、排除子树剪枝、按目录mtime增量刷新的内存索引
+特色: 字面文件名和 *.后缀 模式直接命中索引，重复查找只需字典查询和少量路径匹配；Windows 上与 Path.glob 一样不区分大小写
+"""
+
+import os
+import re
+import time
+import fnmatch
+import functools
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Set, Tuple, Iterable, Union
+
+PathLike = Union[str, Path]
+
+# ============================================================================
+# 常量
+# ============================================================================
+
+# 默认排除：不含 "/" 的按目录名匹配任意层级，含 "/" 的为相对项目根目录的路径
+DEFAULT_EXCLUDES = ("resources/app", "node_modules", ".git", "__pycache__")
+
+# 索引的 mtime 复查间隔（秒），间隔内的查找直接使用内存索引
+DEFAULT_CHECK_INTERVAL = 2.0
+
+# 文件系统 mtime 粒度可能粗到秒级
+RACY_MTIME_WINDOW_NS = 2 * 10 ** 9
+
+_WILDCARD_CHARS = re.compile(r"[*?\[]")
+
+# Windows 文件系统不区分大小写：索引键和模式的字面段折叠为小写，通配段忽略大小写（与 Path.glob 一致）
+CASE_INSENSITIVE = os.name == "nt"
+_GLOB_FLAGS = re.IGNORECASE if CASE_INSENSITIVE else 0
+
+
+def _case_key(text: str) -> str:
+    """名称比较键：不区分大小写的平台上折叠为小写"""
+    return text.lower() if CASE_INSENSITIVE else text
+
+# ============================================================================
+# 通配模式编译
+# ============================================================================
+
+class CompiledGlob:
+    """编译后的相对路径通配模式（语义同 Path.glob）
+
+    模式按 "/" 拆成路径段逐段匹配：``*``、``?``、``[...]`` 不跨越路径段，
+    ``**`` 匹配零个或多个目录，位于末尾时只匹配目录。
+    Windows 上匹配不区分大小写，basename/suffix 为折叠后的索引键。
+    """
+
+    __slots__ = ("pattern", "segments", "literal_prefix", "basename", "suffix", "dirs_only", "_keys",
+                 "_last_double")
+
+    def __init__(self, pattern: str):
+        parts = [part for part in pattern.replace("\\", "/").split("/") if part and part != "."]
+        if not parts or pattern.startswith("/") or ".." in parts:
+            raise ValueError(f"不支持的查找模式: {pattern}")
+
+        self.pattern = pattern
+        self.segments: List[Any] = []
+        literal_prefix: List[str] = []
+        for part in parts:
+            if part == "**":
+                if not self.segments or self.segments[-1] is not None:
+                    self.segments.append(None)
+            elif _WILDCARD_CHARS.search(part):
+                self.segments.append(re.compile(fnmatch.translate(part), _GLOB_FLAGS).match)
+            else:
+                self.segments.append(part)
+            if len(literal_prefix) == len(self.segments) - 1 and isinstance(self.segments[-1], str):
+                literal_prefix.append(part)
+
+        last = parts[-1]
+        self.dirs_only = last == "**"
+        # 最后一段为字面文件名时按文件名查索引；以 "*" 或 "?" 加含 "." 的字面结尾时按后缀查索引
+        self.basename = _case_key(last) if isinstance(self.segments[-1], str) else None
+        self.suffix = None
+        if self.basename is None and not self.dirs_only:
+            position = max(last.rfind("*"), last.rfind("?"), last.rfind("]"))
+            tail = last[position + 1:]
+            if last[position] != "]" and "." in tail:
+                self.suffix = _case_key(tail[tail.rfind("."):])
+        # 匹配用的字面段比较键（遍历文件系统时仍使用原始写法）
+        self._keys = ([_case_key(segment) if isinstance(segment, str) else segment for segment in self.segments]
+                      if CASE_INSENSITIVE else self.segments)
+        # 全部为字面段时前缀不包含最后一段，保证候选路径位于前缀目录之下
+        if len(literal_prefix) == len(self.segments):
+            literal_prefix.pop()
+        self.literal_prefix = "/".join(literal_prefix)
+        # 最后一个 ** 之后的路径段数固定，匹配时不必逐个尝试
+        self._last_double = max((i for i, segment in enumerate(self.segments) if segment is None), default=-1)
+
+    def match(self, relative: str, is_dir: bool = False) -> bool:
+        """相对路径（"/" 分隔）是否匹配"""
+        if self.dirs_only and not is_dir:
+            return False
+        return _match_segments(self._keys, _case_key(relative).split("/"), 0, 0, self._last_double)
+
+
+def _match_segments(segments: List[Any], parts: List[str], i: int, j: int, last_double: int) -> bool:
+    while i < len(segments):
+        segment = segments[i]
+        if segment is None:
+            if i == last_double:
+                # 其后不再有 **，剩余路径段必须与末尾逐段对应
+                k = len(parts) - (len(segments) - i - 1)
+                return k >= j and _match_segments(segments, parts, i + 1, k, last_double)
+            # ** 匹配零个或多个路径段
+            return any(_match_segments(segments, parts, i + 1, k, last_double) for k in range(j, len(parts) + 1))
+        if j >= len(parts):
+            return False
+        if isinstance(segment, str):
+            if segment != parts[j]:
+                return False
+        elif not segment(parts[j]):
+            return False
+        i += 1
+        j += 1
+    return j == len(parts)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_glob(pattern: str) -> CompiledGlob:
+    """编译通配模式（结果缓存）"""
+    return CompiledGlob(pattern)
+
+# ============================================================================
+# 排除规则
+# ============================================================================
+
+class ExcludeRules:
+    """排除规则：目录名集合 + 绝对路径集合，判断为 O(1)"""
+
+    __slots__ = ("names", "paths")
+
+    def __init__(self, excludes: Iterable[str] = DEFAULT_EXCLUDES, base: Optional[PathLike] = None):
+        self.names: Set[str] = set()
+        self.paths: Set[str] = set()
+        for item in excludes:
+            item = item.replace("\\", "/").strip("/")
+            if "/" in item:
+                self.paths.add(os.path.normpath(os.path.join(str(base or "."), item)))
+            elif item:
+                self.names.add(item)
+
+    def excluded(self, name: str, path: str) -> bool:
+        return name in self.names or path in self.paths
+
+    def excluded_along(self, root: str, relative: str) -> bool:
+        """root 之下的相对路径 relative 是否经过被排除的目录"""
+        path = root
+        for name in relative.split("/") if relative else ():
+            path = os.path.join(path, name)
+            if self.excluded(name, path):
+                return True
+        return False
+
+    def without_ancestors_of(self, path: str) -> "ExcludeRules":
+        """去掉包含 path 的排除项（显式查找被排除目录内部时使用）"""
+        rules = ExcludeRules(())
+        parts = set(Path(path).parts)
+        rules.names = {name for name in self.names if name not in parts}
+        rules.paths = {item for item in self.paths if not (path == item or path.startswith(item + os.sep))}
+        return rules
+
+    def key(self) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        return tuple(sorted(self.names)), tuple(sorted(self.paths))
+
+# ============================================================================
+# 剪枝通配遍历
+# ============================================================================
+
+def iter_glob(root: PathLike, compiled: CompiledGlob, rules: Optional[ExcludeRules] = None) -> Iterator[Path]:
+    """直接遍历文件系统查找匹配项
+
+    从字面前缀目录开始，只进入能够匹配后续路径段的目录，排除的子树和符号链接目录不进入。
+    """
+    rules = rules or ExcludeRules(())
+    seen: Set[str] = set()
+    for path in _glob_walk(str(root), compiled.segments, 0, rules):
+        if path not in seen:
+            seen.add(path)
+            yield Path(path)
+
+
+def _glob_walk(directory: str, segments: List[Any], index: int, rules: ExcludeRules) -> Iterator[str]:
+    segment = segments[index]
+    last = index == len(segments) - 1
+
+    if segment is None:
+        if last:
+            yield directory
+        else:
+            yield from _glob_walk(directory, segments, index + 1, rules)
+        for name, path in _list_subdirs(directory, rules):
+            yield from _glob_walk(path, segments, index, rules)
+        return
+
+    if isinstance(segment, str):
+        path = os.path.join(directory, segment)
+        if last:
+            if os.path.lexists(path) and not rules.excluded(segment, path):
+                yield path
+        elif os.path.isdir(path) and not rules.excluded(segment, path):
+            yield from _glob_walk(path, segments, index + 1, rules)
+        return
+
+    try:
+        with os.scandir(directory) as iterator:
+            entries = [entry for entry in iterator if segment(entry.name)]
+    except OSError:
+        return
+    for entry in entries:
+        if rules.excluded(entry.name, entry.path):
+            continue
+        if last:
+            yield entry.path
+            continue
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            continue
+        if is_dir:
+            yield from _glob_walk(entry.path, segments, index + 1, rules)
+
+
+def _list_subdirs(directory: str, rules: ExcludeRules) -> List[Tuple[str, str]]:
+    """列出未排除的真实子目录（不跟随符号链接，避免成环）"""
+    try:
+        with os.scandir(directory) as iterator:
+            return [(entry.name, entry.path) for entry in iterator
+                    if entry.is_dir(follow_symlinks=False) and not rules.excluded(entry.name, entry.path)]
+    except OSError:
+        return []
+
+# ============================================================================
+# 文件索引
+# ============================================================================
+
+class FileIndex:
+    """单个根目录的内存文件索引
+
+    索引按文件名和后缀（最后一个 "." 起的部分）登记所有文件和目录的相对路径，
+    并记录每个目录的 mtime；刷新时只重新读取 mtime 变化的目录。
+    排除的子树和符号链接目录不进入索引。查找距上次检查不足 check_interval 秒时不访问文件系统。
+    文件名/后缀索引键在不区分大小写的平台上折叠为小写，返回的路径保留磁盘上的原始大小写。
+    """
+
+    def __init__(self, root: PathLike, rules: Optional[ExcludeRules] = None,
+                 check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.root = str(root)
+        self.rules = rules or ExcludeRules(())
+        self.check_interval = check_interval
+
+        # 目录相对路径 -> (mtime_ns, 文件名列表, 子目录名列表)
+        self._dirs: Dict[str, Tuple[Optional[int], List[str], List[str]]] = {}
+        self._by_name: Dict[str, Set[str]] = {}
+        self._by_suffix: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self.stats = {"refreshes": 0, "directories_rescanned": 0, "lookups": 0}
+
+    # ------------------------------------------------------------------------
+    # 查找
+    # ------------------------------------------------------------------------
+
+    def find(self, compiled: CompiledGlob, refresh: bool = False) -> List[Path]:
+        """返回匹配的路径（按相对路径排序）"""
+        with self._lock:
+            if refresh or time.monotonic() - self._checked >= self.check_interval:
+                self._refresh()
+            self.stats["lookups"] += 1
+
+            literal_prefix = self._resolve_directory(compiled.literal_prefix)
+            if literal_prefix is None:
+                # 字面前缀目录不在索引中
+                return []
+            if compiled.basename is not None:
+                candidates: Iterable[str] = self._by_name.get(compiled.basename, ())
+            elif compiled.suffix is not None:
+                candidates = self._by_suffix.get(compiled.suffix, ())
+            else:
+                candidates = self._iter_subtree(literal_prefix)
+
+            prefix = literal_prefix + "/" if literal_prefix else ""
+            if compiled.dirs_only and literal_prefix in self._dirs:
+                # "a/**" 也匹配 a 自身
+                candidates = [literal_prefix, *candidates]
+            matches = sorted(
+                relative for relative in candidates
+                if (relative.startswith(prefix) or relative == literal_prefix)
+                and compiled.match(relative, relative in self._dirs)
+            )
+        root = self.root.rstrip("/\\")
+        return [Path(f"{root}/{relative}") for relative in matches]
+
+    def _resolve_directory(self, relative: str) -> Optional[str]:
+        """将模式的字面前缀解析为索引中目录的相对路径，不存在时返回 None
+
+        不区分大小写的平台上逐段按折叠后的名称查找，得到磁盘上的原始写法。
+        """
+        if not relative or relative in self._dirs:
+            return relative
+        if not CASE_INSENSITIVE:
+            return None
+        current = ""
+        for segment in relative.split("/"):
+            record = self._dirs.get(current)
+            key = _case_key(segment)
+            child = next((name for name in record[2] if _case_key(name) == key), None) if record else None
+            if child is None:
+                return None
+            current = f"{current}/{child}" if current else child
+        return current
+
+    def _iter_subtree(self, relative: str) -> Iterator[str]:
+        """遍历索引中某个目录之下的全部条目（不含目录自身）"""
+        stack = [relative]
+        while stack:
+            current = stack.pop()
+            record = self._dirs.get(current)
+            if record is None:
+                continue
+            for name in record[1]:
+                yield f"{current}/{name}" if current else name
+            for name in record[2]:
+                child = f"{current}/{name}" if current else name
+                yield child
+                stack.append(child)
+
+    # ------------------------------------------------------------------------
+    # 刷新
+    # ------------------------------------------------------------------------
+
+    def refresh(self) -> Dict[str, Any]:
+        """立即按目录mtime增量刷新"""
+        with self._lock:
+            self._refresh()
+            return dict(self.stats)
+
+    def _refresh(self):
+        """增量刷新（调用方需持有锁）"""
+        self.stats["refreshes"] += 1
+        if not os.path.isdir(self.root):
+            for relative in list(self._dirs):
+                self._forget_directory(relative)
+            self._dirs.clear()
+        else:
+            stack = [""]
+            while stack:
+                relative = stack.pop()
+                record = self._dirs.get(relative)
+                try:
+                    mtime_ns = os.stat(self._absolute(relative)).st_mtime_ns
+                except OSError:
+                    self._remove_subtree(relative)
+                    continue
+                if record is None or record[0] != mtime_ns:
+                    record = self._rescan(relative, mtime_ns)
+                stack.extend(f"{relative}/{name}" if relative else name for name in record[2])
+        self._checked = time.monotonic()
+
+    def _rescan(self, relative: str, mtime_ns: int) -> Tuple[Optional[int], List[str], List[str]]:
+        """重新读取单个目录并更新索引"""
+        files: List[str] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(self._absolute(relative)) as iterator:
+                for entry in iterator:
+                    if self.rules.excluded(entry.name, entry.path):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        else:
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+
+        old = self._dirs.get(relative)
+        if old is not None:
+            self._forget_directory(relative)
+            kept = set(subdirs)
+            for name in old[2]:
+                if name not in kept:
+                    self._remove_subtree(f"{relative}/{name}" if relative else name)
+
+        # mtime 距今过近时不记录，下次刷新重新读取
+        if time.time_ns() - mtime_ns < RACY_MTIME_WINDOW_NS:
+            mtime_ns = None
+        record = (mtime_ns, files, subdirs)
+        self._dirs[relative] = record
+        for name in files + subdirs:
+            self._add(f"{relative}/{name}" if relative else name, name)
+        self.stats["directories_rescanned"] += 1
+        return record
+
+    def _remove_subtree(self, relative: str):
+        """从索引中删除目录及其全部下级"""
+        record = self._dirs.get(relative)
+        if record is None:
+            return
+        self._forget_directory(relative)
+        del self._dirs[relative]
+        for name in record[2]:
+            self._remove_subtree(f"{relative}/{name}" if relative else name)
+
+    def _forget_directory(self, relative: str):
+        """移除目录的直接子条目在文件名/后缀索引中的登记"""
+        record = self._dirs.get(relative)
+        if record is None:
+            return
+        for name in record[1] + record[2]:
+            self._discard(f"{relative}/{name}" if relative else name, name)
+
+    def _add(self, relative: str, name: str):
+        self._by_name.setdefault(_case_key(name), set()).add(relative)
+        suffix = _suffix_key(name)
+        if suffix:
+            self._by_suffix.setdefault(suffix, set()).add(relative)
+
+    def _discard(self, relative: str, name: str):
+        key = _case_key(name)
+        bucket = self._by_name.get(key)
+        if bucket is not None:
+            bucket.discard(relative)
+            if not bucket:
+                del self._by_name[key]
+        suffix = _suffix_key(name)
+        bucket = self._by_suffix.get(suffix) if suffix else None
+        if bucket is not None:
+            bucket.discard(relative)
+            if not bucket:
+                del self._by_suffix[suffix]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """索引规模与命中统计"""
+        with self._lock:
+            return {
+                "root": self.root,
+                "directories": len(self._dirs),
+                "names": len(self._by_name),
+                "suffixes": len(self._by_suffix),
+                **self.stats
+            }
+
+    def _absolute(self, relative: str) -> str:
+        return os.path.join(self.root, *relative.split("/")) if relative else self.root
+
+
+def _suffix_key(name: str) -> str:
+    """文件名最后一个 "." 起的部分（".bashrc" 的后缀为其自身），按平台折叠大小写"""
+    position = name.rfind(".")
+    return _case_key(name[position:]) if position >= 0 else ""
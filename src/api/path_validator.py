@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 批量路径验证
+并发检查任意数量路径的存在性与可访问性，供路径验证接口和多实例检查复用
+
+版本: 1.0
+作者: AI Assistant
+功能: 单次 os.stat + 单次 os.access 的路径检查、线程池并发验证、按读/写要求判断可访问性、验证统计
+特色: 目录可读性用 os.access(R_OK | X_OK) 判断，不再列出目录内容，耗时与目录大小无关
+"""
+
+import os
+import stat
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+PathLike = Union[str, Path]
+
+# ============================================================================
+# 常量
+# ============================================================================
+
+ACCESS_READ = "read"
+ACCESS_WRITE = "write"
+ACCESS_MODES = (ACCESS_READ, ACCESS_WRITE)
+
+# 单次验证的路径数量上限
+MAX_BULK_PATHS = 10000
+
+# 路径数量不超过该值时在当前线程直接检查，线程池调度开销不划算
+INLINE_THRESHOLD = 8
+
+# ============================================================================
+# 单路径检查
+# ============================================================================
+
+def check_path(path: PathLike, access: str = ACCESS_READ) -> Dict[str, Any]:
+    """检查单个路径：一次 os.stat 得到存在性和类型，一次 os.access 得到可访问性
+
+    目录需要可读且可进入（R_OK | X_OK），文件需要可读；access="write" 时额外要求可写。
+    """
+    path = str(path)
+    result: Dict[str, Any] = {"path": path, "exists": False, "type": "missing", "accessible": False}
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        result["status"] = "❌"
+        return result
+    except OSError as e:
+        result.update({"type": "unknown", "error": str(e), "status": "❌"})
+        return result
+
+    result["exists"] = True
+    if stat.S_ISDIR(st.st_mode):
+        result["type"] = "dir"
+        mode = os.R_OK | os.X_OK
+    else:
+        result["type"] = "file" if stat.S_ISREG(st.st_mode) else "other"
+        result["size"] = st.st_size
+        mode = os.R_OK
+    if access == ACCESS_WRITE:
+        mode |= os.W_OK
+
+    result["accessible"] = os.access(path, mode)
+    result["status"] = "✅" if result["accessible"] else "⚠️"
+    return result
+
+# ============================================================================
+# 批量验证器
+# ============================================================================
+
+class PathValidator:
+    """批量路径验证器
+
+    validate() 接受 {键: 路径}，在线程池中并发检查并保持键的顺序；
+    线程池独立于 API 处理函数线程池，避免在处理函数中嵌套等待同一个线程池。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def validate(self, targets: Dict[str, PathLike], access: str = ACCESS_READ) -> Dict[str, Dict[str, Any]]:
+        """并发检查全部路径，返回 {键: 检查结果}"""
+        if access not in ACCESS_MODES:
+            raise ValueError(f"不支持的访问要求: {access}")
+        if len(targets) > MAX_BULK_PATHS:
+            raise ValueError(f"单次最多验证 {MAX_BULK_PATHS} 个路径")
+
+        keys = list(targets)
+        if len(keys) <= INLINE_THRESHOLD:
+            return {key: check_path(targets[key], access) for key in keys}
+
+        # 按线程数分块提交，减少 Future 数量
+        chunk_size = max(1, -(-len(keys) // self.max_workers))
+        chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+        futures = [
+            self._get_executor().submit(lambda chunk: [check_path(targets[key], access) for key in chunk], chunk)
+            for chunk in chunks
+        ]
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for chunk, future in zip(chunks, futures):
+            results.update(zip(chunk, future.result()))
+        return results
+
+    def shutdown(self, wait: bool = True):
+        """关闭线程池"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _get_executor(self):
+        """获取线程池（延迟创建）"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="path-validator"
+                    )
+        return self._executor
+
+
+def summarize_results(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """验证统计"""
+    total = len(results)
+    valid = sum(1 for result in results.values() if result["exists"])
+    accessible = sum(1 for result in results.values() if result["accessible"])
+    return {
+        "total_paths": total,
+        "valid_paths": valid,
+        "accessible_paths": accessible,
+        "validation_rate": round(valid / total * 100, 2) if total else 0.0
+    }
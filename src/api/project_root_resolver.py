@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 项目根目录解析
+进程内共享、带记忆的项目根目录解析，供所有 DynamicPathManager 实例复用
+
+版本: 1.0
+作者: AI Assistant
+功能: 标志文件向上查找、环境变量覆盖、按脚本位置记忆、可选的磁盘缓存
+特色: 同一脚本位置在进程内只查找一次，启用磁盘缓存后跨进程启动也只需一次 stat 校验
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+PathLike = Union[str, Path]
+
+# ============================================================================
+# 常量
+# ============================================================================
+
+# 直接指定项目根目录，跳过查找
+PROJECT_ROOT_ENV_VAR = "CODESTUDIO_PROJECT_ROOT"
+
+# 磁盘缓存文件路径，未设置时不使用磁盘缓存
+ROOT_CACHE_ENV_VAR = "CODESTUDIO_ROOT_CACHE"
+
+# 项目根目录的标志性文件/目录，至少命中2个
+ROOT_INDICATORS = ("codestudiopro.exe", "data", "resources", "tools")
+MIN_INDICATORS = 2
+
+# 最多向上查找的层数
+MAX_SEARCH_LEVELS = 5
+
+# ============================================================================
+# 项目根目录解析器
+# ============================================================================
+
+class ProjectRootResolver:
+    """项目根目录解析器
+
+    解析顺序: 环境变量 CODESTUDIO_PROJECT_ROOT → 进程内记忆 → 磁盘缓存 → 向上查找。
+    磁盘缓存以脚本目录为键，读取时校验缓存的根目录仍然存在；
+    查找未命中时回退到脚本目录的上两级（与原实现一致），这种结果不写入磁盘缓存。
+    """
+
+    def __init__(self, cache_file: Optional[PathLike] = None):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._memo: Dict[str, Path] = {}
+        self._lock = threading.Lock()
+        # 最近一次磁盘缓存写入失败的原因（写入失败不影响解析结果）
+        self.last_error: Optional[str] = None
+
+    def resolve(self, script_dir: PathLike) -> Path:
+        """解析脚本所在项目的根目录"""
+        override = os.environ.get(PROJECT_ROOT_ENV_VAR)
+        if override:
+            return Path(override)
+
+        key = str(script_dir)
+        root = self._memo.get(key)
+        if root is not None:
+            return root
+
+        with self._lock:
+            root = self._memo.get(key)
+            if root is None:
+                root = self._load_cached(key)
+                if root is None:
+                    root, found = search_project_root(Path(script_dir))
+                    if found:
+                        self._store_cached(key, root)
+                self._memo[key] = root
+        return root
+
+    def clear(self):
+        """清空进程内记忆（磁盘缓存保留）"""
+        with self._lock:
+            self._memo.clear()
+
+    # ------------------------------------------------------------------------
+    # 磁盘缓存
+    # ------------------------------------------------------------------------
+
+    def _get_cache_file(self) -> Optional[Path]:
+        if self.cache_file is not None:
+            return self.cache_file
+        configured = os.environ.get(ROOT_CACHE_ENV_VAR)
+        return Path(configured) if configured else None
+
+    def _read_cache(self, cache_file: Path) -> Dict[str, str]:
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _load_cached(self, key: str) -> Optional[Path]:
+        cache_file = self._get_cache_file()
+        if cache_file is None:
+            return None
+        cached = self._read_cache(cache_file).get(key)
+        if isinstance(cached, str) and os.path.isdir(cached):
+            return Path(cached)
+        return None
+
+    def _store_cached(self, key: str, root: Path):
+        cache_file = self._get_cache_file()
+        if cache_file is None:
+            return
+        cache = self._read_cache(cache_file)
+        cache[key] = str(root)
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            self.last_error = f"项目根目录缓存写入失败: {e}"
+
+
+def search_project_root(script_dir: Path) -> Tuple[Path, bool]:
+    """从脚本目录向上查找项目根目录，返回 (根目录, 是否命中标志文件)"""
+    current = script_dir
+    for _ in range(MAX_SEARCH_LEVELS):
+        indicators_found = 0
+        for indicator in ROOT_INDICATORS:
+            if os.path.exists(os.path.join(current, indicator)):
+                indicators_found += 1
+                if indicators_found >= MIN_INDICATORS:
+                    return current, True
+
+        parent = current.parent
+        if parent == current:  # 已到达文件系统根目录
+            break
+        current = parent
+
+    # 如果没找到，使用脚本目录的上两级作为默认值
+    return script_dir.parent.parent, False
+
+# ============================================================================
+# 进程级共享实例
+# ============================================================================
+
+_resolver = ProjectRootResolver()
+
+
+def get_project_root_resolver() -> ProjectRootResolver:
+    """获取进程内共享的解析器"""
+    return _resolver
+
+
+def resolve_project_root(script_dir: PathLike) -> Path:
+    """使用共享解析器解析项目根目录"""
+    return _resolver.resolve(script_dir)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 项目结构增量索引
+将目录树持久化到 SQLite，按目录 mtime 增量刷新，供项目结构接口和结构分析工具复用
+
+版本: 1.0
+作者: AI Assistant
+功能: 目录条目持久化、按目录mtime跳过未变化目录、删除子树清理、嵌套结构输出（与 _get_directory_structure 格式一致）、文件清单输出
+特色: 目录的 mtime 只在其直接子条目增删或改名时变化，未变化的目录每次刷新只需一次 stat
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Tuple, Union
+
+PathLike = Union[str, Path]
+
+# ============================================================================
+# 常量
+# ============================================================================
+
+INDEX_FILE_NAME = "project_structure_index.db"
+
+SCHEMA_VERSION = 2
+
+# 文件系统 mtime 粒度可能粗到秒级（FAT 为2秒）
+RACY_MTIME_WINDOW_NS = 2 * 10 ** 9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    via_link INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    scanned_at REAL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    parent TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    is_link INTEGER NOT NULL DEFAULT 0,
+    is_loop INTEGER NOT NULL DEFAULT 0,
+    size INTEGER,
+    mtime_ns INTEGER,
+    PRIMARY KEY (parent, name)
+);
+"""
+
+# ============================================================================
+# 项目结构索引
+# ============================================================================
+
+class ProjectStructureIndex:
+    """项目结构增量索引
+
+    路径均以相对 root 的 "/" 分隔形式保存，root 本身为 ""。refresh() 从指定子目录开始遍历：
+    目录 mtime 与索引一致时直接使用已保存的条目，只有变化的目录才重新 scandir。
+
+    注意: 文件内容原地修改不会改变所在目录的 mtime，文件大小可能滞后，
+    需要精确大小时使用 refresh(full=True)。
+    """
+
+    def __init__(self, root: PathLike, db_path: PathLike):
+        self.root = Path(root).resolve()
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 索引文件自身及 WAL 附属文件不进入索引
+        self._excluded = {str(self.db_path.resolve()) + suffix for suffix in ("", "-wal", "-shm", "-journal")}
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        # WAL 模式下事务不会反复创建/删除日志文件，避免触发目录变化事件
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._check_meta()
+        self.last_refresh: Dict[str, Any] = {}
+
+    def _check_meta(self):
+        """根目录或结构版本变化时清空索引"""
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        if meta.get("root") != str(self.root) or meta.get("schema_version") != str(SCHEMA_VERSION):
+            with self._conn:
+                self._conn.execute("DELETE FROM directories")
+                self._conn.execute("DELETE FROM entries")
+                self._conn.execute("DELETE FROM meta")
+                self._conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+                    ("root", str(self.root)),
+                    ("schema_version", str(SCHEMA_VERSION)),
+                ])
+
+    # ------------------------------------------------------------------------
+    # 刷新
+    # ------------------------------------------------------------------------
+
+    def refresh(self, subpath: str = "", max_depth: Optional[int] = None, full: bool = False) -> Dict[str, Any]:
+        """增量刷新 subpath 下的索引
+
+        max_depth 为读取的目录层数（subpath 自身为第0层），None 表示不限；
+        full=True 时忽略 mtime 重新扫描所有目录。
+        """
+        start = time.perf_counter()
+        stats = {"directories_checked": 0, "directories_rescanned": 0, "entries_written": 0, "subtrees_removed": 0}
+        subpath = _normalize(subpath)
+
+        with self._lock, self._conn:
+            stored_mtimes = dict(self._conn.execute("SELECT path, mtime_ns FROM directories"))
+            base_real = os.path.realpath(self._absolute(subpath))
+            stack: List[Tuple[str, int, str, Tuple[str, ...], bool]] = [(subpath, 0, base_real, (), False)]
+
+            while stack:
+                rel, depth, real, ancestors, via_link = stack.pop()
+                absolute = self._absolute(rel)
+                try:
+                    st = os.stat(absolute)
+                except OSError:
+                    self._remove_subtree(rel)
+                    stats["subtrees_removed"] += 1
+                    continue
+
+                stats["directories_checked"] += 1
+                if full or stored_mtimes.get(rel) != st.st_mtime_ns:
+                    children = self._rescan(rel, absolute, real, ancestors, st.st_mtime_ns, via_link, stats)
+                else:
+                    children = self._conn.execute(
+                        "SELECT name, is_link, is_loop FROM entries WHERE parent = ? AND kind = 'dir' ORDER BY rowid",
+                        (rel,)
+                    ).fetchall()
+
+                if max_depth is not None and depth + 1 >= max_depth:
+                    continue
+
+                child_ancestors = ancestors + (real,)
+                for name, is_link, is_loop in reversed(children):
+                    if is_loop:
+                        continue
+                    child_rel = f"{rel}/{name}" if rel else name
+                    child_real = os.path.realpath(self._absolute(child_rel)) if is_link else os.path.join(real, name)
+                    stack.append((child_rel, depth + 1, child_real, child_ancestors, via_link or bool(is_link)))
+
+        stats["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self.last_refresh = stats
+        return stats
+
+    def _rescan(self, rel: str, absolute: str, real: str, ancestors: Tuple[str, ...], mtime_ns: int,
+                via_link: bool, stats: Dict[str, Any]) -> List[Tuple[str, int, int]]:
+        """重新读取单个目录并替换其条目，返回子目录 [(名称, 是否链接, 是否成环)]"""
+        rows = []
+        error = None
+        try:
+            with os.scandir(absolute) as iterator:
+                for entry in iterator:
+                    if entry.path in self._excluded:
+                        continue
+                    rows.append(self._describe(entry, real, ancestors))
+        except PermissionError:
+            error = "权限不足"
+        except OSError as e:
+            error = str(e)
+
+        # 清理已消失的子目录子树
+        new_dirs = {row[0] for row in rows if row[1] == "dir"}
+        for (name,) in self._conn.execute(
+                "SELECT name FROM entries WHERE parent = ? AND kind = 'dir'", (rel,)).fetchall():
+            if name not in new_dirs:
+                self._remove_subtree(f"{rel}/{name}" if rel else name)
+                stats["subtrees_removed"] += 1
+
+        self._conn.execute("DELETE FROM entries WHERE parent = ?", (rel,))
+        depth = rel.count("/") + 1 if rel else 0
+        self._conn.executemany(
+            "INSERT INTO entries (parent, depth, name, kind, is_link, is_loop, size, mtime_ns) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(rel, depth) + row for row in rows]
+        )
+        # mtime 距今过近时可能与本次扫描落在同一时间粒度内，暂不记录，下次刷新重新扫描
+        if time.time_ns() - mtime_ns < RACY_MTIME_WINDOW_NS:
+            mtime_ns = None
+        self._conn.execute(
+            "INSERT OR REPLACE INTO directories (path, mtime_ns, via_link, error, scanned_at) VALUES (?, ?, ?, ?, ?)",
+            (rel, mtime_ns, int(via_link), error, time.time())
+        )
+        stats["directories_rescanned"] += 1
+        stats["entries_written"] += len(rows)
+        return [(row[0], row[2], row[3]) for row in rows if row[1] == "dir"]
+
+    @staticmethod
+    def _describe(entry: os.DirEntry, real: str, ancestors: Tuple[str, ...]) -> Tuple[Any, ...]:
+        """构造条目行 (名称, 类型, 是否链接, 是否成环, 大小, mtime)；类型按跟随符号链接后的目标判断"""
+        try:
+            is_link = entry.is_symlink()
+            if entry.is_file():
+                st = entry.stat()
+                return entry.name, "file", int(is_link), 0, st.st_size, st.st_mtime_ns
+            if entry.is_dir():
+                is_loop = 0
+                if is_link:
+                    target = os.path.realpath(entry.path)
+                    is_loop = int(any(_is_ancestor(target, directory) for directory in ancestors + (real,)))
+                return entry.name, "dir", int(is_link), is_loop, None, None
+            return entry.name, "other", int(is_link), 0, None, None
+        except OSError:
+            return entry.name, "other", 0, 0, None, None
+
+    def _remove_subtree(self, rel: str):
+        """删除目录及其下所有索引记录"""
+        if not rel:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM directories")
+            return
+        low, high = _subtree_range(rel)
+        self._conn.execute("DELETE FROM entries WHERE parent = ? OR (parent >= ? AND parent < ?)", (rel, low, high))
+        self._conn.execute("DELETE FROM directories WHERE path = ? OR (path >= ? AND path < ?)", (rel, low, high))
+
+    # ------------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------------
+
+    def get_structure(self, subpath: str = "", max_depth: int = 2) -> Dict[str, Any]:
+        """刷新并返回与 _get_directory_structure 相同格式的嵌套结构"""
+        subpath = _normalize(subpath)
+        if max_depth <= 0 or not os.path.isdir(self._absolute(subpath)):
+            return {"exists": os.path.exists(self._absolute(subpath))}
+
+        self.refresh(subpath, max_depth)
+
+        # 一次查询取出深度范围内的全部条目，再按父目录分组组装
+        base_depth = subpath.count("/") + 1 if subpath else 0
+        low, high = _subtree_range(subpath)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT parent, name, kind, is_loop FROM entries "
+                "WHERE (parent = ? OR (parent >= ? AND parent < ?)) AND depth < ? ORDER BY rowid",
+                (subpath, low, high, base_depth + max_depth)
+            ).fetchall()
+            errors = dict(self._conn.execute(
+                "SELECT path, error FROM directories WHERE error IS NOT NULL AND (path = ? OR (path >= ? AND path < ?))",
+                (subpath, low, high)
+            ))
+
+        children: Dict[str, List[Tuple[str, str, int]]] = {}
+        for parent, name, kind, is_loop in rows:
+            children.setdefault(parent, []).append((name, kind, is_loop))
+        return self._build_structure(subpath, max_depth, 0, children, errors)
+
+    def _build_structure(self, rel: str, max_depth: int, depth: int,
+                         children: Dict[str, List[Tuple[str, str, int]]], errors: Dict[str, str]) -> Dict[str, Any]:
+        """按分组后的条目构造嵌套结构"""
+        if depth >= max_depth:
+            return {"exists": True}
+
+        structure: Dict[str, Any] = {"exists": True, "files": [], "directories": {}}
+        if rel in errors:
+            structure["error"] = errors[rel]
+
+        for name, kind, is_loop in children.get(rel, ()):
+            if kind == "file":
+                structure["files"].append(name)
+            elif kind == "dir":
+                if is_loop:
+                    structure["directories"][name] = {"exists": True, "symlink_loop": True}
+                else:
+                    child = f"{rel}/{name}" if rel else name
+                    structure["directories"][name] = self._build_structure(child, max_depth, depth + 1, children, errors)
+        return structure
+
+    def iter_files(self, subpath: str = "", follow_links: bool = False) -> Iterator[Tuple[str, int]]:
+        """按索引返回 subpath 下的全部文件 (相对路径, 大小)
+
+        默认不进入符号链接目录，与 Path.rglob 的行为一致。调用前需先 refresh()。
+        """
+        subpath = _normalize(subpath)
+        query = (
+            "SELECT e.parent, e.name, e.size FROM entries e JOIN directories d ON d.path = e.parent "
+            "WHERE e.kind = 'file'"
+        )
+        params: List[Any] = []
+        if not follow_links:
+            query += " AND d.via_link = 0"
+        if subpath:
+            low, high = _subtree_range(subpath)
+            query += " AND (e.parent = ? OR (e.parent >= ? AND e.parent < ?))"
+            params += [subpath, low, high]
+        query += " ORDER BY e.parent, e.rowid"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for parent, name, size in rows:
+            yield (f"{parent}/{name}" if parent else name), size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """索引规模与最近一次刷新的统计"""
+        with self._lock:
+            directories = self._conn.execute("SELECT COUNT(*) FROM directories").fetchone()[0]
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "root": str(self.root),
+            "db_path": str(self.db_path),
+            "directories": directories,
+            "entries": entries,
+            "last_refresh": dict(self.last_refresh)
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def _absolute(self, rel: str) -> str:
+        return os.path.join(str(self.root), *rel.split("/")) if rel else str(self.root)
+
+# ============================================================================
+# 辅助函数
+# ============================================================================
+
+def _normalize(subpath: PathLike) -> str:
+    """规范化相对路径为 "/" 分隔形式"""
+    return "/".join(part for part in str(subpath).replace("\\", "/").split("/") if part and part != ".")
+
+
+def _subtree_range(rel: str) -> Tuple[str, str]:
+    """子树路径的字符串区间 [rel/, rel0)，可以走主键索引；rel 为空时覆盖全部路径
+
+    "0" 是 "/" 之后的下一个字符，区间内恰好是以 "rel/" 开头的全部路径。
+    """
+    if not rel:
+        return "", "\U0010ffff"
+    return rel + "/", rel + "0"
+
+
+def _is_ancestor(target: str, directory: str) -> bool:
+    """target 是否为 directory 本身或其祖先目录"""
+    return directory == target or directory.startswith(target.rstrip(os.sep) + os.sep)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+CodeStudio Pro Ultimate - 项目结构流式遍历
+为 /api/project-structure 提供扁平化、可分页、可流式输出的目录遍历
+
+版本: 1.0
+作者: AI Assistant
+功能: 按名称排序的深度优先遍历、游标分页、条目数与深度限制、include/exclude 通配过滤、NDJSON 分块输出
+特色: 遍历由生成器驱动，任意大小的目录树都只占用与当前路径深度相关的内存
+"""
+
+import os
+import json
+import base64
+import fnmatch
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+
+# ============================================================================
+# 常量
+# ============================================================================
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson; charset=utf-8"
+
+DEFAULT_PAGE_LIMIT = 1000
+MAX_PAGE_LIMIT = 10000
+DEFAULT_MAX_DEPTH = 3
+MAX_DEPTH_LIMIT = 32
+
+# 触发分页模式的查询参数，均未提供时端点保持原有的嵌套结构输出
+STRUCTURE_QUERY_KEYS = ("format", "cursor", "limit", "max_depth", "include", "exclude", "roots")
+
+# ============================================================================
+# 查询参数
+# ============================================================================
+
+class StructureQuery:
+    """项目结构分页查询"""
+
+    __slots__ = ("roots", "format", "cursor", "limit", "max_depth", "include", "exclude")
+
+    def __init__(self, roots: List[str], format: str = "json", cursor: Optional[Tuple[str, List[str]]] = None,
+                 limit: int = DEFAULT_PAGE_LIMIT, max_depth: int = DEFAULT_MAX_DEPTH,
+                 include: List[str] = None, exclude: List[str] = None):
+        self.roots = roots
+        self.format = format
+        self.cursor = cursor
+        self.limit = limit
+        self.max_depth = max_depth
+        self.include = include or []
+        self.exclude = exclude or []
+
+    @classmethod
+    def from_request(cls, data: Dict[str, Any], default_roots: List[str],
+                     known_roots: List[str]) -> "StructureQuery":
+        """从请求参数构造查询，参数无效时抛出 ValueError"""
+        roots = _split_list(data.get("roots")) or list(default_roots)
+        unknown = [key for key in roots if key not in known_roots]
+        if unknown:
+            raise ValueError(f"未知的路径键: {', '.join(unknown)}")
+
+        format = str(data.get("format", "json")).lower()
+        if format not in ("json", "ndjson"):
+            raise ValueError(f"不支持的输出格式: {format}")
+
+        limit = _parse_int(data.get("limit"), "limit", DEFAULT_PAGE_LIMIT, 1, MAX_PAGE_LIMIT)
+        max_depth = _parse_int(data.get("max_depth"), "max_depth", DEFAULT_MAX_DEPTH, 1, MAX_DEPTH_LIMIT)
+
+        cursor = None
+        if data.get("cursor"):
+            cursor = decode_cursor(str(data["cursor"]))
+            if cursor[0] not in roots:
+                raise ValueError("游标与 roots 参数不匹配")
+
+        return cls(roots, format, cursor, limit, max_depth,
+                   _split_list(data.get("include")), _split_list(data.get("exclude")))
+
+
+def _split_list(value: Any) -> List[str]:
+    """解析逗号分隔字符串或列表参数"""
+    if not value:
+        return []
+    items = value if isinstance(value, (list, tuple)) else [value]
+    result = []
+    for item in items:
+        result.extend(part.strip() for part in str(item).split(",") if part.strip())
+    return result
+
+
+def _parse_int(value: Any, name: str, default: int, minimum: int, maximum: int) -> int:
+    """解析整数参数并限制范围"""
+    if value is None or value == "":
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} 必须是整数")
+    return max(minimum, min(number, maximum))
+
+# ============================================================================
+# 游标
+# ============================================================================
+
+def encode_cursor(root: str, segments: List[str]) -> str:
+    """编码游标：最后一个已返回条目的根目录键和相对路径段"""
+    raw = json.dumps([root, segments], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, List[str]]:
+    """解码游标，格式无效时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        root, segments = json.loads(raw.decode("utf-8"))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("游标格式无效")
+    if not isinstance(root, str) or not isinstance(segments, list) or not all(isinstance(s, str) for s in segments):
+        raise ValueError("游标格式无效")
+    return root, segments
+
+# ============================================================================
+# 遍历
+# ============================================================================
+
+def iter_structure_entries(roots: List[Tuple[str, Path]], query: StructureQuery) -> Iterator[Tuple[Dict[str, Any], List[str]]]:
+    """按 (根目录顺序, 路径段字典序) 深度优先遍历，产出 (条目, 路径段)
+
+    子条目按名称排序，因此遍历顺序是确定的，游标之前的整棵子树可以直接跳过。
+    """
+    cursor_root, cursor_segments = query.cursor if query.cursor else (None, None)
+    root_keys = [key for key, _ in roots]
+    start_index = root_keys.index(cursor_root) if cursor_root is not None else 0
+
+    for index in range(start_index, len(roots)):
+        root_key, root_path = roots[index]
+        resume = cursor_segments if index == start_index and cursor_root is not None else None
+        if not root_path.is_dir():
+            if resume is None:
+                yield {"root": root_key, "path": "", "type": "missing", "depth": 0}, []
+            continue
+        yield from _walk(root_key, str(root_path), [], 1, query, [resume])
+
+
+def _walk(root_key: str, directory: str, prefix: List[str], depth: int, query: StructureQuery,
+          resume: List[Optional[List[str]]]) -> Iterator[Tuple[Dict[str, Any], List[str]]]:
+    """遍历单个目录；resume[0] 为尚未越过的游标路径段"""
+    try:
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda entry: entry.name)
+    except OSError as e:
+        # 错误条目排在该目录全部子条目之前，同样按游标判断是否已经返回过
+        segments = prefix + ["\0"]
+        cursor = resume[0]
+        if cursor is not None:
+            if segments > cursor:
+                resume[0] = None
+            else:
+                if segments == cursor:
+                    resume[0] = None
+                return
+        error = "权限不足" if isinstance(e, PermissionError) else str(e)
+        yield {"root": root_key, "path": "/".join(prefix), "type": "error",
+               "depth": depth - 1, "error": error}, segments
+        return
+
+    for entry in entries:
+        segments = prefix + [entry.name]
+        relative = "/".join(segments)
+        if _matches(relative, entry.name, query.exclude):
+            continue
+
+        emit = True
+        cursor = resume[0]
+        if cursor is not None:
+            if segments == cursor[:len(segments)]:
+                # 游标所在条目或其祖先：已经返回过，继续向下
+                emit = False
+                if len(segments) == len(cursor):
+                    resume[0] = None
+            elif segments < cursor:
+                # 整棵子树都在游标之前
+                continue
+            else:
+                resume[0] = None
+
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            is_dir = False
+
+        if emit and (not query.include or _matches(relative, entry.name, query.include)):
+            yield _describe(root_key, entry, relative, depth, is_dir), segments
+
+        if is_dir and depth < query.max_depth:
+            yield from _walk(root_key, entry.path, segments, depth + 1, query, resume)
+
+
+def _matches(relative: str, name: str, patterns: List[str]) -> bool:
+    """相对路径或名称匹配任一通配模式"""
+    for pattern in patterns:
+        if fnmatch.fnmatchcase(relative, pattern) or fnmatch.fnmatchcase(name, pattern):
+            return True
+    return False
+
+
+def _describe(root_key: str, entry: os.DirEntry, relative: str, depth: int, is_dir: bool) -> Dict[str, Any]:
+    """构造单个条目"""
+    item: Dict[str, Any] = {"root": root_key, "path": relative, "depth": depth}
+    if is_dir:
+        item["type"] = "dir"
+        return item
+    try:
+        if entry.is_symlink():
+            item["type"] = "symlink"
+        elif entry.is_file(follow_symlinks=False):
+            item["type"] = "file"
+            item["size"] = entry.stat(follow_symlinks=False).st_size
+        else:
+            item["type"] = "other"
+    except OSError:
+        item["type"] = "other"
+    return item
+
+# ============================================================================
+# 分页输出
+# ============================================================================
+
+def collect_page(roots: List[Tuple[str, Path]], query: StructureQuery) -> Dict[str, Any]:
+    """收集一页条目，返回 {entries, count, next_cursor, limit, max_depth}"""
+    entries = []
+    next_cursor = None
+    last = None
+
+    for item, segments in iter_structure_entries(roots, query):
+        if len(entries) >= query.limit:
+            next_cursor = encode_cursor(*last)
+            break
+        entries.append(item)
+        last = (item["root"], segments)
+
+    return {
+        "entries": entries,
+        "count": len(entries),
+        "next_cursor": next_cursor,
+        "limit": query.limit,
+        "max_depth": query.max_depth
+    }
+
+
+def iter_ndjson_page(roots: List[Tuple[str, Path]], query: StructureQuery,
+                     chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """以 NDJSON 分块输出一页条目，最后一行是分页信息
+
+    每个条目一行；末行为 {"type": "page", "success": true, "count", "next_cursor"}。
+    多行合并为约 chunk_size 字节的块输出，减少写入次数。
+    """
+    buffer: List[bytes] = []
+    buffered = 0
+    count = 0
+    next_cursor = None
+    last = None
+
+    for item, segments in iter_structure_entries(roots, query):
+        if count >= query.limit:
+            next_cursor = encode_cursor(*last)
+            break
+        line = json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n"
+        buffer.append(line)
+        buffered += len(line)
+        count += 1
+        last = (item["root"], segments)
+        if buffered >= chunk_size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+
+    buffer.append(json.dumps({
+        "type": "page",
+        "success": True,
+        "count": count,
+        "next_cursor": next_cursor,
+        "limit": query.limit,
+        "max_depth": query.max_depth
+    }, ensure_ascii=False).encode("utf-8") + b"\n")
+    yield b"".join(buffer)
@@ -10,10 +10,18 @@ CodeStudio Pro Ultimate - 统一API管理器 (干净版本)
 
 import json
 import time
+import threading
 from typing import Dict, Any, Optional, Callable, List
 from pathlib import Path
 from datetime import datetime
 
+from api_route_table import CompiledRouteTable, split_request_target, build_handler_args, handler_accepts_data
+from api_response_cache import ResponseCache
+from api_log_writer import BackgroundLogWriter, acquire_log_writer
+from api_metrics import APIMetrics, PROMETHEUS_CONTENT_TYPE
+from api_response import RawResponse, JSONResponse, ConstantPayload
+from api_tracing import RequestTracer
+
 # ============================================================================
 # API响应标准化
 # ============================================================================
@@ -23,19 +31,23 @@ class APIResponse:
 
     @staticmethod
     def success(data: Any = None, message: str = "操作成功") -> Dict[str, Any]:
-        """成功响应"""
-        return {
+        """成功响应（data 可以是预序列化的 ConstantPayload）"""
+        constant = None
+        if isinstance(data, ConstantPayload):
+            constant, data = data, data.value
+
+        return JSONResponse({
             "success": True,
             "message": message,
             "data": data,
             "timestamp": time.time(),
             "error": None
-        }
+        }, constant)
 
     @staticmethod
     def error(error_msg: str, error_code: str = "UNKNOWN_ERROR", data: Any = None) -> Dict[str, Any]:
         """错误响应"""
-        return {
+        return JSONResponse({
             "success": False,
             "message": "操作失败",
             "data": data,
@@ -44,7 +56,7 @@ class APIResponse:
                 "code": error_code,
                 "message": error_msg
             }
-        }
+        })
 
 # ============================================================================
 # API日志记录器
@@ -53,9 +65,12 @@ class APIResponse:
 class APILogger:
     """API调用日志记录器"""
 
-    def __init__(self, log_file: str = "api_calls.log"):
+    def __init__(self, log_file: str = "api_calls.log", writer: BackgroundLogWriter = None):
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(exist_ok=True)
+        # 同一日志文件的记录器共享一个后台写入器
+        self.writer = writer or acquire_log_writer(self.log_file)
+        self._closed = False
 
     def log_request(self, endpoint: str, method: str, data: Dict[str, Any] = None):
         """记录API请求"""
@@ -81,13 +96,23 @@ class APILogger:
         self._write_log(log_entry)
 
     def _write_log(self, entry: Dict[str, Any]):
-        """写入日志文件"""
+        """写入日志文件（交给后台写入器批量写入）"""
         try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.writer.write(entry)
         except Exception:
             pass  # 静默处理日志写入失败
 
+    def flush(self, timeout: float = 5.0) -> bool:
+        """等待已记录的日志写入文件"""
+        return self.writer.flush(timeout)
+
+    def close(self):
+        """刷写并关闭日志写入器（共享写入器在最后一个记录器关闭时停止）"""
+        if self._closed:
+            return
+        self._closed = True
+        self.writer.close()
+
 # ============================================================================
 # 统一API管理器
 # ============================================================================
@@ -97,11 +122,17 @@ class UnifiedAPIManager:
 
     def __init__(self):
         self.endpoints: Dict[str, Dict[str, Callable]] = {}
+        self.routes = CompiledRouteTable()
+        self._handler_accepts_data: Dict[str, Dict[str, bool]] = {}
         self.logger = APILogger()
         self.middleware: List[Callable] = []
+        self.response_cache = ResponseCache()
+        self.metrics = APIMetrics()
+        self.tracer = RequestTracer()
 
         # 注册所有API端点
         self._register_endpoints()
+        self._configure_response_cache()
 
     def _register_endpoints(self):
         """注册所有API端点"""
@@ -109,6 +140,12 @@ class UnifiedAPIManager:
         self.register_endpoint('/api/status', 'GET', self.get_basic_status)
         self.register_endpoint('/api/system-status', 'GET', self.get_system_status)
         self.register_endpoint('/api/augment-plugin-status', 'GET', self.get_augment_plugin_status)
+        self.register_endpoint('/api/cache-stats', 'GET', self.get_cache_stats)
+        self.register_endpoint('/api/log-stats', 'GET', self.get_log_stats)
+        self.register_endpoint('/api/metrics', 'GET', self.get_metrics)
+        self.register_endpoint('/api/trace', 'GET', self.get_trace)
+        self.register_endpoint('/api/trace', 'POST', self.configure_trace)
+        self.register_endpoint('/api/trace/summary', 'GET', self.get_trace_summary)
 
         # POST端点
         self.register_endpoint('/api/clean', 'POST', self.execute_clean_operations)
@@ -119,70 +156,166 @@ class UnifiedAPIManager:
         self.register_endpoint('/api/one-click-renewal', 'POST', self.execute_one_click_renewal)
         self.register_endpoint('/api/fix-augment-plugin', 'POST', self.execute_augment_plugin_fix)
 
+    def _configure_response_cache(self):
+        """配置高频轮询端点的响应缓存"""
+        self.response_cache.configure('/api/system-status', ttl=2.0)
+        self.response_cache.configure('/api/augment-plugin-status', ttl=5.0)
+
+        # 写操作完成后清除全部缓存
+        for path in ('/api/clean', '/api/reset', '/api/fix-augment-plugin', '/api/quick-start',
+                     '/api/plugin-action', '/api/one-click-renewal'):
+            self.response_cache.add_invalidation(path)
+
     def register_endpoint(self, path: str, method: str, handler: Callable):
         """注册API端点"""
         if path not in self.endpoints:
             self.endpoints[path] = {}
+            # 编译路由，方法字典与endpoints共享
+            self._handler_accepts_data[path] = {}
+            self.routes.add_route(path, self.endpoints[path], self._handler_accepts_data[path])
         self.endpoints[path][method] = handler
+        # 处理函数签名只在注册时检查一次，结果随路由保存（不缓存处理函数，避免延长管理器生命周期）
+        self._handler_accepts_data[path][method] = handler_accepts_data(handler)
 
     def add_middleware(self, middleware: Callable):
         """添加中间件"""
         self.middleware.append(middleware)
 
+    def shutdown(self):
+        """刷写并关闭日志写入器"""
+        self.logger.close()
+
     def handle_request(self, path: str, method: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """处理API请求 - 统一入口"""
         start_time = time.time()
         response = {}
+        route = None
+        started = False
+        trace = self.tracer.begin(path, method)
 
         try:
             # 记录请求
             self.logger.log_request(path, method, data)
+            trace.mark("log_request")
 
-            # 检查端点是否存在
-            if path not in self.endpoints:
-                return APIResponse.error(f"API端点不存在: {path}", "ENDPOINT_NOT_FOUND")
+            # 解析查询字符串并匹配路由
+            route_path, query = split_request_target(path)
+            route = self.routes.match(route_path)
+            trace.mark("route_lookup")
+            if route is None:
+                response = APIResponse.error(f"API端点不存在: {path}", "ENDPOINT_NOT_FOUND")
+                return response
 
-            if method not in self.endpoints[path]:
-                return APIResponse.error(f"不支持的HTTP方法: {method}", "METHOD_NOT_ALLOWED")
+            if method not in route.methods:
+                response = APIResponse.error(f"不支持的HTTP方法: {method}", "METHOD_NOT_ALLOWED")
+                return response
 
             # 执行中间件
             for middleware in self.middleware:
                 result = middleware(path, method, data)
                 if result is not None:
-                    return result
-
-            # 调用处理函数
-            handler = self.endpoints[path][method]
-            if data is None:
-                response = handler()
-            else:
-                response = handler(data)
+                    trace.mark("middleware")
+                    response = result
+                    return response
+            trace.mark("middleware")
+
+            # 命中响应缓存时跳过处理函数
+            cached = self.response_cache.lookup(route.pattern, method, path, data)
+            trace.mark("cache_lookup")
+            if cached is not None:
+                response = cached
+                return response
+
+            # 调用处理函数（先记录缓存失效代数，处理期间发生失效时不缓存结果）
+            cache_generation = self.response_cache.generation(route.pattern)
+            self.metrics.request_started(route.pattern, method)
+            started = True
+            handler = route.methods[method]
+            response = handler(*build_handler_args(handler, data, route.params, query, route.accepts_data.get(method)))
+            trace.mark("handler")
 
             # 确保响应格式标准化
             if not isinstance(response, dict) or 'success' not in response:
                 response = APIResponse.success(response)
+            trace.mark("normalize")
+
+            # 缓存GET响应，写操作完成后清除相关缓存
+            self.response_cache.store(route.pattern, method, path, data, response, cache_generation)
+            self.response_cache.notify_write(route.pattern, method, response)
+            trace.mark("cache_update")
 
             return response
 
         except Exception as e:
-            return APIResponse.error(f"API调用异常: {str(e)}", "INTERNAL_ERROR")
+            response = APIResponse.error(f"API调用异常: {str(e)}", "INTERNAL_ERROR")
+            trace.mark("error_response")
+            return response
 
         finally:
             # 记录响应
             duration = time.time() - start_time
+            pattern = route.pattern if route else None
+            self.metrics.request_finished(pattern, method, response, duration, started)
+            trace.mark("metrics")
             self.logger.log_response(path, response if 'response' in locals() else {}, duration)
+            trace.mark("log_response")
+            self.tracer.finish(trace, pattern, response)
 
     # ========================================================================
     # API端点实现
     # ========================================================================
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取响应缓存统计"""
+        return APIResponse.success(self.response_cache.get_stats(), "缓存统计获取成功")
+
+    def get_log_stats(self) -> Dict[str, Any]:
+        """获取日志写入统计"""
+        return APIResponse.success(self.logger.writer.get_stats(), "日志统计获取成功")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """以Prometheus文本格式导出请求指标"""
+        return RawResponse(self.metrics.render_prometheus(), PROMETHEUS_CONTENT_TYPE)
+
+    def get_trace(self) -> Dict[str, Any]:
+        """导出已记录的请求阶段追踪（Chrome Trace / Perfetto JSON）"""
+        trace = self.tracer.to_chrome_trace()
+        return RawResponse(json.dumps(trace, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def get_trace_summary(self) -> Dict[str, Any]:
+        """获取各处理阶段的耗时汇总"""
+        return APIResponse.success(self.tracer.summarize(), "追踪汇总获取成功")
+
+    def configure_trace(self, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """开关请求阶段追踪
+
+        请求格式: {"enabled": bool, "capacity": int, "clear": bool}，均为可选。
+        """
+        data = data or {}
+        capacity = data.get("capacity")
+        if capacity is not None and (isinstance(capacity, bool) or not isinstance(capacity, int) or capacity <= 0):
+            return APIResponse.error("capacity 必须是正整数", "INVALID_PARAMETER")
+        self.tracer.configure(
+            enabled=data.get("enabled"),
+            capacity=capacity,
+            clear=bool(data.get("clear", False))
+        )
+        return APIResponse.success({
+            "enabled": self.tracer.enabled,
+            "capacity": self.tracer.capacity,
+            "recorded": self.tracer.recorded
+        }, "追踪配置已更新")
+
+    # 基本状态为常量，只序列化一次
+    BASIC_STATUS = ConstantPayload({
+        "status": "ready",
+        "message": "CodeStudio Pro Ultimate API已就绪",
+        "version": "2.1"
+    })
+
     def get_basic_status(self) -> Dict[str, Any]:
         """获取基本状态信息"""
-        return APIResponse.success({
-            "status": "ready",
-            "message": "CodeStudio Pro Ultimate API已就绪",
-            "version": "2.1"
-        })
+        return APIResponse.success(self.BASIC_STATUS)
 
     def get_system_status(self) -> Dict[str, Any]:
         """获取系统状态"""
@@ -406,8 +539,24 @@ class UnifiedAPIManager:
 # 全局API管理器实例
 # ============================================================================
 
-# 创建全局API管理器实例
-api_manager = UnifiedAPIManager()
+# 全局实例延迟创建：导入本模块不会创建日志文件或注册端点
+_api_manager: Optional[UnifiedAPIManager] = None
+_api_manager_lock = threading.Lock()
+
+def get_api_manager() -> UnifiedAPIManager:
+    """获取全局API管理器实例（首次调用时创建）"""
+    global _api_manager
+    if _api_manager is None:
+        with _api_manager_lock:
+            if _api_manager is None:
+                _api_manager = UnifiedAPIManager()
+    return _api_manager
+
+def __getattr__(name: str) -> Any:
+    """保持 api_manager 模块属性的向后兼容访问"""
+    if name == "api_manager":
+        return get_api_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ============================================================================
 # 便捷函数 - 向后兼容性支持
@@ -415,8 +564,8 @@ api_manager = UnifiedAPIManager()
 
 def handle_api_request(path: str, method: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
     """处理API请求的便捷函数"""
-    return api_manager.handle_request(path, method, data)
+    return get_api_manager().handle_request(path, method, data)
 
 def register_custom_endpoint(path: str, method: str, handler: Callable):
     """注册自定义API端点的便捷函数"""
-    api_manager.register_endpoint(path, method, handler)
+    get_api_manager().register_endpoint(path, method, handler)
@@ -126,4 +126,23 @@ class ApiManager {
     async getPluginStatus() {
         return await this.request('/api/plugin-status');
     }
+
+    // 批量请求API
+    /**
+     * 一次往返执行多个API调用
+     * @param {Array<{path: string, method?: string, data?: object}>} requests - 子请求列表
+     * @param {number} timeout - 批量总超时（秒）
+     * @returns {Promise<Array>} 按提交顺序排列的子请求响应
+     */
+    async batch(requests, timeout) {
+        const payload = { requests };
+        if (timeout !== undefined) {
+            payload.timeout = timeout;
+        }
+        const result = await this.request('/api/batch', {
+            method: 'POST',
+            body: JSON.stringify(payload)
+        });
+        return result.results.map(item => item.response);
+    }
 }
\ No newline at end of file
@@ -20,7 +20,6 @@ from datetime import datetime
 # 导入API测试框架
 try:
     from api_test_framework import run_full_tests
-    from unified_api_clean import api_manager
 except ImportError:
     print("⚠️ 警告: 无法导入API测试模块")
     run_full_tests = None
@@ -9,12 +9,21 @@ CodeStudio Pro Ultimate V2.1 - 项目结构优化器
 """
 
 import os
+import sys
 import shutil
 import json
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "api"))
+
+# 导入项目结构增量索引
+try:
+    from project_structure_index import ProjectStructureIndex, INDEX_FILE_NAME
+except ImportError:
+    ProjectStructureIndex = None
+
 # ============================================================================
 # 项目结构配置
 # ============================================================================
@@ -155,27 +164,24 @@ class ProjectStructureOptimizer:
         }
         
         # 扫描所有文件
-        for file_path in self.project_root.rglob("*"):
-            if file_path.is_file():
-                analysis["total_files"] += 1
-                
-                # 统计文件类型
-                suffix = file_path.suffix.lower()
-                analysis["file_types"][suffix] = analysis["file_types"].get(suffix, 0) + 1
-                
-                # 检查大文件
-                try:
-                    size_mb = file_path.stat().st_size / (1024 * 1024)
-                    if size_mb > 1:  # 大于1MB的文件
-                        analysis["large_files"].append({
-                            "path": str(file_path.relative_to(self.project_root)),
-                            "size_mb": round(size_mb, 2)
-                        })
-                except:
-                    pass
-                
-                # 文件分类
-                self._categorize_file(file_path, analysis["categorized_files"])
+        for file_path, size in self._iter_project_files():
+            analysis["total_files"] += 1
+            
+            # 统计文件类型
+            suffix = file_path.suffix.lower()
+            analysis["file_types"][suffix] = analysis["file_types"].get(suffix, 0) + 1
+            
+            # 检查大文件
+            if size is not None:
+                size_mb = size / (1024 * 1024)
+                if size_mb > 1:  # 大于1MB的文件
+                    analysis["large_files"].append({
+                        "path": str(file_path.relative_to(self.project_root)),
+                        "size_mb": round(size_mb, 2)
+                    })
+            
+            # 文件分类
+            self._categorize_file(file_path, analysis["categorized_files"])
         
         # 检查结构问题
         self._check_structure_issues(analysis)
@@ -183,6 +189,35 @@ class ProjectStructureOptimizer:
         print(f"✅ 结构分析完成: {analysis['total_files']} 个文件")
         return analysis
     
+    def _iter_project_files(self) -> Iterator[Tuple[Path, Optional[int]]]:
+        """遍历项目文件，返回 (路径, 大小)
+        
+        优先使用 logs/ 下的项目结构增量索引，只重新读取 mtime 变化的目录；
+        索引不可用时回退到 rglob 全量扫描。
+        """
+        if ProjectStructureIndex is not None:
+            try:
+                index = ProjectStructureIndex(self.project_root, self.project_root / "logs" / INDEX_FILE_NAME)
+                try:
+                    stats = index.refresh()
+                    print(f"📇 使用结构索引: 重新扫描 {stats['directories_rescanned']}/{stats['directories_checked']} 个目录")
+                    files = list(index.iter_files())
+                finally:
+                    index.close()
+                for relative, size in files:
+                    yield self.project_root / relative, size
+                return
+            except Exception as e:
+                print(f"⚠️ 结构索引不可用，使用全量扫描: {e}")
+        
+        for file_path in self.project_root.rglob("*"):
+            if file_path.is_file():
+                try:
+                    size = file_path.stat().st_size
+                except OSError:
+                    size = None
+                yield file_path, size
+    
     def _categorize_file(self, file_path: Path, categorized_files: Dict):
         """文件分类"""
         relative_path = file_path.relative_to(self.project_root)